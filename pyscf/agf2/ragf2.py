@@ -157,12 +157,19 @@ def build_se_part(agf2, eri, gf_occ, gf_vir, os_factor=1.0, ss_factor=1.0):
 
     mem_incore = (gf_occ.nphys*gf_occ.naux**2*gf_vir.naux) * 8/1e6
     mem_now = lib.current_memory()[0]
-    if (mem_incore+mem_now < agf2.max_memory) or agf2.incore_complete:
+    if mem_incore+mem_now < agf2.max_memory:
+        qeri = _make_qmo_eris_incore(agf2, eri, (ci, ci, ca))
+    elif isinstance(eri.eri, np.ndarray):
+        # QMO integrals are contracted block-wise and never stored
+        qeri = None
+    elif agf2.incore_complete:
         qeri = _make_qmo_eris_incore(agf2, eri, (ci, ci, ca))
     else:
         qeri = _make_qmo_eris_outcore(agf2, eri, (ci, ci, ca))
 
-    if isinstance(qeri, np.ndarray):
+    if qeri is None:
+        vv, vev = _build_mats_ragf2_chunked(agf2, eri, (ci, ci, ca), ei, ea, **facs)
+    elif isinstance(qeri, np.ndarray):
         vv, vev = _agf2.build_mats_ragf2_incore(qeri, ei, ea, **facs)
     else:
         vv, vev = _agf2.build_mats_ragf2_outcore(qeri, ei, ea, **facs)
@@ -444,6 +451,10 @@ class RAGF2(lib.StreamObject):
             Allowed memory in MB. Default value equals to :class:`Mole.max_memory`
         incore_complete : bool
             Avoid all I/O. Default is False.
+        se_threads : int
+            Number of threads to build the self-energy when the QMO
+            integrals do not fit in memory. The integrals are then
+            transformed and contracted block by block. Default is 1.
         conv_tol : float
             Convergence threshold for AGF2 energy. Default value is 1e-7
         conv_tol_rdm1 : float
@@ -518,6 +529,7 @@ class RAGF2(lib.StreamObject):
         self.stdout = self.mol.stdout
         self.max_memory = mf.max_memory
         self.incore_complete = self.incore_complete or self.mol.incore_anyway
+        self.se_threads = getattr(__config__, 'agf2_se_threads', 1)
 
         self.conv_tol = getattr(__config__, 'agf2_conv_tol', 1e-7)
         self.conv_tol_rdm1 = getattr(__config__, 'agf2_conv_tol_rdm1', 1e-8)
@@ -767,6 +779,7 @@ class RAGF2(lib.StreamObject):
         log.info('os_factor = %g', self.os_factor)
         log.info('ss_factor = %g', self.ss_factor)
         log.info('damping = %g', self.damping)
+        log.info('se_threads = %d', self.se_threads)
         log.info('nmo = %s', self.nmo)
         log.info('nocc = %s', self.nocc)
         if self.frozen is not None:
@@ -1076,6 +1089,117 @@ def _make_qmo_eris_incore(agf2, eri, coeffs):
 
     return qeri
 
+def _build_mats_ragf2_chunked(agf2, eri, coeffs, e_occ, e_vir,
+                              os_factor=1.0, ss_factor=1.0):
+    ''' Builds the vv and vev matrices of :func:`build_se_part` in
+        blocks of the first occupied index of the QMO integrals. The
+        (xija) and (xjia) integrals of a block are transformed and
+        contracted into vv and vev immediately. Each block needs
+        O(blksize*nmo^3) memory (the integrals of the block and their
+        half-transformed intermediates) rather than nmo*nocc^2*nvir. The
+        blocks are distributed over :attr:`agf2.se_threads` threads.
+
+    Returns:
+        tuple of ndarrays (vv, vev)
+    '''
+
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    cput0 = (time.clock(), time.time())
+    log = logger.Logger(agf2.stdout, agf2.verbose)
+
+    nmo = eri.nmo
+    cx = np.eye(nmo)
+    if not (agf2.frozen is None or agf2.frozen == 0):
+        mask = get_frozen_mask(agf2)
+        cx = cx[:,mask]
+
+    ci, cj, ca = coeffs
+    nx = cx.shape[1]
+    ni = ci.shape[1]
+    nj = cj.shape[1]
+    na = ca.shape[1]
+    npair = nmo*(nmo+1)//2
+
+    fpos = os_factor + ss_factor
+    fneg = -ss_factor
+
+    eja = lib.direct_sum('j,a->ja', e_occ, -e_vir)
+    eja = eja.ravel()
+
+    rank, size = mpi_helper.rank, mpi_helper.size
+    istart = rank * ni // size
+    iend = ni if rank == (size-1) else (rank+1) * ni // size
+
+    nthreads = max(1, min(agf2.se_threads, iend-istart))
+    nomp = max(1, lib.num_threads() // nthreads)
+    mem_avail = max(0, agf2.max_memory - lib.current_memory()[0]) / nthreads
+    # Per occupied index: xija, xjia, their half-transformed (xi|kl) and
+    # (ia|kl) intermediates and the per-i temporaries
+    blksize = int(mem_avail*1e6/8 / (nx*3*nj*na + (nx+na)*npair))
+    blksize = min(max(1, iend-istart), max(BLKMIN, blksize))
+    log.debug1('blksize (ragf2._build_mats_ragf2_chunked) = %d, nthreads = %d',
+               blksize, nthreads)
+
+    blocks = iter(lib.prange(istart, iend, blksize))
+    lock = threading.Lock()
+
+    def worker():
+        vv = np.zeros((nx, nx))
+        vev = np.zeros((nx, nx))
+
+        # omp_set_num_threads only affects the calling thread
+        with lib.with_omp_threads(nomp):
+            while True:
+                with lock:
+                    blk = next(blocks, None)
+                if blk is None:
+                    break
+                i0, i1 = blk
+
+                xija = ao2mo.incore.general(eri.eri, (cx, ci[:,i0:i1], cj, ca), compact=False)
+                xija = xija.reshape(nx, i1-i0, nj*na)
+                # (ia|xj) rather than (xj|ia), so that the half-transformed
+                # intermediate is the small (ia|kl) of the block
+                iaxj = ao2mo.incore.general(eri.eri, (ci[:,i0:i1], ca, cx, cj), compact=False)
+                iaxj = iaxj.reshape(i1-i0, na, nx, nj)
+
+                for i in range(i1-i0):
+                    xi = np.asarray(xija[:,i], order='C')
+                    xj = np.asarray(iaxj[i].transpose(1,2,0), order='C').reshape(nx, -1)
+
+                    eija = eja + e_occ[i0+i]
+
+                    vv = lib.dot(xi, xi.T, alpha=fpos, beta=1, c=vv)
+                    vv = lib.dot(xi, xj.T, alpha=fneg, beta=1, c=vv)
+
+                    exija = xi * eija[None]
+
+                    vev = lib.dot(exija, xi.T, alpha=fpos, beta=1, c=vev)
+                    vev = lib.dot(exija, xj.T, alpha=fneg, beta=1, c=vev)
+
+                xija = iaxj = None
+
+        return vv, vev
+
+    if nthreads == 1:
+        vv, vev = worker()
+    else:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            futures = [executor.submit(worker) for i in range(nthreads)]
+            results = [f.result() for f in futures]
+        vv = sum(r[0] for r in results)
+        vev = sum(r[1] for r in results)
+
+    mpi_helper.barrier()
+    mpi_helper.allreduce_safe_inplace(vv)
+    mpi_helper.allreduce_safe_inplace(vev)
+
+    log.timer('QMO chunked vv and vev', *cput0)
+
+    return vv, vev
+
 def _make_qmo_eris_outcore(agf2, eri, coeffs):
     ''' Returns H5 dataset
     '''
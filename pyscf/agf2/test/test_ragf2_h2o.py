@@ -67,6 +67,19 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(v_ea[1], 0.9901410412716749 , 6)
         self.assertAlmostEqual(v_ea[2], 0.9827713231118138 , 6)
 
+    def test_ragf2_chunked(self):
+        # tests the block-wise threaded self-energy build for H2O/cc-pvdz
+        gf2 = agf2.RAGF2(self.mf)
+        gf2.max_memory = 1
+        gf2.incore_complete = True
+        gf2.se_threads = 2
+        gf2.conv_tol = 1e-7
+        gf2.run()
+        self.assertAlmostEqual(gf2.e_1b, -75.89108074396137  , 6)
+        self.assertAlmostEqual(gf2.e_2b, -0.33248785652834784, 6)
+        e_ip, v_ip = gf2.ipagf2(nroots=1)
+        self.assertAlmostEqual(e_ip,     0.45080222600137465 , 6)
+
     def test_ragf2_outcore(self):
         # tests the out-of-core and chkfile support for AGF2 for H2O/cc-pvdz
         gf2 = agf2.RAGF2(self.mf)
@@ -27,12 +27,15 @@ IOBLK_SIZE = getattr(__config__, 'ao2mo_outcore_ioblk_size', 256)  # 256 MB
 IOBUF_WORDS = getattr(__config__, 'ao2mo_outcore_iobuf_words', 1e8)  # 800 MB
 IOBUF_ROW_MIN = getattr(__config__, 'ao2mo_outcore_row_min', 160)
 MAX_MEMORY = getattr(__config__, 'ao2mo_outcore_max_memory', 2000)  # 2GB
+# Lossless compression for the HDF5 datasets. It can be None, 'gzip', 'lzf',
+# 'blosc' or 'lz4'. blosc and lz4 require the hdf5plugin package.
+COMPRESSION = getattr(__config__, 'ao2mo_outcore_compression', None)
 
 
 def full(mol, mo_coeff, erifile, dataname='eri_mo',
          intor='int2e', aosym='s4', comp=None,
          max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-         compact=True):
+         compact=True, chunks=None, compression=COMPRESSION):
     r'''Transfer arbitrary spherical AO integrals to MO integrals for given orbitals
 
     Args:
@@ -79,6 +82,15 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
             returned MO integrals has (up to 4-fold) permutation symmetry.
             If it's False, the function will abandon any permutation symmetry,
             and return the "plain" MO integrals
+        chunks : tuple
+            HDF5 chunk shape of the MO integrals dataset.  The default
+            (nmoj,nmol) is suited for reading the integrals element-wise.  For
+            the programs which read the integrals by row blocks, chunks of
+            shape (blksize,nkl_pair) can reduce the IO operations.
+        compression : str
+            Lossless compression filter for the MO integrals and the
+            intermediate swap file.  It can be 'gzip', 'lzf', or 'blosc',
+            'lz4' (when hdf5plugin is available).
 
     Returns:
         None
@@ -108,13 +120,14 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
     dataset ['eri_mo', 'new'], shape (3, 100, 55)
     '''
     general(mol, (mo_coeff,)*4, erifile, dataname,
-            intor, aosym, comp, max_memory, ioblk_size, verbose, compact)
+            intor, aosym, comp, max_memory, ioblk_size, verbose, compact,
+            chunks, compression)
     return erifile
 
 def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             intor='int2e', aosym='s4', comp=None,
             max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-            compact=True):
+            compact=True, chunks=None, compression=COMPRESSION):
     r'''For the given four sets of orbitals, transfer arbitrary spherical AO
     integrals to MO integrals on the fly.
 
@@ -249,11 +262,16 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
         feri = erifile
 
     if comp == 1:
-        chunks = (nmoj,nmol)
+        if chunks is None:
+            chunks = (nmoj,nmol)
         shape = (nij_pair,nkl_pair)
     else:
-        chunks = (1,nmoj,nmol)
+        if chunks is None:
+            chunks = (1,nmoj,nmol)
+        elif len(chunks) == 2:
+            chunks = (1,) + tuple(chunks)
         shape = (comp,nij_pair,nkl_pair)
+    chunks = tuple(min(n, c) for n, c in zip(shape, chunks))
 
     if nij_pair == 0 or nkl_pair == 0:
         feri.create_dataset(dataname, shape, 'f8')
@@ -261,7 +279,8 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             feri.close()
         return erifile
     else:
-        h5d_eri = feri.create_dataset(dataname, shape, 'f8', chunks=chunks)
+        h5d_eri = feri.create_dataset(dataname, shape, 'f8', chunks=chunks,
+                                      **_compression_opts(compression, log))
 
     log.debug('MO integrals %s are saved in %s/%s', intor, erifile, dataname)
     log.debug('num. MO ints = %.8g, required disk %.8g MB',
@@ -270,7 +289,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
 # transform e1
     fswap = lib.H5TmpFile()
     half_e1(mol, mo_coeffs, fswap, intor, aosym, comp, max_memory, ioblk_size,
-            log, compact)
+            log, compact, compression=compression)
 
     time_1pass = log.timer('AO->MO transformation for %s 1 pass'%intor,
                            *time_0pass)
@@ -343,7 +362,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
 def half_e1(mol, mo_coeffs, swapfile,
             intor='int2e', aosym='s4', comp=1,
             max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-            compact=True, ao2mopt=None):
+            compact=True, ao2mopt=None, compression=COMPRESSION):
     r'''Half transform arbitrary spherical AO integrals to MO integrals
     for the given two sets of orbitals
 
@@ -443,10 +462,11 @@ def half_e1(mol, mo_coeffs, swapfile,
     e1buflen = max([x[2] for x in shranges])
 
     e2buflen, chunks = guess_e2bufsize(ioblk_size, nij_pair, e1buflen)
+    h5opts = _compression_opts(compression, log)
     def save(istep, iobuf):
         for icomp in range(comp):
             _transpose_to_h5g(fswap, '%d/%d'%(icomp,istep), iobuf[icomp],
-                              e2buflen, None)
+                              e2buflen, None, **h5opts)
 
     # transform e1
     ti0 = log.timer('Initializing ao2mo.outcore.half_e1', *time0)
@@ -499,12 +519,100 @@ def _load_from_h5g(h5group, row0, row1, out=None):
             out[:,:,col0:col1] = dat
     return out
 
-def _transpose_to_h5g(h5group, key, dat, blksize, chunks=None):
+def _transpose_to_h5g(h5group, key, dat, blksize, chunks=None, **h5opts):
     nrow, ncol = dat.shape
-    dset = h5group.create_dataset(key, (ncol,nrow), 'f8', chunks=chunks)
+    dset = h5group.create_dataset(key, (ncol,nrow), 'f8', chunks=chunks,
+                                  **h5opts)
     for col0, col1 in prange(0, ncol, blksize):
         dset[col0:col1] = lib.transpose(dat[:,col0:col1])
 
+def _compression_opts(compression, verbose=None):
+    '''Keyword arguments of h5py create_dataset for the compression filter'''
+    if not compression:
+        return {}
+    if compression in ('blosc', 'lz4'):
+        try:
+            import hdf5plugin
+            if compression == 'blosc':
+                return dict(hdf5plugin.Blosc(cname='lz4', clevel=5,
+                                             shuffle=hdf5plugin.Blosc.SHUFFLE))
+            else:
+                return dict(hdf5plugin.LZ4())
+        except ImportError:
+            logger.warn(logger.new_logger(None, verbose),
+                        'hdf5plugin not found. %s compression is replaced '
+                        'by gzip', compression)
+            compression = 'gzip'
+    if compression == 'gzip':
+        return {'compression': 'gzip', 'compression_opts': 1, 'shuffle': True}
+    elif compression == 'lzf':
+        return {'compression': 'lzf', 'shuffle': True}
+    else:
+        raise ValueError('Unknown compression filter %s. Supported filters '
+                         'are gzip, lzf, blosc and lz4' % compression)
+
+def iter_rows(h5dat, blksize, start=0, stop=None, sync=False):
+    '''Iterate over the row blocks of an HDF5 dataset, or a group of datasets
+    generated by :func:`half_e1`.  The next block is read in background
+    while the current block is being processed (unless sync is True).
+
+    Note the yielded arrays share two buffers.  A block is overwritten when
+    the next block is requested.  Copy it if it needs to be held.
+
+    Examples:
+
+    >>> for eri_blk in iter_rows(feri['eri_mo'], 100):
+    ...     print(eri_blk.shape)
+    '''
+    if isinstance(h5dat, numpy.ndarray):
+        if stop is None:
+            stop = h5dat.shape[0]
+        for row0, row1 in prange(start, stop, blksize):
+            yield h5dat[row0:row1]
+        return
+
+    if isinstance(h5dat, h5py.Group):
+        dat0 = h5dat['0']
+        ncol = sum(h5dat[str(k)].shape[-1] for k in range(len(h5dat)))
+        if dat0.ndim == 2:
+            nrow = dat0.shape[0]
+            def blk_shape(row0, row1):
+                return (row1-row0, ncol)
+        else:  # multiple components
+            nrow = dat0.shape[1]
+            def blk_shape(row0, row1):
+                return (dat0.shape[0], row1-row0, ncol)
+        dtype = dat0.dtype
+        def fread(row0, row1, buf):
+            _load_from_h5g(h5dat, row0, row1, buf)
+    else:
+        nrow = h5dat.shape[0]
+        dtype = h5dat.dtype
+        def blk_shape(row0, row1):
+            return (row1-row0,) + h5dat.shape[1:]
+        def fread(row0, row1, buf):
+            out = numpy.ndarray(blk_shape(row0, row1), dtype, buffer=buf)
+            h5dat.read_direct(out, numpy.s_[row0:row1])
+
+    if stop is None:
+        stop = nrow
+    if start >= stop:
+        return
+    blksize = min(blksize, stop - start)
+    buf = numpy.empty(numpy.prod(blk_shape(0, blksize)), dtype=dtype)
+    buf_prefetch = numpy.empty_like(buf)
+
+    def load(row0, row1, buf):
+        if row0 < row1:
+            fread(row0, row1, buf)
+
+    with lib.call_in_background(load, sync=sync) as prefetch:
+        prefetch(start, min(stop, start+blksize), buf_prefetch)
+        for row0, row1 in prange(start, stop, blksize):
+            buf, buf_prefetch = buf_prefetch, buf
+            prefetch(row1, min(stop, row1+blksize), buf_prefetch)
+            yield numpy.ndarray(blk_shape(row0, row1), dtype, buffer=buf)
+
 def full_iofree(mol, mo_coeff, intor='int2e', aosym='s4', comp=None,
                 max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE,
                 verbose=logger.WARN, compact=True):
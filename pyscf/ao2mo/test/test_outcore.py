@@ -104,6 +104,39 @@ class KnownValues(unittest.TestCase):
         with ao2mo.load(erifile, 'eri_mo') as eri:
             self.assertTrue(eri.size == 0)
 
+    def test_compression_and_iter_rows(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        erifile = ftmp.name
+        mos = (mo[:,:4], mo[:,:3], mo[:,:3], mo[:,:2])
+        ao2mo.outcore.general(mol, mos, erifile, dataname='ref',
+                              max_memory=10, ioblk_size=5)
+        ao2mo.outcore.general(mol, mos, erifile, dataname='eri_mo',
+                              max_memory=10, ioblk_size=5,
+                              chunks=(5,6), compression='gzip')
+        with h5py.File(erifile, 'r') as feri:
+            ref = feri['ref'][:]
+            self.assertEqual(feri['eri_mo'].compression, 'gzip')
+            self.assertEqual(feri['eri_mo'].chunks, (5,6))
+            eri1 = numpy.vstack([x.copy() for x in
+                                 ao2mo.outcore.iter_rows(feri['eri_mo'], 5)])
+            self.assertAlmostEqual(abs(eri1-ref).max(), 0, 12)
+            eri1 = numpy.vstack([x.copy() for x in
+                                 ao2mo.outcore.iter_rows(feri['eri_mo'], 3, 2, 9)])
+            self.assertAlmostEqual(abs(eri1-ref[2:9]).max(), 0, 12)
+
+        ao2mo.outcore.full(mol, mo[:,:4], erifile, dataname='full',
+                           max_memory=10, ioblk_size=5,
+                           chunks=(2,10), compression='gzip')
+        with h5py.File(erifile, 'r') as feri:
+            self.assertEqual(feri['full'].compression, 'gzip')
+            self.assertEqual(feri['full'].chunks, (2,10))
+            eri1 = numpy.vstack([x.copy() for x in
+                                 ao2mo.outcore.iter_rows(feri['full'], 3, sync=True)])
+        ref = ao2mo.kernel(mol, mo[:,:4])
+        self.assertAlmostEqual(abs(eri1-ref).max(), 0, 12)
+
+        self.assertRaises(ValueError, ao2mo.outcore._compression_opts, 'zstd')
+
     def test_group_segs(self):
         numpy.random.seed(1)
         segs = numpy.asarray(numpy.random.random(40)*50, dtype=int)
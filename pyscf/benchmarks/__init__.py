@@ -0,0 +1,35 @@
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Performance benchmarks for the hot paths of SCF, DFT, DF, CCSD and FCI
+
+The kernels (see :data:`kernels.KERNELS`) are timed on parameterized
+molecule sets (see :data:`molecules.SYSTEMS`) for a list of OpenMP thread
+numbers.  The results are saved in a JSON file which can be compared
+between commits.
+
+Examples::
+
+    $ python -m pyscf.benchmarks run -k vhf_direct nr_rks -s water:4 -t 1 4 -o new.json
+    $ python -m pyscf.benchmarks compare ref.json new.json
+
+>>> from pyscf import benchmarks
+>>> results = benchmarks.run(kernels=['fci_contract_2e'], systems=['water:1'])
+>>> benchmarks.save(results, 'new.json')
+'''
+
+from pyscf.benchmarks import molecules
+from pyscf.benchmarks import kernels
+from pyscf.benchmarks.harness import time_kernel, run, save, load, compare
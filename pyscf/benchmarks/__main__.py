@@ -0,0 +1,70 @@
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Command line interface
+
+    python -m pyscf.benchmarks run [-k KERNEL ...] [-s SYSTEM ...] [-b BASIS]
+                                   [-t THREADS ...] [-r REPEAT] [-o OUTPUT]
+    python -m pyscf.benchmarks compare REF NEW [--tol TOL]
+
+compare exits with status 1 if any kernel is slower than the reference.
+'''
+
+import sys
+import argparse
+from pyscf.benchmarks import harness
+from pyscf.benchmarks.kernels import KERNELS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyscf.benchmarks')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('run', help='Run benchmarks')
+    p.add_argument('-k', '--kernels', nargs='+', choices=sorted(KERNELS))
+    p.add_argument('-s', '--systems', nargs='+', default=['water:2'],
+                   help='Molecules, eg water:8 alkane:6 carbonyl:Fe')
+    p.add_argument('-b', '--basis', default=None)
+    p.add_argument('-t', '--threads', nargs='+', type=int, default=None,
+                   help='Numbers of OpenMP threads for the scaling sweep')
+    p.add_argument('-r', '--repeat', type=int, default=3)
+    p.add_argument('--warmup', type=int, default=1)
+    p.add_argument('--no-memory', action='store_true',
+                   help='Skip the tracemalloc pass')
+    p.add_argument('-o', '--output', default=None, help='JSON results file')
+
+    p = sub.add_parser('compare', help='Compare two results files')
+    p.add_argument('ref')
+    p.add_argument('new')
+    p.add_argument('--tol', type=float, default=0.1,
+                   help='Relative tolerance of the wall time')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = harness.run(args.kernels, args.systems, args.basis,
+                              args.threads, args.repeat, args.warmup,
+                              not args.no_memory)
+        if args.output:
+            harness.save(results, args.output)
+        return 0
+    elif args.command == 'compare':
+        table = harness.compare(args.ref, args.new, args.tol)
+        print(harness.format_comparison(table))
+        return int(any(row[-1] == 'slower' for row in table))
+    else:
+        parser.print_help()
+        return 2
+
+if __name__ == '__main__':
+    sys.exit(main())
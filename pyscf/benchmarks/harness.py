@@ -0,0 +1,223 @@
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Timing harness and the JSON results format
+
+The results file is a dict::
+
+    {"format": 1,
+     "meta": {"pyscf": version, "commit": git hash, "numpy": version,
+              "host": hostname, "cpu": cpu model, "date": ISO date, ...},
+     "records": [{"kernel": name, "system": "water:4", "basis": basis,
+                  "nao": nao, "threads": 4,
+                  "wall": [...], "cpu": [...],
+                  "wall_min": ..., "wall_median": ...,
+                  "peak_traced_mb": ..., "maxrss_mb": ...}, ...]}
+
+Records of two files are matched by (kernel, system, basis, threads).
+'''
+
+import os
+import sys
+import time
+import json
+import platform
+import subprocess
+import numpy
+import pyscf
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.benchmarks import molecules
+from pyscf.benchmarks.kernels import KERNELS
+
+FORMAT_VERSION = 1
+
+def _maxrss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / 1e6  # bytes
+    else:
+        return maxrss / 1e3  # kB
+
+def time_kernel(fn, repeat=3, warmup=1, memory=True):
+    '''Time the function fn (without arguments).
+
+    Returns a dict with the wall and CPU time of each repetition and the
+    minimum and median of wall time.  If memory is enabled, fn is called
+    once more under tracemalloc to measure the peak of the memory allocated
+    by Python and numpy (the allocations in C libraries are not traced).
+    The maximum resident set size of the process is recorded as well.
+    '''
+    for i in range(warmup):
+        fn()
+
+    walls = []
+    cpus = []
+    for i in range(repeat):
+        t0 = time.process_time(), time.perf_counter()
+        fn()
+        t1 = time.process_time(), time.perf_counter()
+        cpus.append(t1[0] - t0[0])
+        walls.append(t1[1] - t0[1])
+
+    result = {'wall': walls, 'cpu': cpus,
+              'wall_min': min(walls),
+              'wall_median': float(numpy.median(walls))}
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            fn()
+            result['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    result['maxrss_mb'] = _maxrss_mb()
+    return result
+
+def _git_commit():
+    src = os.path.dirname(os.path.dirname(os.path.abspath(pyscf.__file__)))
+    try:
+        out = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=src,
+                                      stderr=subprocess.STDOUT)
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _cpu_model():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if 'model name' in line:
+                    return line.split(':', 1)[1].strip()
+    except IOError:
+        pass
+    return platform.processor()
+
+def metadata():
+    return {'pyscf': pyscf.__version__,
+            'commit': _git_commit(),
+            'numpy': numpy.__version__,
+            'python': platform.python_version(),
+            'host': platform.node(),
+            'cpu': _cpu_model(),
+            'max_threads': lib.num_threads(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def run(kernels=None, systems=('water:2',), basis=None, threads=None,
+        repeat=3, warmup=1, memory=True, kernel_args=None, verbose=logger.NOTE):
+    '''Run the benchmarks for all combinations of kernels, systems and
+    numbers of threads.
+
+    Kwargs:
+        kernels : list of str
+            Keys of :data:`kernels.KERNELS`.  Default is all kernels.
+        systems : list of str
+            Molecule specifications, see :func:`molecules.get_mol`
+        basis : str
+            Basis set to override the default basis of the systems
+        threads : list of int
+            The thread-scaling sweep.  Default is the current number of
+            OpenMP threads.
+        kernel_args : dict
+            Extra keyword arguments for each kernel, eg
+            {'fci_contract_2e': {'ncas': 10, 'nelecas': 10}}
+
+    Returns:
+        The results dict (see the module documentation).
+    '''
+    log = logger.Logger(sys.stdout, verbose)
+    if kernels is None:
+        kernels = sorted(KERNELS)
+    if threads is None:
+        threads = [lib.num_threads()]
+    if kernel_args is None:
+        kernel_args = {}
+
+    records = []
+    for system in systems:
+        mol = molecules.get_mol(system, basis, verbose=0)
+        for name in kernels:
+            fn = KERNELS[name](mol, **kernel_args.get(name, {}))
+            for nthreads in threads:
+                with lib.with_omp_threads(nthreads):
+                    timing = time_kernel(fn, repeat, warmup, memory)
+                record = {'kernel': name, 'system': system,
+                          'basis': str(mol.basis), 'nao': mol.nao,
+                          'threads': nthreads}
+                record.update(timing)
+                records.append(record)
+                log.note('%-18s %-12s nao=%-5d threads=%-3d wall %.4f s (median %.4f s)',
+                         name, system, mol.nao, nthreads, timing['wall_min'],
+                         timing['wall_median'])
+            fn = None
+    return {'format': FORMAT_VERSION, 'meta': metadata(), 'records': records}
+
+def save(results, filename):
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=1)
+
+def load(filename):
+    with open(filename, 'r') as f:
+        results = json.load(f)
+    if results.get('format') != FORMAT_VERSION:
+        raise ValueError('Unsupported benchmark results format %s in %s' %
+                         (results.get('format'), filename))
+    return results
+
+def _record_key(record):
+    return (record['kernel'], record['system'], record['basis'], record['threads'])
+
+def compare(ref, new, tol=0.1, key='wall_min'):
+    '''Compare two results dicts (or filenames).
+
+    Returns a list of (kernel, system, basis, threads, ref_time, new_time,
+    ratio, status) for the records found in both results.  status is
+    "slower" if new_time > ref_time * (1+tol), "faster" if
+    new_time < ref_time / (1+tol), and "same" otherwise.
+    '''
+    if isinstance(ref, str):
+        ref = load(ref)
+    if isinstance(new, str):
+        new = load(new)
+    ref_records = dict((_record_key(r), r) for r in ref['records'])
+    table = []
+    for r in new['records']:
+        k = _record_key(r)
+        if k not in ref_records:
+            continue
+        t0 = ref_records[k][key]
+        t1 = r[key]
+        ratio = t1 / t0 if t0 > 0 else float('inf')
+        if ratio > 1 + tol:
+            status = 'slower'
+        elif ratio < 1 / (1 + tol):
+            status = 'faster'
+        else:
+            status = 'same'
+        table.append(k + (t0, t1, ratio, status))
+    return table
+
+def format_comparison(table):
+    lines = ['%-18s %-12s %-10s %7s %10s %10s %7s' %
+             ('kernel', 'system', 'basis', 'threads', 'ref', 'new', 'ratio')]
+    for kernel, system, basis, threads, t0, t1, ratio, status in table:
+        lines.append('%-18s %-12s %-10s %7d %10.4f %10.4f %7.3f %s' %
+                     (kernel, system, basis, threads, t0, t1, ratio,
+                      '' if status == 'same' else status))
+    return '\n'.join(lines)
@@ -0,0 +1,96 @@
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Benchmark kernels
+
+Each kernel is a function kernel(mol, **kwargs) which prepares the input
+(not timed) and returns a function without arguments to be timed.
+'''
+
+import numpy
+from pyscf import scf
+from pyscf import ao2mo
+
+def vhf_direct(mol, hermi=1):
+    '''Direct-SCF J/K build scf._vhf.direct for the initial guess density'''
+    from pyscf.scf import _vhf
+    mf = scf.RHF(mol)
+    dm = mf.get_init_guess(mol, 'minao')
+    vhfopt = mf.init_direct_scf(mol)
+    def run():
+        return _vhf.direct(dm, mol._atm, mol._bas, mol._env, vhfopt, hermi,
+                           mol.cart)
+    return run
+
+def nr_rks(mol, xc='b3lyp', grids_level=3):
+    '''XC potential dft.numint.nr_rks for the initial guess density'''
+    from pyscf import dft
+    mf = dft.RKS(mol)
+    mf.grids.level = grids_level
+    mf.grids.build(with_non0tab=True)
+    dm = mf.get_init_guess(mol, 'minao')
+    ni = mf._numint
+    def run():
+        return ni.nr_rks(mol, mf.grids, xc, dm, max_memory=mf.max_memory)
+    return run
+
+def df_get_jk(mol, auxbasis=None):
+    '''Density fitting J/K build df.df_jk.get_jk (the 3-index tensor is
+    built in advance)'''
+    from pyscf import df
+    from pyscf.df import df_jk
+    dfobj = df.DF(mol, auxbasis).build()
+    dm = scf.hf.get_init_guess(mol, 'minao')
+    def run():
+        return df_jk.get_jk(dfobj, dm, hermi=1)
+    return run
+
+def ccsd_update_amps(mol, frozen=None):
+    '''One CCSD iteration cc.ccsd.update_amps with the MP2 amplitudes'''
+    from pyscf import cc
+    mf = scf.RHF(mol).run(conv_tol=1e-8)
+    mycc = cc.CCSD(mf, frozen=frozen)
+    eris = mycc.ao2mo()
+    t1, t2 = mycc.get_init_guess(eris)
+    def run():
+        return mycc.update_amps(t1, t2, eris)
+    return run
+
+def fci_contract_2e(mol, ncas=8, nelecas=8, seed=1):
+    '''FCI sigma vector fci.direct_spin1.contract_2e in a (nelecas, ncas)
+    active space around the HOMO-LUMO gap'''
+    from pyscf.fci import direct_spin1, cistring
+    mf = scf.RHF(mol).run(conv_tol=1e-8)
+    ncore = mol.nelectron // 2 - nelecas // 2
+    mo = mf.mo_coeff[:,ncore:ncore+ncas]
+    h1 = mo.T.dot(mf.get_hcore()).dot(mo)
+    eri = ao2mo.restore(1, ao2mo.full(mol, mo), ncas)
+    nelec = (nelecas//2, nelecas//2)
+    h2 = direct_spin1.absorb_h1e(h1, eri, ncas, nelec, .5)
+    link_index = direct_spin1._unpack(ncas, nelec, None)
+    na = cistring.num_strings(ncas, nelec[0])
+    ci0 = numpy.random.RandomState(seed).random_sample((na,na))
+    ci0 /= numpy.linalg.norm(ci0)
+    def run():
+        return direct_spin1.contract_2e(h2, ci0, ncas, nelec, link_index)
+    return run
+
+KERNELS = {
+    'vhf_direct': vhf_direct,
+    'nr_rks': nr_rks,
+    'df_get_jk': df_get_jk,
+    'ccsd_update_amps': ccsd_update_amps,
+    'fci_contract_2e': fci_contract_2e,
+}
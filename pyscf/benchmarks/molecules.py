@@ -0,0 +1,104 @@
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Parameterized molecule sets for benchmarks
+
+A system is specified by a string "name:param", eg "water:8" for a cluster
+of 8 water molecules, "alkane:6" for hexane or "carbonyl:Fe" for Fe(CO)5.
+'''
+
+import numpy
+from pyscf import gto
+
+DEFAULT_BASIS = {
+    'water': 'cc-pvdz',
+    'alkane': 'cc-pvdz',
+    'carbonyl': 'def2-svp',
+}
+
+def water_cluster(n, basis=DEFAULT_BASIS['water'], **kwargs):
+    '''A cluster of n water molecules placed on a cubic lattice with the
+    spacing 2.9 Angstrom'''
+    water = numpy.array([[0.,  0.   , 0.   ],
+                         [0., -0.757, 0.587],
+                         [0.,  0.757, 0.587]])
+    m = int(numpy.ceil(n**(1./3) - 1e-9))
+    atoms = []
+    for i in range(n):
+        shift = numpy.array((i % m, i // m % m, i // (m*m))) * 2.9
+        for symb, r in zip(('O', 'H', 'H'), water + shift):
+            atoms.append([symb, r])
+    return gto.M(atom=atoms, basis=basis, **kwargs)
+
+def alkane(n, basis=DEFAULT_BASIS['alkane'], **kwargs):
+    '''Linear alkane CnH(2n+2) in the all-trans conformation'''
+    rcc = 1.54
+    rch = 1.09
+    half_angle = numpy.radians(109.47) / 2
+    if n == 1:
+        d = rch / numpy.sqrt(3)
+        atoms = [['C', (0, 0, 0)], ['H', (d, d, d)], ['H', (-d, -d, d)],
+                 ['H', (-d, d, -d)], ['H', (d, -d, -d)]]
+        return gto.M(atom=atoms, basis=basis, **kwargs)
+
+    carbons = numpy.zeros((n, 3))
+    carbons[:,0] = numpy.arange(n) * rcc * numpy.sin(half_angle)
+    carbons[1::2,1] = rcc * numpy.cos(half_angle)
+    atoms = [['C', r] for r in carbons]
+    for i, r in enumerate(carbons):
+        # Two H atoms out of the carbon plane, opposite to the C-C bonds
+        side = -1 if i % 2 == 0 else 1
+        for sz in (1, -1):
+            u = numpy.array((0, side*numpy.cos(half_angle), sz*numpy.sin(half_angle)))
+            atoms.append(['H', r + rch * u])
+    # The fourth bond of the terminal carbons (tetrahedral: the unit vectors
+    # of the four bonds sum to zero)
+    for i, j in ((0, 1), (n-1, n-2)):
+        u = (carbons[j] - carbons[i]) / rcc
+        u += sum(atoms[n+2*i+k][1] - carbons[i] for k in range(2)) / rch
+        atoms.append(['H', carbons[i] - rch * u / numpy.linalg.norm(u)])
+    return gto.M(atom=atoms, basis=basis, **kwargs)
+
+# (ligand directions, metal-C bond length) of the closed-shell carbonyls
+_CARBONYLS = {
+    'Ni': (numpy.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]]) / numpy.sqrt(3), 1.82),
+    'Fe': (numpy.array([[0, 0, 1], [0, 0, -1], [1, 0, 0],
+                        [-.5, numpy.sqrt(.75), 0], [-.5, -numpy.sqrt(.75), 0]]), 1.82),
+    'Cr': (numpy.vstack((numpy.eye(3), -numpy.eye(3))), 1.92),
+}
+
+def carbonyl(metal, basis=DEFAULT_BASIS['carbonyl'], **kwargs):
+    '''Transition metal carbonyl complexes Ni(CO)4, Fe(CO)5 or Cr(CO)6'''
+    rco = 1.14
+    directions, rmc = _CARBONYLS[metal]
+    atoms = [[metal, (0, 0, 0)]]
+    for u in directions:
+        atoms.append(['C', rmc * u])
+        atoms.append(['O', (rmc+rco) * u])
+    return gto.M(atom=atoms, basis=basis, **kwargs)
+
+SYSTEMS = {
+    'water': (water_cluster, int),
+    'alkane': (alkane, int),
+    'carbonyl': (carbonyl, str),
+}
+
+def get_mol(system, basis=None, **kwargs):
+    '''Build the molecule for the system specification "name:param"'''
+    name, param = system.split(':')
+    builder, param_type = SYSTEMS[name]
+    if basis is None:
+        basis = DEFAULT_BASIS[name]
+    return builder(param_type(param), basis=basis, **kwargs)
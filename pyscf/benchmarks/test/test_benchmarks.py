@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import copy
+import tempfile
+import unittest
+import numpy
+from pyscf import lib
+from pyscf import benchmarks
+from pyscf.benchmarks import molecules, harness
+
+class KnownValues(unittest.TestCase):
+    def test_molecules(self):
+        mol = molecules.get_mol('water:5', basis='sto-3g')
+        self.assertEqual(mol.natm, 15)
+        self.assertEqual(mol.nelectron, 50)
+
+        mol = molecules.get_mol('alkane:4', basis='sto-3g')
+        self.assertEqual(mol.natm, 14)
+        r = mol.atom_coords(unit='Angstrom')
+        dist = numpy.linalg.norm(r[:,None] - r, axis=2)
+        dist[numpy.diag_indices(mol.natm)] = 10
+        self.assertAlmostEqual(dist[:4,:4].min(), 1.54, 9)
+        self.assertAlmostEqual(dist[4:,:4].min(axis=1).max(), 1.09, 9)
+        self.assertTrue(dist[4:,4:].min() > 1.5)
+
+        for metal, natm in (('Ni', 9), ('Fe', 11), ('Cr', 13)):
+            mol = molecules.get_mol('carbonyl:'+metal, basis='sto-3g')
+            self.assertEqual(mol.natm, natm)
+            self.assertEqual(mol.spin, 0)
+
+    def test_run_and_compare(self):
+        results = benchmarks.run(kernels=['vhf_direct', 'fci_contract_2e'],
+                                 systems=['water:1'], basis='6-31g',
+                                 threads=[1, 2], repeat=2, verbose=0,
+                                 kernel_args={'fci_contract_2e': {'ncas': 6, 'nelecas': 6}})
+        self.assertEqual(len(results['records']), 4)
+        rec = results['records'][0]
+        self.assertEqual(len(rec['wall']), 2)
+        self.assertTrue(rec['wall_min'] <= rec['wall_median'])
+        self.assertTrue(rec['peak_traced_mb'] > 0)
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as f:
+            benchmarks.save(results, f.name)
+            ref = benchmarks.load(f.name)
+        self.assertEqual(ref['records'], results['records'])
+
+        new = copy.deepcopy(ref)
+        new['records'][0]['wall_min'] *= 2
+        new['records'][1]['wall_min'] *= .5
+        table = benchmarks.compare(ref, new, tol=.1)
+        self.assertEqual([row[-1] for row in table],
+                         ['slower', 'faster', 'same', 'same'])
+        self.assertTrue('slower' in harness.format_comparison(table))
+
+
+if __name__ == "__main__":
+    print("Tests for benchmarks")
+    unittest.main()
@@ -22,10 +22,14 @@ RCCSD for real integrals
 (ij|kl) = (ji|kl) = (kl|ij) = ...
 '''
 
+import os
 import time
+import tempfile
+import copy
 import ctypes
 from functools import reduce
 import numpy
+import h5py
 from pyscf import gto
 from pyscf import lib
 from pyscf.lib import logger
@@ -42,7 +46,7 @@ MEMORYMIN = getattr(__config__, 'cc_ccsd_memorymin', 2000)
 # t1: ia
 # t2: ijab
 def kernel(mycc, eris=None, t1=None, t2=None, max_cycle=50, tol=1e-8,
-           tolnormt=1e-6, verbose=None):
+           tolnormt=1e-6, verbose=None, start_cycle=0):
     log = logger.new_logger(mycc, verbose)
     if eris is None:
         eris = mycc.ao2mo(mycc.mo_coeff)
@@ -64,9 +68,41 @@ def kernel(mycc, eris=None, t1=None, t2=None, max_cycle=50, tol=1e-8,
     else:
         adiis = None
 
+    # Mixed precision: the amplitudes, the DIIS vectors and the large integral
+    # blocks are stored in float32 until norm(t1,t2) < mixed_precision_tol.
+    # update_amps is evaluated in double precision on the blocks it loads.
+    lowp = getattr(mycc, 'mixed_precision', False)
+    if lowp and not _mixed_precision_eligible(eris, t2):
+        log.warn('Mixed precision is only available for restricted CCSD '
+                 'with real integrals')
+        lowp = False
+    if lowp:
+        if _eris_dtype(eris) != numpy.float32:
+            # The double precision integrals are kept on disk and reloaded
+            # when switching to double precision
+            eris = _eris_to_lowp(mycc, eris)
+        t1 = t1.astype(numpy.float32)
+        t2 = t2.astype(numpy.float32)
+        # The float32 stage uses its own DIIS history. The DIIS object for
+        # the double precision stage is not touched until the switch.
+        adiis_fp64 = adiis
+        if adiis is not None:
+            adiis = _new_diis(mycc, adiis)
+            adiis.err_dtype = numpy.float32
+        log.info('Mixed precision CCSD: float32 until norm(t1,t2) < %g',
+                 mycc.mixed_precision_tol)
+
+    checkpoint_cycle = getattr(mycc, 'checkpoint_cycle', 0)
     conv = False
-    for istep in range(max_cycle):
-        t1new, t2new = mycc.update_amps(t1, t2, eris)
+    e_lowp = None
+    for istep in range(start_cycle, max_cycle):
+        if lowp:
+            t1new, t2new = mycc.update_amps(t1.astype(numpy.double),
+                                            t2.astype(numpy.double), eris)
+            t1new = t1new.astype(numpy.float32)
+            t2new = t2new.astype(numpy.float32)
+        else:
+            t1new, t2new = mycc.update_amps(t1, t2, eris)
         tmpvec = mycc.amplitudes_to_vector(t1new, t2new)
         tmpvec -= mycc.amplitudes_to_vector(t1, t2)
         normt = numpy.linalg.norm(tmpvec)
@@ -79,17 +115,153 @@ def kernel(mycc, eris=None, t1=None, t2=None, max_cycle=50, tol=1e-8,
         t1, t2 = t1new, t2new
         t1new = t2new = None
         t1, t2 = mycc.run_diis(t1, t2, istep, normt, eccsd-eold, adiis)
+        if lowp:
+            t1 = t1.astype(numpy.float32, copy=False)
+            t2 = t2.astype(numpy.float32, copy=False)
         eold, eccsd = eccsd, mycc.energy(t1, t2, eris)
         log.info('cycle = %d  E_corr(CCSD) = %.15g  dE = %.9g  norm(t1,t2) = %.6g',
                  istep+1, eccsd, eccsd - eold, normt)
         cput1 = log.timer('CCSD iter', *cput1)
-        if abs(eccsd-eold) < tol and normt < tolnormt:
+        if checkpoint_cycle and (istep+1) % checkpoint_cycle == 0:
+            save_checkpoint(mycc, 'ccsd', {'t1': t1, 't2': t2, 'e_corr': eccsd,
+                                           'cycle': istep+1})
+        if lowp:
+            if (normt < mycc.mixed_precision_tol or
+                (abs(eccsd-eold) < tol and normt < tolnormt)):
+                lowp = False
+                e_lowp = eccsd
+                eris = _eris_from_lowp(mycc, eris)
+                t1 = t1.astype(numpy.double)
+                t2 = t2.astype(numpy.double)
+                # Restart DIIS since the float32 vectors do not extrapolate
+                # toward the double precision solution
+                if adiis is not None:
+                    adiis = adiis_fp64
+                eccsd = mycc.energy(t1, t2, eris)
+                log.info('Switch to double precision at cycle %d  '
+                         'E_corr(CCSD) = %.15g', istep+1, eccsd)
+        elif abs(eccsd-eold) < tol and normt < tolnormt:
             conv = True
             break
+    if e_lowp is not None:
+        # This is the change of E_corr in the double precision iterations,
+        # not the error with respect to a full double precision calculation
+        log.note('Mixed precision CCSD: E_corr change after the switch to '
+                 'double precision = %.6g', eccsd - e_lowp)
+    if lowp:
+        # max_cycle was reached in the float32 stage. The amplitudes are
+        # returned in double precision for lambda, (T) and EOM.
+        log.warn('CCSD not converged in the float32 stage of mixed precision')
+        t1 = t1.astype(numpy.double)
+        t2 = t2.astype(numpy.double)
     log.timer('CCSD', *cput0)
     return conv, eccsd, t1, t2
 
 
+def _mixed_precision_eligible(eris, t2=None):
+    '''Mixed precision is only available for restricted CCSD with real
+    integrals.'''
+    if getattr(eris, 'OVOV', None) is not None:  # UCCSD integrals
+        return False
+    if numpy.iscomplexobj(eris.fock):
+        return False
+    if t2 is not None and (not isinstance(t2, numpy.ndarray) or
+                           numpy.iscomplexobj(t2)):
+        return False
+    return True
+
+def _new_diis(mycc, adiis):
+    '''A DIIS object with the settings of adiis and an empty history.'''
+    adiis1 = lib.diis.DIIS(mycc, None, incore=adiis.incore)
+    adiis1.space = adiis.space
+    adiis1.min_space = adiis.min_space
+    adiis1.memmap = adiis.memmap
+    return adiis1
+
+def _eris_dtype(eris):
+    ovvo = getattr(eris, 'ovvo', None)
+    if ovvo is None:
+        return None
+    return ovvo.dtype
+
+def _cast_eris(mycc, eris, dtype=numpy.float32):
+    '''A copy of eris with the large integral blocks (oovv, ovvo, ovov, ovvv,
+    vvvv) stored in dtype. Integrals on disk are copied to a new temporary
+    HDF5 file. The other blocks are loaded in memory so that the original
+    integral files can be released.
+    '''
+    log = logger.new_logger(mycc)
+    cput0 = (time.clock(), time.time())
+    eris1 = copy.copy(eris)
+    fswap = None
+    max_memory = max(MEMORYMIN, mycc.max_memory - lib.current_memory()[0])
+    for key in ('oovv', 'ovvo', 'ovov', 'ovvv', 'vvvv', 'oooo', 'ovoo'):
+        v = getattr(eris, key, None)
+        if v is None:
+            continue
+        if key in ('oooo', 'ovoo'):
+            setattr(eris1, key, numpy.asarray(v))
+        elif isinstance(v, numpy.ndarray):
+            setattr(eris1, key, v.astype(dtype))
+        else:
+            if fswap is None:
+                fswap = lib.H5TmpFile()
+            v1 = fswap.create_dataset(key, v.shape, dtype)
+            row_size = v[:1].size * 8
+            blksize = max(1, int(max_memory*.3e6 / row_size))
+            for p0, p1 in lib.prange(0, v.shape[0], blksize):
+                v1[p0:p1] = v[p0:p1]
+            setattr(eris1, key, v1)
+    for key in ('feri', 'feri1', 'feri2'):
+        if getattr(eris1, key, None) is not None:
+            setattr(eris1, key, None)
+    eris1.feri = fswap
+    log.timer('cast integrals to %s' % numpy.dtype(dtype), *cput0)
+    return eris1
+
+def _eris_to_lowp(mycc, eris, filename=None):
+    '''The float32 copy of eris for the mixed precision iterations. The
+    double precision integrals are saved in filename (or a temporary file)
+    by :func:`_dump_eris` and released, to be restored by
+    :func:`_eris_from_lowp`.  They are kept in memory if they cannot be
+    saved.
+    '''
+    ftmp = None
+    if filename is None:
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        filename = _dump_eris(mycc, eris, ftmp.name)
+    eris1 = _cast_eris(mycc, eris, numpy.float32)
+    if filename is None:
+        eris1._fp64 = eris
+    else:
+        eris1._fp64_file = filename
+        eris1._fp64_ftmp = ftmp
+        eris1._fp64_incore = isinstance(eris.ovvo, numpy.ndarray)
+    return eris1
+
+def _eris_from_lowp(mycc, eris):
+    '''The double precision integrals of the float32 eris created by
+    :func:`_eris_to_lowp`.  They are regenerated if eris was not created
+    by :func:`_eris_to_lowp`.'''
+    if getattr(eris, '_fp64', None) is not None:
+        return eris._fp64
+
+    eris1 = None
+    if getattr(eris, '_fp64_file', None) is not None:
+        eris1 = _load_eris(mycc, eris._fp64_file, eris.mo_coeff)
+    if eris1 is None:
+        return mycc.ao2mo(mycc.mo_coeff)
+
+    if eris._fp64_incore:
+        for key in ('oooo', 'ovoo', 'oovv', 'ovvo', 'ovov', 'ovvv', 'vvvv'):
+            if getattr(eris1, key, None) is not None:
+                setattr(eris1, key, numpy.asarray(getattr(eris1, key)))
+        eris1.feri = None
+    else:
+        # The temporary file is removed when eris1 is released
+        eris1._fp64_ftmp = eris._fp64_ftmp
+    return eris1
+
 def update_amps(mycc, t1, t2, eris):
     if mycc.cc2:
         raise NotImplementedError
@@ -526,36 +698,59 @@ def _contract_s4vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
         loadbuf = numpy.empty((blksize,blksize,nvirb,nvirb))
         fint = gto.moleintor.getints4c
 
-        for ip, (ish0, ish1, ni) in enumerate(sh_ranges):
-            for jsh0, jsh1, nj in sh_ranges[:ip]:
+        # Screening: |(ik|jl)| <= Q(i,k) Q(j,l).  A block (I,J) is skipped if
+        # max Q(I,:) * max Q(J,:) * max(|t2_AO[I,:]|, |t2_AO[J,:]|) < tol
+        screen_tol = getattr(mycc, 'vvvv_screen_tol', 0)
+        q_cond = _get_q_cond(ao2mopt, mol.nbas)
+        q_max = [q_cond[ish0:ish1].max() for ish0, ish1, ni in sh_ranges]
+        t2_max = [abs(x2[:,ao_loc[ish0]:ao_loc[ish1]]).max()
+                  for ish0, ish1, ni in sh_ranges]
+        eri_cache = _get_vvvv_ao_cache(mycc, mol, sh_ranges)
+        nskip = ntot = ncached = 0
+
+        def load_eri(ish0, ish1, jsh0, jsh1):
+            key = (ish0, ish1, jsh0, jsh1)
+            if key in eri_cache['blocks']:
+                return eri_cache['blocks'][key], True
+            i0, i1 = ao_loc[ish0], ao_loc[ish1]
+            j0, j1 = ao_loc[jsh0], ao_loc[jsh1]
+            if ish0 == jsh0:
+                eri = fint(intor, mol._atm, mol._bas, mol._env,
+                           shls_slice=(ish0,ish1,ish0,ish1), aosym='s4',
+                           ao_loc=ao_loc, cintopt=ao2mopt._cintopt, out=eribuf)
+                eri = lib.unpack_tril(eri, axis=0)
+            else:
                 eri = fint(intor, mol._atm, mol._bas, mol._env,
                            shls_slice=(ish0,ish1,jsh0,jsh1), aosym='s2kl',
                            ao_loc=ao_loc, cintopt=ao2mopt._cintopt, out=eribuf)
-                i0, i1 = ao_loc[ish0], ao_loc[ish1]
-                j0, j1 = ao_loc[jsh0], ao_loc[jsh1]
-                tmp = numpy.ndarray((i1-i0,nvirb,j1-j0,nvirb), buffer=loadbuf)
-                _ccsd.libcc.CCload_eri(tmp.ctypes.data_as(ctypes.c_void_p),
-                                       eri.ctypes.data_as(ctypes.c_void_p),
-                                       (ctypes.c_int*4)(i0, i1, j0, j1),
-                                       ctypes.c_int(nvirb))
-                contract_blk_(tmp, i0, i1, j0, j1)
-                time0 = log.timer_debug1('AO-vvvv [%d:%d,%d:%d]' %
-                                         (ish0,ish1,jsh0,jsh1), *time0)
-
-            eri = fint(intor, mol._atm, mol._bas, mol._env,
-                       shls_slice=(ish0,ish1,ish0,ish1), aosym='s4',
-                       ao_loc=ao_loc, cintopt=ao2mopt._cintopt, out=eribuf)
-            i0, i1 = ao_loc[ish0], ao_loc[ish1]
-            eri = lib.unpack_tril(eri, axis=0)
-            tmp = numpy.ndarray((i1-i0,nvirb,i1-i0,nvirb), buffer=loadbuf)
+            tmp = numpy.ndarray((i1-i0,nvirb,j1-j0,nvirb), buffer=loadbuf)
             _ccsd.libcc.CCload_eri(tmp.ctypes.data_as(ctypes.c_void_p),
                                    eri.ctypes.data_as(ctypes.c_void_p),
-                                   (ctypes.c_int*4)(i0, i1, i0, i1),
+                                   (ctypes.c_int*4)(i0, i1, j0, j1),
                                    ctypes.c_int(nvirb))
-            eri = None
-            contract_blk_(tmp, i0, i1, i0, i1)
-            time0 = log.timer_debug1('AO-vvvv [%d:%d,%d:%d]' %
-                                     (ish0,ish1,ish0,ish1), *time0)
+            if eri_cache['mem'] + tmp.nbytes*1e-6 < eri_cache['max_memory']:
+                eri_cache['blocks'][key] = tmp.copy()
+                eri_cache['mem'] += tmp.nbytes * 1e-6
+            return tmp, False
+
+        for ip, (ish0, ish1, ni) in enumerate(sh_ranges):
+            for jp, (jsh0, jsh1, nj) in enumerate(sh_ranges[:ip+1]):
+                ntot += 1
+                if q_max[ip] * q_max[jp] * max(t2_max[ip], t2_max[jp]) < screen_tol:
+                    nskip += 1
+                    continue
+                tmp, cached = load_eri(ish0, ish1, jsh0, jsh1)
+                ncached += cached
+                contract_blk_(tmp, ao_loc[ish0], ao_loc[ish1],
+                              ao_loc[jsh0], ao_loc[jsh1])
+                tmp = None
+                time0 = log.timer_debug1('AO-vvvv [%d:%d,%d:%d]' %
+                                         (ish0,ish1,jsh0,jsh1), *time0)
+        eri_cache['stats'][0] += nskip
+        eri_cache['stats'][1] += ntot
+        log.debug('AO-direct vvvv: %d/%d blocks skipped by screening (%.1f%%), '
+                  '%d blocks from cache (%.0f MB)', nskip, ntot,
+                  nskip*100./max(1, ntot), ncached, eri_cache['mem'])
 
     else:
         nvir_pair = nvirb * (nvirb+1) // 2
@@ -574,7 +769,8 @@ def _contract_s4vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
             i0, i1 = v_slice
             off0 = i0*(i0+1)//2
             off1 = i1*(i1+1)//2
-            return numpy.asarray(vvvv[off0:off1], order='C')
+            # vvvv may be stored in float32 (mixed precision CCSD)
+            return numpy.asarray(vvvv[off0:off1], dtype=numpy.double, order='C')
 
         tril2sq = lib.square_mat_in_trilu_indices(nvira)
         loadbuf = numpy.empty((blksize,blksize,nvirb,nvirb))
@@ -595,6 +791,29 @@ def _contract_s4vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
             time0 = log.timer_debug1('vvvv [%d:%d]'%(i0,i1), *time0)
     return Ht2.reshape(t2.shape)
 
+def _get_q_cond(ao2mopt, nbas):
+    '''Schwarz bounds sqrt(max|(ij|ij)|) of shell pairs'''
+    data = ctypes.cast(ao2mopt._this.contents.q_cond,
+                       ctypes.POINTER(ctypes.c_double))
+    return numpy.ctypeslib.as_array(data, shape=(nbas,nbas)).copy()
+
+def _get_vvvv_ao_cache(mycc, mol, sh_ranges):
+    '''AO integral blocks of the AO-direct vvvv contraction kept across
+    iterations, up to mycc.vvvv_cache_memory (MB). The cache is dropped
+    when the geometry, the basis or the shell partition (which depends on
+    the available memory) changes.'''
+    sh_ranges = tuple(tuple(x) for x in sh_ranges)
+    key = (mol.nbas, mol.nao_nr(), lib.fp(mol._env), lib.fp(mol._bas),
+           sh_ranges)
+    cache = getattr(mycc, '_vvvv_ao_cache', None)
+    if cache is None or cache['key'] != key:
+        cache = {'key': key, 'sh_ranges': sh_ranges, 'blocks': {}, 'mem': 0,
+                 'max_memory': getattr(mycc, 'vvvv_cache_memory', 0),
+                 # Accumulated (skipped, total) blocks of the screening
+                 'stats': [0, 0]}
+        mycc._vvvv_ao_cache = cache
+    return cache
+
 def _contract_s1vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
     '''Ht2 = numpy.einsum('ijcd,acdb->ijab', t2, vvvv)
     where vvvv can be real or complex and no permutation symmetry is available in vvvv.
@@ -731,6 +950,97 @@ def restore_from_diis_(mycc, diis_file, inplace=True):
         mycc.diis = adiis
     return mycc
 
+def checkpoint_filename(mycc):
+    '''The file for the restart checkpoints. By default it is the chkfile
+    with the suffix ".restart".'''
+    if getattr(mycc, 'checkpoint_file', None):
+        return mycc.checkpoint_file
+    elif mycc.chkfile:
+        return mycc.chkfile + '.restart'
+    else:
+        return None
+
+def save_checkpoint(mycc, key, data):
+    '''Atomically write data to the key of the checkpoint file'''
+    filename = checkpoint_filename(mycc)
+    if filename is None:
+        logger.warn(mycc, 'chkfile not specified. Checkpoint %s not saved', key)
+        return mycc
+    lib.chkfile.dump_atomic(filename, key, data)
+    logger.debug(mycc, 'Checkpoint %s saved in %s', key, filename)
+    return mycc
+
+def load_checkpoint(mycc, key, restart=True):
+    '''Load the checkpoint data from the file given by restart (or the
+    default checkpoint file if restart is True). Returns None if the
+    checkpoint is not found.'''
+    if isinstance(restart, str):
+        filename = restart
+    else:
+        filename = checkpoint_filename(mycc)
+    if filename is None or not h5py.is_hdf5(filename):
+        logger.warn(mycc, 'Checkpoint file %s not found', filename)
+        return None
+    data = lib.chkfile.load(filename, key)
+    if data is None:
+        logger.warn(mycc, 'Checkpoint %s not found in %s', key, filename)
+    else:
+        logger.info(mycc, 'Restart from checkpoint %s in %s', key, filename)
+    return data
+
+def _dump_eris(mycc, eris, filename):
+    '''Save the MO integrals for restart. The integrals are written to a
+    temporary file first which is renamed to filename at the end.'''
+    if type(eris) is not _ChemistsERIs:
+        logger.debug(mycc, 'MO integrals are not saved for restart')
+        return None
+
+    cput0 = (time.clock(), time.time())
+    tmpname = filename + '.tmp'
+    max_memory = max(MEMORYMIN, mycc.max_memory - lib.current_memory()[0])
+    with h5py.File(tmpname, 'w') as f:
+        for key in ('mo_coeff', 'fock', 'mo_energy'):
+            f[key] = getattr(eris, key)
+        f['e_hf'] = eris.e_hf
+        f['nocc'] = eris.nocc
+        for key in ('oooo', 'ovoo', 'oovv', 'ovvo', 'ovov', 'ovvv', 'vvvv'):
+            v = getattr(eris, key)
+            if v is None:
+                continue
+            v1 = f.create_dataset(key, v.shape, v.dtype)
+            blksize = max(1, int(max_memory*.3e6 / (v[:1].size*8)))
+            for p0, p1 in lib.prange(0, v.shape[0], blksize):
+                v1[p0:p1] = v[p0:p1]
+    os.rename(tmpname, filename)
+    logger.timer(mycc, 'save MO integrals for restart', *cput0)
+    return filename
+
+def _load_eris(mycc, filename, mo_coeff=None):
+    '''Load the MO integrals saved by :func:`_dump_eris`. Returns None if
+    the integrals do not match the orbitals mo_coeff (by default the
+    correlated orbitals of mycc).'''
+    if not h5py.is_hdf5(filename):
+        return None
+    # H5TmpFile closes the file when eris.feri is released. The file is kept.
+    f = lib.H5TmpFile(filename, 'r')
+    if mo_coeff is None:
+        mo_coeff = _mo_without_core(mycc, mycc.mo_coeff)
+    if (f['mo_coeff'].shape != mo_coeff.shape or
+        abs(f['mo_coeff'][()] - mo_coeff).max() > 1e-10):
+        f.close()
+        logger.info(mycc, 'MO integrals in %s do not match the orbitals', filename)
+        return None
+
+    eris = _ChemistsERIs(mycc.mol)
+    for key in ('mo_coeff', 'fock', 'mo_energy', 'e_hf', 'nocc'):
+        setattr(eris, key, f[key][()])
+    for key in ('oooo', 'ovoo', 'oovv', 'ovvo', 'ovov', 'ovvv', 'vvvv'):
+        if key in f:
+            setattr(eris, key, f[key])
+    eris.feri = f
+    logger.info(mycc, 'Load MO integrals from %s', filename)
+    return eris
+
 def get_t1_diagnostic(t1):
     '''Returns the t1 amplitude norm, normalized by number of correlated electrons.'''
     nelectron = 2 * t1.shape[0]
@@ -838,10 +1148,32 @@ class CCSD(lib.StreamObject):
             The self consistent damping parameter.
         direct : bool
             AO-direct CCSD. Default is False.
+        vvvv_screen_tol : float
+            For AO-direct CCSD, blocks of AO integrals are skipped if the
+            product of the Schwarz bounds and the max of the AO amplitudes
+            is below this threshold.  Default is 0 (no screening).
+        vvvv_cache_memory : float
+            For AO-direct CCSD, memory (in MB) to keep the AO integral
+            blocks across iterations.  Default is 0 (no cache).
+        checkpoint_cycle : int
+            Save t1, t2 (and lambda) to the checkpoint file every
+            checkpoint_cycle iterations.  The MO integrals are saved once in
+            the file checkpoint_file + '.eris'.  Calculations can be resumed
+            with kernel(restart=True).  Default is 0 (no checkpoint).
+        checkpoint_file : str
+            File for restart checkpoints.  Default is chkfile + '.restart'.
         async_io : bool
             Allow for asynchronous function execution. Default is True.
         incore_complete : bool
             Avoid all I/O (also for DIIS). Default is False.
+        mixed_precision : bool
+            Store the amplitudes, the DIIS vectors and the integrals oovv,
+            ovvo, ovov, ovvv, vvvv in float32 until norm(t1,t2) drops below
+            mixed_precision_tol.  The remaining iterations run in double
+            precision.  Default is False.
+        mixed_precision_tol : float
+            Threshold of norm(t1,t2) to switch to double precision.
+            Default is 1e-4.
         level_shift : float
             A shift on virtual orbital energies to stablize the CCSD iteration
         frozen : int or list
@@ -886,6 +1218,14 @@ class CCSD(lib.StreamObject):
     async_io = getattr(__config__, 'cc_ccsd_CCSD_async_io', True)
     incore_complete = getattr(__config__, 'cc_ccsd_CCSD_incore_complete', False)
     cc2 = getattr(__config__, 'cc_ccsd_CCSD_cc2', False)
+    # Screening threshold and integral cache (in MB) for AO-direct vvvv
+    vvvv_screen_tol = getattr(__config__, 'cc_ccsd_CCSD_vvvv_screen_tol', 0)
+    vvvv_cache_memory = getattr(__config__, 'cc_ccsd_CCSD_vvvv_cache_memory', 0)
+    mixed_precision = getattr(__config__, 'cc_ccsd_CCSD_mixed_precision', False)
+    mixed_precision_tol = getattr(__config__, 'cc_ccsd_CCSD_mixed_precision_tol', 1e-4)
+    # Save restart checkpoints every checkpoint_cycle iterations (0 to disable)
+    checkpoint_cycle = getattr(__config__, 'cc_ccsd_CCSD_checkpoint_cycle', 0)
+    checkpoint_file = getattr(__config__, 'cc_ccsd_CCSD_checkpoint_file', None)
 
     def __init__(self, mf, frozen=None, mo_coeff=None, mo_occ=None):
         if isinstance(mf, gto.Mole):
@@ -935,7 +1275,10 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
         keys = set(('max_cycle', 'conv_tol', 'iterative_damping',
                     'conv_tol_normt', 'diis', 'diis_space', 'diis_file',
                     'diis_start_cycle', 'diis_start_energy_diff', 'direct',
-                    'async_io', 'incore_complete', 'cc2'))
+                    'async_io', 'incore_complete', 'cc2', 'mixed_precision',
+                    'mixed_precision_tol', 'vvvv_screen_tol',
+                    'vvvv_cache_memory', 'checkpoint_cycle',
+                    'checkpoint_file'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     @property
@@ -986,6 +1329,11 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
         #log.info('diis_file = %s', self.diis_file)
         log.info('diis_start_cycle = %d', self.diis_start_cycle)
         log.info('diis_start_energy_diff = %g', self.diis_start_energy_diff)
+        if self.mixed_precision:
+            log.info('mixed_precision_tol = %g', self.mixed_precision_tol)
+        if self.checkpoint_cycle:
+            log.info('checkpoint every %d cycles in %s', self.checkpoint_cycle,
+                     checkpoint_filename(self))
         log.info('max_memory %d MB (current use %d MB)',
                  self.max_memory, lib.current_memory()[0])
         if (log.verbose >= logger.DEBUG1 and
@@ -1008,7 +1356,8 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
         eia = mo_e[:nocc,None] - mo_e[None,nocc:]
 
         t1 = eris.fock[:nocc,nocc:] / eia
-        t2 = numpy.empty((nocc,nocc,nvir,nvir), dtype=eris.ovov.dtype)
+        t2 = numpy.empty((nocc,nocc,nvir,nvir),
+                         dtype=numpy.result_type(eris.ovov.dtype, numpy.double))
         max_memory = self.max_memory - lib.current_memory()[0]
         blksize = int(min(nvir, max(BLKMIN, max_memory*.3e6/8/(nocc**2*nvir+1))))
         emp2 = 0
@@ -1031,9 +1380,17 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
     _add_vvvv = _add_vvvv
     update_amps = update_amps
 
-    def kernel(self, t1=None, t2=None, eris=None):
-        return self.ccsd(t1, t2, eris)
-    def ccsd(self, t1=None, t2=None, eris=None):
+    def kernel(self, t1=None, t2=None, eris=None, restart=None):
+        return self.ccsd(t1, t2, eris, restart)
+    def ccsd(self, t1=None, t2=None, eris=None, restart=None):
+        '''Ground-state CCSD.
+
+        Kwargs:
+            restart : bool or str
+                Resume the iterations from the checkpoint saved in the file
+                :func:`checkpoint_filename` (or the file given by restart).
+                The MO integrals saved along with the checkpoint are reused.
+        '''
         assert(self.mo_coeff is not None)
         assert(self.mo_occ is not None)
 
@@ -1041,8 +1398,32 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
             self.check_sanity()
         self.dump_flags()
 
+        start_cycle = 0
+        eris_file = None
+        if restart or self.checkpoint_cycle:
+            if isinstance(restart, str):
+                eris_file = restart + '.eris'
+            elif checkpoint_filename(self):
+                eris_file = checkpoint_filename(self) + '.eris'
+        if restart:
+            chk = load_checkpoint(self, 'ccsd', restart)
+            if chk is not None:
+                t1 = chk['t1'].astype(numpy.result_type(chk['t1'], numpy.double))
+                t2 = chk['t2'].astype(numpy.result_type(chk['t2'], numpy.double))
+                start_cycle = int(chk['cycle'])
+            if eris is None and eris_file is not None:
+                eris = _load_eris(self, eris_file)
+
         if eris is None:
             eris = self.ao2mo(self.mo_coeff)
+            saved = None
+            if self.checkpoint_cycle and eris_file is not None:
+                saved = _dump_eris(self, eris, eris_file)
+            if (self.mixed_precision and
+                _mixed_precision_eligible(eris, t2)):
+                # Release the double precision integrals. They are reloaded
+                # from disk in kernel when switching to double precision.
+                eris = _eris_to_lowp(self, eris, saved)
 
         self.e_hf = getattr(eris, 'e_hf', None)
         if self.e_hf is None:
@@ -1051,7 +1432,7 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
         self.converged, self.e_corr, self.t1, self.t2 = \
                 kernel(self, eris, t1, t2, max_cycle=self.max_cycle,
                        tol=self.conv_tol, tolnormt=self.conv_tol_normt,
-                       verbose=self.verbose)
+                       verbose=self.verbose, start_cycle=start_cycle)
         self._finalize()
         return self.e_corr, self.t1, self.t2
 
@@ -1067,13 +1448,24 @@ http://sunqm.net/pyscf/code-rule.html#api-rules for the details of API conventio
 
     as_scanner = as_scanner
     restore_from_diis_ = restore_from_diis_
+    save_checkpoint = save_checkpoint
+    load_checkpoint = load_checkpoint
 
 
     def solve_lambda(self, t1=None, t2=None, l1=None, l2=None,
-                     eris=None):
+                     eris=None, restart=None):
         from pyscf.cc import ccsd_lambda
         if t1 is None: t1 = self.t1
         if t2 is None: t2 = self.t2
+        if restart:
+            chk = load_checkpoint(self, 'ccsd_lambda', restart)
+            if chk is not None:
+                l1, l2 = chk['l1'], chk['l2']
+            if eris is None:
+                if isinstance(restart, str):
+                    eris = _load_eris(self, restart + '.eris')
+                elif checkpoint_filename(self):
+                    eris = _load_eris(self, checkpoint_filename(self) + '.eris')
         if eris is None: eris = self.ao2mo(self.mo_coeff)
         self.converged_lambda, self.l1, self.l2 = \
                 ccsd_lambda.kernel(self, eris, t1, t2, l1, l2,
@@ -1437,7 +1829,10 @@ def _make_eris_outcore(mycc, mo_coeff=None):
     if not mycc.direct:
         max_memory = max(MEMORYMIN, mycc.max_memory-lib.current_memory()[0])
         eris.feri2 = lib.H5TmpFile()
-        ao2mo.full(mol, orbv, eris.feri2, max_memory=max_memory, verbose=log)
+        # vvvv is read by blocks of full rows in _contract_s4vvvv_t2
+        chunks = (max(1, min(nvpair, int(4e6/8/nvpair))), nvpair)
+        ao2mo.full(mol, orbv, eris.feri2, max_memory=max_memory, verbose=log,
+                   chunks=chunks)
         eris.vvvv = eris.feri2['eri_mo']
         cput1 = log.timer_debug1('transforming vvvv', *cput1)
 
@@ -1454,37 +1849,22 @@ def _make_eris_outcore(mycc, mo_coeff=None):
     log.debug1('blksize %d', blksize)
     cput2 = cput1
 
-    fload = ao2mo.outcore._load_from_h5g
-    buf = numpy.empty((blksize*nocc,nao_pair))
-    buf_prefetch = numpy.empty_like(buf)
-    def load(buf_prefetch, p0, rowmax):
-        if p0 < rowmax:
-            p1 = min(rowmax, p0+blksize)
-            fload(fswap['0'], p0*nocc, p1*nocc, buf_prefetch)
-
+    iter_rows = ao2mo.outcore.iter_rows
+    sync = not mycc.async_io
     outbuf = numpy.empty((blksize*nocc,nmo**2))
-    with lib.call_in_background(load, sync=not mycc.async_io) as prefetch:
-        prefetch(buf_prefetch, 0, nocc)
-        for p0, p1 in lib.prange(0, nocc, blksize):
-            buf, buf_prefetch = buf_prefetch, buf
-            prefetch(buf_prefetch, p1, nocc)
-
-            nrow = (p1 - p0) * nocc
-            dat = ao2mo._ao2mo.nr_e2(buf[:nrow], mo_coeff, (0,nmo,0,nmo),
-                                     's4', 's1', out=outbuf, ao_loc=ao_loc)
-            save_occ_frac(p0, p1, dat)
-        cput2 = log.timer_debug1('transforming oopp', *cput2)
-
-        prefetch(buf_prefetch, nocc, nmo)
-        for p0, p1 in lib.prange(0, nvir, blksize):
-            buf, buf_prefetch = buf_prefetch, buf
-            prefetch(buf_prefetch, nocc+p1, nmo)
-
-            nrow = (p1 - p0) * nocc
-            dat = ao2mo._ao2mo.nr_e2(buf[:nrow], mo_coeff, (0,nmo,0,nmo),
-                                     's4', 's1', out=outbuf, ao_loc=ao_loc)
-            save_vir_frac(p0, p1, dat)
-            cput2 = log.timer_debug1('transforming ovpp [%d:%d]'%(p0,p1), *cput2)
+    rows = iter_rows(fswap['0'], blksize*nocc, 0, nocc*nocc, sync)
+    for (p0, p1), buf in zip(lib.prange(0, nocc, blksize), rows):
+        dat = ao2mo._ao2mo.nr_e2(buf, mo_coeff, (0,nmo,0,nmo),
+                                 's4', 's1', out=outbuf, ao_loc=ao_loc)
+        save_occ_frac(p0, p1, dat)
+    cput2 = log.timer_debug1('transforming oopp', *cput2)
+
+    rows = iter_rows(fswap['0'], blksize*nocc, nocc*nocc, nmo*nocc, sync)
+    for (p0, p1), buf in zip(lib.prange(0, nvir, blksize), rows):
+        dat = ao2mo._ao2mo.nr_e2(buf, mo_coeff, (0,nmo,0,nmo),
+                                 's4', 's1', out=outbuf, ao_loc=ao_loc)
+        save_vir_frac(p0, p1, dat)
+        cput2 = log.timer_debug1('transforming ovpp [%d:%d]'%(p0,p1), *cput2)
 
     cput1 = log.timer_debug1('transforming oppp', *cput1)
     log.timer('CCSD integral transformation', *cput0)
@@ -59,6 +59,7 @@ def kernel(mycc, eris=None, t1=None, t2=None, l1=None, l2=None,
         adiis = None
     cput0 = log.timer('CCSD lambda initialization', *cput0)
 
+    checkpoint_cycle = getattr(mycc, 'checkpoint_cycle', 0)
     conv = False
     for istep in range(max_cycle):
         l1new, l2new = fupdate(mycc, t1, t2, l1, l2, eris, imds)
@@ -69,6 +70,9 @@ def kernel(mycc, eris=None, t1=None, t2=None, l1=None, l2=None,
         l1, l2 = mycc.run_diis(l1, l2, istep, normt, 0, adiis)
         log.info('cycle = %d  norm(lambda1,lambda2) = %.6g', istep+1, normt)
         cput0 = log.timer('CCSD iter', *cput0)
+        if checkpoint_cycle and (istep+1) % checkpoint_cycle == 0:
+            ccsd.save_checkpoint(mycc, 'ccsd_lambda',
+                                 {'l1': l1, 'l2': l2, 'cycle': istep+1})
         if normt < tol:
             conv = True
             break
@@ -22,16 +22,45 @@ RHF-CCSD(T) for real integrals
 
 import time
 import ctypes
+import tempfile
 import numpy
+import h5py
 from pyscf import lib
 from pyscf import symm
 from pyscf.lib import logger
 from pyscf.cc import _ccsd
+from pyscf import __config__
+
+# Number of processes for the triples contraction
+NPROC = getattr(__config__, 'cc_ccsd_t_nproc', 1)
+# Whether to distribute the triples over the MPI processes of
+# mpi4py.MPI.COMM_WORLD when mpi4py is available
+WITH_MPI = getattr(__config__, 'cc_ccsd_t_mpi', False)
 
 # t3 as ijkabc
 
 # JCP 94, 442 (1991); DOI:10.1063/1.460359.  Error in Eq (1), should be [ia] >= [jb] >= [kc]
-def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
+def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE, nproc=None,
+           comm=None):
+    '''(T) correction
+
+    Kwargs:
+        nproc : int
+            Number of spawned worker processes (Python 3 only).  The (a,b)
+            virtual blocks are distributed to the workers through a task
+            queue.  vvop, t2 and vooo are passed to the workers in a
+            temporary HDF5 file.  Each worker reads only the slices of vvop
+            of its blocks but holds its own copy of t2 and vooo.  Spawned
+            processes import the __main__ module, so a script using nproc
+            needs the "if __name__ == '__main__':" guard.
+        comm : MPI communicator
+            If given, the (a,b) blocks are distributed over the MPI
+            processes and the energy is reduced with allreduce.  All
+            processes need to call this function with the same input.
+            Only the contraction is distributed.  Every MPI process builds
+            the complete vvop (nvir**2*nocc*nmo) in memory or in its own
+            scratch file.
+    '''
     cpu1 = cpu0 = (time.clock(), time.time())
     log = logger.new_logger(mycc, verbose)
     if t1 is None: t1 = mycc.t1
@@ -40,8 +69,30 @@ def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
     nocc, nvir = t1.shape
     nmo = nocc + nvir
 
+    if nproc is None:
+        nproc = NPROC
+    if nproc > 1:
+        import multiprocessing
+        if not hasattr(multiprocessing, 'get_context'):
+            log.warn('CCSD(T) with nproc > 1 requires Python 3. '
+                     'Triples are computed in this process.')
+            nproc = 1
+    if comm is None and WITH_MPI:
+        try:
+            from mpi4py import MPI
+            comm = MPI.COMM_WORLD
+        except ImportError:
+            pass
+    if comm is not None and comm.Get_size() == 1:
+        comm = None
+
     dtype = numpy.result_type(t1, t2, eris.ovoo.dtype)
-    if mycc.incore_complete:
+    if nproc > 1:
+        # The file is reopened by name in each worker process
+        tmpfile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        ftmp = lib.H5TmpFile(tmpfile.name, 'w')
+        eris_vvop = ftmp.create_dataset('vvop', (nvir,nvir,nocc,nmo), dtype)
+    elif mycc.incore_complete:
         ftmp = None
         eris_vvop = numpy.zeros((nvir,nvir,nocc,nmo), dtype)
     else:
@@ -71,55 +122,47 @@ def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
         drv = _ccsd.libcc.CCsd_t_zcontract
     else:
         drv = _ccsd.libcc.CCsd_t_contract
+    tensors = (drv, mo_energy, t1T, t2T, vooo, fvo, nocc, nvir, nirrep,
+               o_ir_loc, v_ir_loc, oo_ir_loc, orbsym)
     et_sum = numpy.zeros(1, dtype=dtype)
     def contract(a0, a1, b0, b1, cache):
-        cache_row_a, cache_col_a, cache_row_b, cache_col_b = cache
-        drv(et_sum.ctypes.data_as(ctypes.c_void_p),
-            mo_energy.ctypes.data_as(ctypes.c_void_p),
-            t1T.ctypes.data_as(ctypes.c_void_p),
-            t2T.ctypes.data_as(ctypes.c_void_p),
-            vooo.ctypes.data_as(ctypes.c_void_p),
-            fvo.ctypes.data_as(ctypes.c_void_p),
-            ctypes.c_int(nocc), ctypes.c_int(nvir),
-            ctypes.c_int(a0), ctypes.c_int(a1),
-            ctypes.c_int(b0), ctypes.c_int(b1),
-            ctypes.c_int(nirrep),
-            o_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            v_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            oo_ir_loc.ctypes.data_as(ctypes.c_void_p),
-            orbsym.ctypes.data_as(ctypes.c_void_p),
-            cache_row_a.ctypes.data_as(ctypes.c_void_p),
-            cache_col_a.ctypes.data_as(ctypes.c_void_p),
-            cache_row_b.ctypes.data_as(ctypes.c_void_p),
-            cache_col_b.ctypes.data_as(ctypes.c_void_p))
+        _contract_block(et_sum, tensors, a0, a1, b0, b1, cache)
         cpu2[:] = log.timer_debug1('contract %d:%d,%d:%d'%(a0,a1,b0,b1), *cpu2)
 
     # The rest 20% memory for cache b
     mem_now = lib.current_memory()[0]
     max_memory = max(0, mycc.max_memory - mem_now)
-    bufsize = (max_memory*.5e6/8-nocc**3*3*lib.num_threads())/(nocc*nmo)  #*.5 for async_io
+    if nproc > 1:
+        # Each worker process holds its own cache
+        max_memory /= nproc
+        nthreads = max(1, lib.num_threads() // nproc)
+    else:
+        nthreads = lib.num_threads()
+    bufsize = (max_memory*.5e6/8-nocc**3*3*nthreads)/(nocc*nmo)  #*.5 for async_io
     bufsize *= .5  #*.5 upper triangular part is loaded
     bufsize *= .8  #*.8 for [a0:a1]/[b0:b1] partition
     bufsize = max(8, bufsize)
     log.debug('max_memory %d MB (%d MB in use)', max_memory, mem_now)
-    with lib.call_in_background(contract, sync=not mycc.async_io) as async_contract:
-        for a0, a1 in reversed(list(lib.prange_tril(0, nvir, bufsize))):
-            cache_row_a = numpy.asarray(eris_vvop[a0:a1,:a1], order='C')
-            if a0 == 0:
-                cache_col_a = cache_row_a
-            else:
-                cache_col_a = numpy.asarray(eris_vvop[:a0,a0:a1], order='C')
-            async_contract(a0, a1, a0, a1, (cache_row_a,cache_col_a,
-                                            cache_row_a,cache_col_a))
-
-            for b0, b1 in lib.prange_tril(0, a0, bufsize/8):
-                cache_row_b = numpy.asarray(eris_vvop[b0:b1,:b1], order='C')
-                if b0 == 0:
-                    cache_col_b = cache_row_b
-                else:
-                    cache_col_b = numpy.asarray(eris_vvop[:b0,b0:b1], order='C')
-                async_contract(a0, a1, b0, b1, (cache_row_a,cache_col_a,
-                                                cache_row_b,cache_col_b))
+    if nproc > 1 or comm is not None:
+        if nproc > 1:
+            ftmp['t2T'] = t2T
+            ftmp['vooo'] = vooo
+            ftmp.close()
+            eris_vvop = tmpfile.name
+        et_sum[0] = _contract_parallel(eris_vvop, tensors, dtype, bufsize,
+                                       nproc, nthreads, comm, log)
+        cpu1 = log.timer_debug1('CCSD(T) triples (%d processes)' % nproc, *cpu1)
+    else:
+        with lib.call_in_background(contract, sync=not mycc.async_io) as async_contract:
+            for a0, a1 in reversed(list(lib.prange_tril(0, nvir, bufsize))):
+                cache_row_a, cache_col_a = _load_vvop(eris_vvop, a0, a1)
+                async_contract(a0, a1, a0, a1, (cache_row_a,cache_col_a,
+                                                cache_row_a,cache_col_a))
+
+                for b0, b1 in lib.prange_tril(0, a0, bufsize/8):
+                    cache_row_b, cache_col_b = _load_vvop(eris_vvop, b0, b1)
+                    async_contract(a0, a1, b0, b1, (cache_row_a,cache_col_a,
+                                                    cache_row_b,cache_col_b))
 
     t2 = restore_t2_inplace(t2T)
     et_sum *= 2
@@ -131,6 +174,157 @@ def kernel(mycc, eris, t1=None, t2=None, verbose=logger.NOTE):
     log.note('CCSD(T) correction = %.15g', et)
     return et
 
+def _contract_block(et_sum, tensors, a0, a1, b0, b1, cache):
+    '''Add the contributions of the virtual triplets a in [a0:a1],
+    b in [b0:b1] (c <= b <= a) to et_sum'''
+    (drv, mo_energy, t1T, t2T, vooo, fvo, nocc, nvir, nirrep,
+     o_ir_loc, v_ir_loc, oo_ir_loc, orbsym) = tensors
+    cache_row_a, cache_col_a, cache_row_b, cache_col_b = cache
+    drv(et_sum.ctypes.data_as(ctypes.c_void_p),
+        mo_energy.ctypes.data_as(ctypes.c_void_p),
+        t1T.ctypes.data_as(ctypes.c_void_p),
+        t2T.ctypes.data_as(ctypes.c_void_p),
+        vooo.ctypes.data_as(ctypes.c_void_p),
+        fvo.ctypes.data_as(ctypes.c_void_p),
+        ctypes.c_int(nocc), ctypes.c_int(nvir),
+        ctypes.c_int(a0), ctypes.c_int(a1),
+        ctypes.c_int(b0), ctypes.c_int(b1),
+        ctypes.c_int(nirrep),
+        o_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        v_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        oo_ir_loc.ctypes.data_as(ctypes.c_void_p),
+        orbsym.ctypes.data_as(ctypes.c_void_p),
+        cache_row_a.ctypes.data_as(ctypes.c_void_p),
+        cache_col_a.ctypes.data_as(ctypes.c_void_p),
+        cache_row_b.ctypes.data_as(ctypes.c_void_p),
+        cache_col_b.ctypes.data_as(ctypes.c_void_p))
+
+def _load_vvop(eris_vvop, a0, a1):
+    cache_row = numpy.asarray(eris_vvop[a0:a1,:a1], order='C')
+    if a0 == 0:
+        cache_col = cache_row
+    else:
+        cache_col = numpy.asarray(eris_vvop[:a0,a0:a1], order='C')
+    return cache_row, cache_col
+
+def _triples_cost(a0, a1, b0, b1):
+    '''Number of the virtual triplets c <= b <= a for a in [a0:a1] and
+    b in [b0:b1]'''
+    a = numpy.arange(a0, a1)
+    b = numpy.arange(b0, b1)
+    return int(((b[:,None] <= a) * (b[:,None] + 1)).sum())
+
+def _triples_tasks(nvir, bufsize, ntasks):
+    '''Group the (a,b) blocks of the serial loop into tasks
+    (a0, a1, [(b0,b1), ...]) of about the same cost.  The blocks of one task
+    share the same a-block, which is loaded once.  The tasks are sorted by
+    cost in descending order for dynamic scheduling.
+    '''
+    blocks = []
+    for a0, a1 in lib.prange_tril(0, nvir, bufsize):
+        bblocks = [(a0, a1)] + list(lib.prange_tril(0, a0, bufsize/8))
+        costs = [_triples_cost(a0, a1, b0, b1) for b0, b1 in bblocks]
+        blocks.append((a0, a1, bblocks, costs))
+    target = sum(sum(x[3]) for x in blocks) / float(max(1, ntasks))
+
+    tasks = []
+    for a0, a1, bblocks, costs in blocks:
+        group = []
+        cost = 0
+        for bblk, c in zip(bblocks, costs):
+            group.append(bblk)
+            cost += c
+            if cost >= target:
+                tasks.append((cost, (a0, a1, group)))
+                group = []
+                cost = 0
+        if group:
+            tasks.append((cost, (a0, a1, group)))
+    tasks.sort(key=lambda x: -x[0])
+    return tasks
+
+def _distribute_tasks(tasks, nworkers, rank):
+    '''Greedily assign the tasks (sorted by cost) to the least loaded
+    worker.  The assignment is deterministic on all MPI processes.'''
+    load = numpy.zeros(nworkers)
+    mine = []
+    for cost, task in tasks:
+        k = numpy.argmin(load)
+        load[k] += cost
+        if k == rank:
+            mine.append((cost, task))
+    return mine
+
+def _contract_parallel(eris_vvop, tensors, dtype, bufsize, nproc, nthreads,
+                       comm, log):
+    '''eris_vvop is an array, an HDF5 dataset (nproc == 1) or the name of
+    the HDF5 file which holds the datasets vvop, t2T and vooo (nproc > 1).'''
+    nvir = tensors[7]
+    nworkers = nproc
+    if comm is not None:
+        nworkers *= comm.Get_size()
+    tasks = _triples_tasks(nvir, bufsize, nworkers * 4)
+    if comm is not None:
+        tasks = _distribute_tasks(tasks, comm.Get_size(), comm.Get_rank())
+    log.debug('CCSD(T) %d tasks, %d processes, %d threads per process',
+              len(tasks), nworkers, nthreads)
+    tasks = [task for cost, task in tasks]
+
+    # The partial sums are collected in the order of tasks so that the
+    # result is deterministic.
+    if nproc > 1:
+        import multiprocessing
+        # The C driver is passed by name. t2T and vooo are read from the
+        # file in the workers.
+        tensors = (tensors[0].__name__,) + tensors[1:3] + (None, None) + tensors[5:]
+        # Forking after the OpenMP runtime was initialized in this process
+        # may hang the workers
+        pool = multiprocessing.get_context('spawn').Pool(
+            nproc, initializer=_contract_init,
+            initargs=(eris_vvop, tensors, dtype, nthreads))
+        try:
+            et = sum(pool.imap(_contract_task, tasks))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _contract_init(eris_vvop, tensors, dtype, nthreads)
+        try:
+            et = sum(_contract_task(task) for task in tasks)
+        finally:
+            _ccsd_t_args[:] = []
+
+    if comm is not None:
+        et = comm.allreduce(et)
+    return et
+
+# (vvop, tensors, dtype, nthreads) of the current process
+_ccsd_t_args = []
+def _contract_init(eris_vvop, tensors, dtype, nthreads):
+    '''Open the vvop file (if given by name) once in each process'''
+    if isinstance(eris_vvop, str):
+        f = h5py.File(eris_vvop, 'r')
+        eris_vvop = f['vvop']
+        if isinstance(tensors[0], str):
+            drv = getattr(_ccsd.libcc, tensors[0])
+            tensors = ((drv,) + tensors[1:3] + (f['t2T'][:], f['vooo'][:]) +
+                       tensors[5:])
+    _ccsd_t_args[:] = [eris_vvop, tensors, dtype, nthreads]
+
+def _contract_task(task):
+    eris_vvop, tensors, dtype, nthreads = _ccsd_t_args
+    a0, a1, bblocks = task
+    et_sum = numpy.zeros(1, dtype=dtype)
+    with lib.with_omp_threads(nthreads):
+        cache_a = _load_vvop(eris_vvop, a0, a1)
+        for b0, b1 in bblocks:
+            if (b0, b1) == (a0, a1):
+                cache_b = cache_a
+            else:
+                cache_b = _load_vvop(eris_vvop, b0, b1)
+            _contract_block(et_sum, tensors, a0, a1, b0, b1, cache_a + cache_b)
+    return et_sum[0]
+
 def _sort_eri(mycc, eris, nocc, nvir, vvop, log):
     cpu1 = (time.clock(), time.time())
     mol = mycc.mol
@@ -30,7 +30,7 @@ from pyscf import __config__
 
 
 def kernel(eom, nroots=1, koopmans=False, guess=None, left=False,
-           eris=None, imds=None, **kwargs):
+           eris=None, imds=None, restart=None, **kwargs):
     cput0 = (time.clock(), time.time())
     log = logger.Logger(eom.stdout, eom.verbose)
     if eom.verbose >= logger.WARN:
@@ -44,6 +44,25 @@ def kernel(eom, nroots=1, koopmans=False, guess=None, left=False,
 
     size = eom.vector_size()
     nroots = min(nroots, size)
+
+    # The trial vectors of the Davidson iterations are saved in the checkpoint
+    # file of the CC object. They are used as the initial guess on restart.
+    chk_key = 'eom/' + eom.__class__.__name__
+    if left:
+        chk_key += '_left'
+    if restart and guess is None:
+        chk = ccsd.load_checkpoint(eom._cc, chk_key, restart)
+        if chk is not None and len(chk['x0']) >= nroots:
+            guess = list(chk['x0'][:nroots])
+    if eom.checkpoint_cycle:
+        def callback(envs):
+            if envs['icyc'] % eom.checkpoint_cycle == eom.checkpoint_cycle - 1:
+                ccsd.save_checkpoint(eom._cc, chk_key,
+                                     {'x0': np.asarray(envs['x0']),
+                                      'e': envs['e'], 'cycle': envs['icyc']+1})
+    else:
+        callback = None
+
     if guess is not None:
         user_guess = True
         for g in guess:
@@ -69,14 +88,16 @@ def kernel(eom, nroots=1, koopmans=False, guess=None, left=False,
             return lib.linalg_helper._eigs_cmplx2real(w, v, idx, real_system)
         conv, es, vs = eig(matvec, guess, precond, pick=eig_close_to_init_guess,
                            tol=eom.conv_tol, max_cycle=eom.max_cycle,
-                           max_space=eom.max_space, nroots=nroots, verbose=log)
+                           max_space=eom.max_space, nroots=nroots,
+                           callback=callback, verbose=log)
     else:
         def pickeig(w, v, nroots, envs):
             real_idx = np.where(abs(w.imag) < 1e-3)[0]
             return lib.linalg_helper._eigs_cmplx2real(w, v, real_idx, real_system)
         conv, es, vs = eig(matvec, guess, precond, pick=pickeig,
                            tol=eom.conv_tol, max_cycle=eom.max_cycle,
-                           max_space=eom.max_space, nroots=nroots, verbose=log)
+                           max_space=eom.max_space, nroots=nroots,
+                           callback=callback, verbose=log)
 
     if eom.verbose >= logger.INFO:
         for n, en, vn, convn in zip(range(nroots), es, vs, conv):
@@ -107,6 +128,8 @@ class EOM(lib.StreamObject):
         self.max_cycle = getattr(__config__, 'eom_rccsd_EOM_max_cycle', cc.max_cycle)
         self.conv_tol = getattr(__config__, 'eom_rccsd_EOM_conv_tol', cc.conv_tol)
         self.partition = getattr(__config__, 'eom_rccsd_EOM_partition', None)
+        self.checkpoint_cycle = getattr(__config__, 'eom_rccsd_EOM_checkpoint_cycle',
+                                        getattr(cc, 'checkpoint_cycle', 0))
 
 ##################################################
 # don't modify the following attributes, they are not input options
@@ -123,6 +146,8 @@ class EOM(lib.StreamObject):
         logger.info(self, 'max_cycle = %d', self.max_cycle)
         logger.info(self, 'conv_tol = %s', self.conv_tol)
         logger.info(self, 'partition = %s', self.partition)
+        if self.checkpoint_cycle:
+            logger.info(self, 'checkpoint every %d cycles', self.checkpoint_cycle)
         #logger.info(self, 'nocc = %d', self.nocc)
         #logger.info(self, 'nmo = %d', self.nmo)
         logger.info(self, 'max_memory %d MB (current use %d MB)',
@@ -226,7 +251,7 @@ def perturbed_ccsd_kernel(eom, nroots=1, koopmans=False, right_guess=None,
 ########################################
 
 def ipccsd(eom, nroots=1, left=False, koopmans=False, guess=None,
-           partition=None, eris=None, imds=None):
+           partition=None, eris=None, imds=None, restart=None):
     '''Calculate (N-1)-electron charged excitations via IP-EOM-CCSD.
 
     Kwargs:
@@ -241,12 +266,16 @@ def ipccsd(eom, nroots=1, left=False, koopmans=False, guess=None,
             overlap.
         guess : list of ndarray
             List of guess vectors to use for targeting via overlap.
+        restart : bool or str
+            Use the trial vectors saved in the checkpoint file (see
+            checkpoint_cycle) as the initial guess.
     '''
     if partition is not None:
         eom.partition = partition.lower()
         assert eom.partition in ['mp','full']
     eom.converged, eom.e, eom.v \
-            = kernel(eom, nroots, koopmans, guess, left, eris=eris, imds=imds)
+            = kernel(eom, nroots, koopmans, guess, left, eris=eris, imds=imds,
+                     restart=restart)
     return eom.e, eom.v
 
 def ipccsd_star(eom, nroots=1, koopmans=False, right_guess=None,
@@ -591,13 +620,14 @@ class EOMIP_Ta(EOMIP):
 ########################################
 
 def eaccsd(eom, nroots=1, left=False, koopmans=False, guess=None,
-           partition=None, eris=None, imds=None):
+           partition=None, eris=None, imds=None, restart=None):
     '''Calculate (N+1)-electron charged excitations via EA-EOM-CCSD.
 
     Args:
         See also ipccd()
     '''
-    return ipccsd(eom, nroots, left, koopmans, guess, partition, eris, imds)
+    return ipccsd(eom, nroots, left, koopmans, guess, partition, eris, imds,
+                  restart)
 
 def eaccsd_star(eom, nroots=1, koopmans=False, right_guess=None,
         left_guess=None, eris=None, imds=None, **kwargs):
@@ -1049,24 +1079,27 @@ def eeccsd(eom, nroots=1, koopmans=False, guess=None, eris=None, imds=None):
 
 
 def eomee_ccsd_singlet(eom, nroots=1, koopmans=False, guess=None,
-                       eris=None, imds=None, diag=None):
+                       eris=None, imds=None, diag=None, restart=None):
     '''EOM-EE-CCSD singlet
     '''
     eom.converged, eom.e, eom.v \
-            = kernel(eom, nroots, koopmans, guess, eris=eris, imds=imds, diag=diag)
+            = kernel(eom, nroots, koopmans, guess, eris=eris, imds=imds,
+                     restart=restart, diag=diag)
     return eom.e, eom.v
 
 def eomee_ccsd_triplet(eom, nroots=1, koopmans=False, guess=None,
-                       eris=None, imds=None, diag=None):
+                       eris=None, imds=None, diag=None, restart=None):
     '''EOM-EE-CCSD triplet
     '''
-    return eomee_ccsd_singlet(eom, nroots, koopmans, guess, eris, imds, diag)
+    return eomee_ccsd_singlet(eom, nroots, koopmans, guess, eris, imds, diag,
+                              restart)
 
 def eomsf_ccsd(eom, nroots=1, koopmans=False, guess=None,
-               eris=None, imds=None, diag=None):
+               eris=None, imds=None, diag=None, restart=None):
     '''Spin flip EOM-EE-CCSD
     '''
-    return eomee_ccsd_singlet(eom, nroots, koopmans, guess, eris, imds, diag)
+    return eomee_ccsd_singlet(eom, nroots, koopmans, guess, eris, imds, diag,
+                              restart)
 
 vector_to_amplitudes_ee = vector_to_amplitudes_singlet = ccsd.vector_to_amplitudes
 amplitudes_to_vector_ee = amplitudes_to_vector_singlet = ccsd.amplitudes_to_vector
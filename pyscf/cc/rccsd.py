@@ -168,14 +168,16 @@ class RCCSD(ccsd.CCSD):
     Ground-state CCSD is performed in optimized ccsd.CCSD and EOM is performed here.
     '''
 
-    def kernel(self, t1=None, t2=None, eris=None, mbpt2=False):
-        return self.ccsd(t1, t2, eris, mbpt2)
-    def ccsd(self, t1=None, t2=None, eris=None, mbpt2=False):
+    def kernel(self, t1=None, t2=None, eris=None, mbpt2=False, restart=None):
+        return self.ccsd(t1, t2, eris, mbpt2, restart)
+    def ccsd(self, t1=None, t2=None, eris=None, mbpt2=False, restart=None):
         '''Ground-state CCSD.
 
         Kwargs:
             mbpt2 : bool
                 Use one-shot MBPT2 approximation to CCSD.
+            restart : bool or str
+                Resume the iterations from the checkpoint file.
         '''
         if mbpt2:
             pt = mp2.MP2(self._scf, self.frozen, self.mo_coeff, self.mo_occ)
@@ -186,7 +188,7 @@ class RCCSD(ccsd.CCSD):
 
         if eris is None:
             eris = self.ao2mo(self.mo_coeff)
-        return ccsd.CCSD.ccsd(self, t1, t2, eris)
+        return ccsd.CCSD.ccsd(self, t1, t2, eris, restart)
 
     def ao2mo(self, mo_coeff=None):
         nmo = self.nmo
@@ -77,6 +77,30 @@ class KnownValues(unittest.TestCase):
         e = ccsd_t.kernel(mycc, eris, t1, t2)
         self.assertAlmostEqual(e, -45.96028705175308, 9)
 
+        e = ccsd_t.kernel(mycc, eris, t1, t2, nproc=3)
+        self.assertAlmostEqual(e, -45.96028705175308, 9)
+
+        mycc.incore_complete = False
+        e = ccsd_t.kernel(mycc, eris, t1, t2, nproc=2)
+        self.assertAlmostEqual(e, -45.96028705175308, 9)
+
+    def test_triples_tasks(self):
+        nvir = 40
+        tasks = ccsd_t._triples_tasks(nvir, 100, 16)
+        costs = [cost for cost, task in tasks]
+        self.assertEqual(sum(costs), ccsd_t._triples_cost(0, nvir, 0, nvir))
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        blocks = [(a0, a1, b0, b1) for cost, (a0, a1, bblocks) in tasks
+                  for b0, b1 in bblocks]
+        ref = []
+        for a0, a1 in lib.prange_tril(0, nvir, 100):
+            ref.append((a0, a1, a0, a1))
+            ref.extend([(a0, a1, b0, b1) for b0, b1 in lib.prange_tril(0, a0, 100/8.)])
+        self.assertEqual(sorted(blocks), sorted(ref))
+
+        mine = [ccsd_t._distribute_tasks(tasks, 3, rank) for rank in range(3)]
+        self.assertEqual(sorted(sum(mine, [])), sorted(tasks))
+
     def test_ccsd_t_symm(self):
         e3a = ccsd_t.kernel(mcc, mcc.ao2mo())
         self.assertAlmostEqual(e3a, -0.003060022611584471, 9)
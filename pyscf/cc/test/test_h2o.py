@@ -73,6 +73,36 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(mcc.ecc, -0.2133432312951, 8)
         self.assertAlmostEqual(abs(mcc.t2).sum(), 5.63970279799556984, 6)
 
+    def test_ccsd_mixed_precision(self):
+        mcc = cc.ccsd.CC(mf)
+        mcc.conv_tol = 1e-9
+        mcc.conv_tol_normt = 1e-7
+        mcc.mixed_precision = True
+        mcc.kernel()
+        self.assertTrue(mcc.converged)
+        self.assertEqual(mcc.t2.dtype, numpy.double)
+        self.assertAlmostEqual(mcc.ecc, -0.2133432312951, 8)
+
+        eris = mcc.ao2mo()
+        eris32 = ccsd._cast_eris(mcc, eris, numpy.float32)
+        self.assertEqual(eris32.ovvv.dtype, numpy.float32)
+        self.assertEqual(eris32.ovoo.dtype, numpy.double)
+        # The double precision integrals are restored from disk
+        eris32 = ccsd._eris_to_lowp(mcc, eris)
+        self.assertTrue(getattr(eris32, '_fp64', None) is None)
+        eris64 = ccsd._eris_from_lowp(mcc, eris32)
+        self.assertEqual(eris64.ovvv.dtype, numpy.double)
+        self.assertAlmostEqual(abs(eris64.ovvv - eris.ovvv).max(), 0, 14)
+        self.assertAlmostEqual(abs(eris64.vvvv - eris.vvvv).max(), 0, 14)
+        eris32 = eris64 = None
+        mcc.mixed_precision_tol = 1e-3
+        mcc.kernel(eris=eris)
+        self.assertAlmostEqual(mcc.ecc, -0.2133432312951, 8)
+
+        mcc.incore_complete = True
+        mcc.kernel()
+        self.assertAlmostEqual(mcc.ecc, -0.2133432312951, 8)
+
     def test_ccsd_frozen(self):
         mcc = cc.ccsd.CC(mf, frozen=range(1))
         mcc.conv_tol = 1e-10
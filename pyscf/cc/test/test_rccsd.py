@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import tempfile
 from functools import reduce
 import unittest
@@ -29,6 +30,7 @@ from pyscf import ao2mo
 from pyscf import mp
 from pyscf.cc import ccsd
 from pyscf.cc import rccsd
+from pyscf.ao2mo import _ao2mo
 
 mol = gto.Mole()
 mol.verbose = 7
@@ -140,6 +142,90 @@ class KnownValues(unittest.TestCase):
         cc1.kernel(t1=numpy.zeros_like(mycc.t1))
         self.assertAlmostEqual(cc1.e_corr, -0.13539788638119823, 8)
 
+    def test_ao_direct_screening(self):
+        cc1 = cc.CCSD(mf)
+        cc1.direct = True
+        cc1.conv_tol = 1e-10
+        cc1.vvvv_cache_memory = 200
+        cc1.kernel(t1=numpy.zeros_like(mycc.t1))
+        self.assertAlmostEqual(cc1.e_corr, -0.13539788638119823, 8)
+        self.assertTrue(len(cc1._vvvv_ao_cache['blocks']) > 0)
+
+        orbv = mf.mo_coeff[:,mycc.nocc:]
+        t2 = lib.einsum('ijab,pa,qb->ijpq', mycc.t2, orbv, orbv)
+        eri = ao2mo.restore(1, mf._eri, mol.nao_nr())
+        ref = lib.einsum('ijcd,acbd->ijab', t2, eri)
+        cc1.vvvv_screen_tol = 0
+        vt2 = ccsd._contract_vvvv_t2(cc1, mol, None, t2)
+        self.assertAlmostEqual(abs(ref - vt2).max(), 0, 9)
+
+        tol = cc1.vvvv_screen_tol = 1e-2
+        cc1._vvvv_ao_cache = None
+        vt2 = ccsd._contract_vvvv_t2(cc1, mol, None, t2)
+        nskip, ntot = cc1._vvvv_ao_cache['stats']
+        self.assertTrue(0 < nskip < ntot)
+
+        # The error is bounded by the contributions of the skipped blocks.
+        # Each skipped term |t2_{ij,cd} (ac|bd)| is below tol.
+        ao_loc = mol.ao_loc_nr()
+        nao = ao_loc[-1]
+        ao2mopt = _ao2mo.AO2MOpt(mol, mol._add_suffix('int2e'),
+                                 'CVHFnr_schwarz_cond', 'CVHFsetnr_direct_scf')
+        q_cond = ccsd._get_q_cond(ao2mopt, mol.nbas)
+        x2 = t2.reshape(-1,nao,nao)
+        sh_ranges = cc1._vvvv_ao_cache['sh_ranges']
+        q_max = [q_cond[ish0:ish1].max() for ish0, ish1, ni in sh_ranges]
+        t2_max = [abs(x2[:,ao_loc[ish0]:ao_loc[ish1]]).max()
+                  for ish0, ish1, ni in sh_ranges]
+        skip = numpy.zeros((nao,nao), dtype=bool)
+        for ip, (ish0, ish1, ni) in enumerate(sh_ranges):
+            for jp, (jsh0, jsh1, nj) in enumerate(sh_ranges[:ip+1]):
+                if q_max[ip] * q_max[jp] * max(t2_max[ip], t2_max[jp]) < tol:
+                    i0, i1 = ao_loc[ish0], ao_loc[ish1]
+                    j0, j1 = ao_loc[jsh0], ao_loc[jsh1]
+                    skip[i0:i1,j0:j1] = skip[j0:j1,i0:i1] = True
+        terms = (abs(t2 * skip)[:,:,:,:,None,None] *
+                 abs(eri).transpose(1,3,0,2))
+        self.assertTrue(terms.max() < tol)
+        err_bound = lib.einsum('ijcd,acbd->ijab', abs(t2 * skip), abs(eri))
+        self.assertTrue(numpy.all(abs(ref - vt2) <= err_bound + 1e-12))
+        self.assertTrue(err_bound.max() < nao**2 * tol)
+
+    def test_checkpoint_restart(self):
+        ftmp = tempfile.NamedTemporaryFile()
+        cc1 = cc.CCSD(mf)
+        cc1.conv_tol = 1e-10
+        cc1.checkpoint_file = ftmp.name
+        cc1.checkpoint_cycle = 2
+        cc1.max_cycle = 5
+        cc1.kernel()
+        self.assertFalse(cc1.converged)
+        chk = lib.chkfile.load(ftmp.name, 'ccsd')
+        self.assertEqual(chk['cycle'], 4)
+
+        cc1 = cc.CCSD(mf)
+        cc1.conv_tol = 1e-10
+        cc1.checkpoint_file = ftmp.name
+        cc1.kernel(restart=True)
+        self.assertAlmostEqual(cc1.e_corr, -0.13539788638119823, 8)
+
+        cc1.checkpoint_cycle = 1
+        cc1.max_cycle = 3
+        cc1.solve_lambda()
+        cc1.max_cycle = 50
+        l1, l2 = cc1.solve_lambda(restart=True)
+        l1ref, l2ref = mycc.solve_lambda(mycc.t1, mycc.t2, eris=eris)
+        self.assertAlmostEqual(abs(l1 - l1ref).max(), 0, 6)
+
+        myeom = cc1.eomip_method()
+        myeom.max_cycle = 3
+        myeom.kernel(nroots=2)
+        self.assertEqual(lib.chkfile.load(ftmp.name, 'eom/EOMIP/cycle'), 3)
+        myeom.max_cycle = 50
+        e = myeom.kernel(nroots=2, restart=True)[0]
+        self.assertAlmostEqual(e[0], mycc.ipccsd(nroots=2)[0][0], 6)
+        os.remove(ftmp.name + '.eris')
+
     def test_incore_complete(self):
         cc1 = cc.CCSD(mf)
         cc1.incore_complete = True
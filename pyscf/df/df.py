@@ -20,8 +20,11 @@
 J-metric density fitting
 '''
 
+import os
 import time
 import copy
+import shutil
+import hashlib
 import tempfile
 import numpy
 import h5py
@@ -35,7 +38,7 @@ from pyscf.df import addons
 from pyscf.df import df_jk
 from pyscf.ao2mo import _ao2mo
 from pyscf.ao2mo.incore import _conc_mos, iden_coeffs
-from pyscf.ao2mo.outcore import _load_from_h5g
+from pyscf.ao2mo.outcore import _load_from_h5g, iter_rows
 from pyscf import __config__
 
 class DF(lib.StreamObject):
@@ -71,9 +74,26 @@ class DF(lib.StreamObject):
         blockdim : int
             When reading DF integrals from disk the chunk size to load.  It is
             used to improve IO performance.
+        loop_reuse_buffer : bool
+            When DF integrals are read from disk in :meth:`loop`, whether to
+            load the blocks into two buffers which are reused alternately.
+            If enabled, a block yielded by :meth:`loop` is overwritten when the
+            next block is requested, so the caller must not keep a reference
+            to it across iterations.  Default is False.
+        cache_dir : str or None
+            If specified, the DF integral tensor is looked up in (and saved
+            to) this directory.  Files are keyed by the geometry, the orbital
+            basis and the auxiliary basis, so repeated calculations on the
+            same system can skip the integral generation.
+        cache_size : float
+            The maximum size (in MB) of cache_dir.  The least recently used
+            tensors are removed when the cache exceeds this size.
     '''
 
     blockdim = getattr(__config__, 'df_df_DF_blockdim', 240)
+    loop_reuse_buffer = getattr(__config__, 'df_df_DF_loop_reuse_buffer', False)
+    cache_dir = getattr(__config__, 'df_df_DF_cache_dir', None)
+    cache_size = getattr(__config__, 'df_df_DF_cache_size', 20000)
 
     # Store DF tensor in a format compatible to pyscf-1.1 - pyscf-1.6
     _compatible_format = getattr(__config__, 'df_df_DF_compatible_format', False)
@@ -120,6 +140,9 @@ class DF(lib.StreamObject):
             log.info('_cderi_to_save = %s', self._cderi_to_save)
         else:
             log.info('_cderi_to_save = %s', self._cderi_to_save.name)
+        if self.cache_dir is not None:
+            log.info('cache_dir = %s  cache_size = %s MB',
+                     self.cache_dir, self.cache_size)
         return self
 
     def build(self):
@@ -138,6 +161,23 @@ class DF(lib.StreamObject):
         max_memory = self.max_memory - lib.current_memory()[0]
         int3c = mol._add_suffix('int3c2e')
         int2c = mol._add_suffix('int2c2e')
+
+        use_cache = (self.cache_dir is not None and
+                     not isinstance(self._cderi_to_save, str))
+        if use_cache:
+            cache_key = _cderi_cache_key(mol, auxmol, int3c, int2c)
+            cached = _cderi_cache_lookup(self.cache_dir, cache_key)
+            if cached is not None:
+                # The cached file may be evicted by other processes. It is
+                # loaded in memory or linked to _cderi_to_save.
+                incore_ok = nao_pair*naux*8/1e6 < .9*max_memory
+                cderi = _cderi_cache_fetch(cached, self._cderi_to_save.name,
+                                           incore_ok, log)
+                if cderi is not None:
+                    log.info('Load DF integrals from cache %s', cached)
+                    self._cderi = cderi
+                    return self
+
         if (nao_pair*naux*8/1e6 < .9*max_memory and
             not isinstance(self._cderi_to_save, str)):
             self._cderi = incore.cholesky_eri(mol, int3c=int3c, int2c=int2c,
@@ -154,6 +194,11 @@ class DF(lib.StreamObject):
                 log.warn('Value of _cderi is ignored. DF integrals will be '
                          'saved in file %s .', cderi)
 
+            if os.path.isfile(cderi) and os.stat(cderi).st_nlink > 1:
+                # cderi is a hard link to a cache entry. Unlink it so that
+                # the cache entry is not truncated.
+                os.remove(cderi)
+
             if self._compatible_format or isinstance(self._cderi_to_save, str):
                 outcore.cholesky_eri(mol, cderi, dataname='j3c',
                                      int3c=int3c, int2c=int2c, auxmol=auxmol,
@@ -166,6 +211,10 @@ class DF(lib.StreamObject):
                                        max_memory=max_memory, verbose=log)
             self._cderi = cderi
             log.timer_debug1('Generate density fitting integrals', *t0)
+
+        if use_cache:
+            _cderi_cache_store(self.cache_dir, cache_key, self._cderi,
+                               self.cache_size, log)
         return self
 
     def kernel(self, *args, **kwargs):
@@ -184,6 +233,10 @@ class DF(lib.StreamObject):
         return self
 
     def loop(self, blksize=None):
+        '''Iterate over the blocks of the DF tensor. When the tensor is stored
+        on disk, the next block is read in background while the current block
+        is being processed.
+        '''
         if self._cderi is None:
             self.build()
         if blksize is None:
@@ -195,6 +248,11 @@ class DF(lib.StreamObject):
                 for b0, b1 in self.prange(0, naoaux, blksize):
                     yield numpy.asarray(feri[b0:b1], order='C')
 
+            elif self.loop_reuse_buffer:
+                # Double buffers to avoid allocating memory for every block
+                for dat in iter_rows(feri, blksize):
+                    yield dat
+
             else:
                 if isinstance(feri, h5py.Group):
                     # starting from pyscf-1.7, DF tensor may be stored in
@@ -277,6 +335,101 @@ class DF(lib.StreamObject):
 GDF = DF
 
 
+def _cderi_cache_key(mol, auxmol, int3c='int3c2e', int2c='int2c2e'):
+    '''Content based key of the DF tensor. It depends on the geometry, the
+    orbital basis and the auxiliary basis (all encoded in _atm, _bas and _env)
+    as well as the integrals used to generate the tensor.'''
+    h = hashlib.sha1()
+    h.update(('%s:%s' % (int3c, int2c)).encode())
+    for m in (mol, auxmol):
+        h.update(numpy.asarray(m._atm, dtype=numpy.int32).tobytes())
+        h.update(numpy.asarray(m._bas, dtype=numpy.int32).tobytes())
+        h.update(numpy.asarray(m._env, dtype=numpy.double).tobytes())
+    return h.hexdigest()
+
+def _cderi_cache_lookup(cache_dir, key):
+    '''Return the cached DF tensor file of the given key or None. The
+    modification time of the file is updated for the LRU eviction.'''
+    filename = os.path.join(cache_dir, key + '.h5')
+    if os.path.isfile(filename):
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return filename
+    return None
+
+def _cderi_cache_fetch(filename, cderi_to_save, incore=True,
+                       verbose=logger.NOTE):
+    '''Load the cached DF tensor in memory (if incore) or make a private
+    copy of the cached file in cderi_to_save. The private copy is a hard
+    link when the file system supports it. Return None if the cached file
+    is not available anymore.'''
+    log = logger.new_logger(None, verbose)
+    try:
+        if incore:
+            with addons.load(filename, 'j3c') as feri:
+                if isinstance(feri, h5py.Group):
+                    naux = feri['0'].shape[0]
+                    return _load_from_h5g(feri, 0, naux)
+                else:
+                    return numpy.asarray(feri)
+
+        ftmp = cderi_to_save + '.tmp'
+        try:
+            os.link(filename, ftmp)
+        except OSError:
+            try:
+                shutil.copyfile(filename, ftmp)
+            except (IOError, OSError):
+                if os.path.isfile(ftmp):
+                    os.remove(ftmp)
+                raise
+        os.rename(ftmp, cderi_to_save)
+        return cderi_to_save
+    except (IOError, OSError, KeyError) as e:
+        log.debug('Failed to load DF integrals from cache %s: %s', filename, e)
+        return None
+
+def _cderi_cache_store(cache_dir, key, cderi, cache_size, verbose=logger.NOTE):
+    '''Save the DF tensor in the cache directory then remove the least
+    recently used files if the cache exceeds cache_size (in MB).'''
+    log = logger.new_logger(None, verbose)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    filename = os.path.join(cache_dir, key + '.h5')
+
+    # Write to a temporary file then rename it, so that other processes
+    # sharing the cache never see an incomplete file.
+    ftmp = tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False)
+    ftmp.close()
+    try:
+        if isinstance(cderi, numpy.ndarray):
+            with h5py.File(ftmp.name, 'w') as f:
+                f['j3c'] = cderi
+        else:
+            shutil.copyfile(cderi, ftmp.name)
+        os.rename(ftmp.name, filename)
+    except (IOError, OSError) as e:
+        log.warn('Failed to save DF integrals in cache %s: %s', cache_dir, e)
+        if os.path.isfile(ftmp.name):
+            os.remove(ftmp.name)
+        return None
+    log.debug('DF integrals saved in cache %s', filename)
+
+    files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir)
+             if f.endswith('.h5')]
+    files = sorted(files, key=os.path.getmtime)
+    size = sum(os.path.getsize(f) for f in files) / 1e6
+    for f in files:
+        if size <= cache_size or f == filename:
+            break
+        size -= os.path.getsize(f) / 1e6
+        log.debug('Remove %s from DF cache', f)
+        os.remove(f)
+    return filename
+
+
 class DF4C(DF):
     '''Relativistic 4-component'''
     def build(self):
@@ -85,6 +85,46 @@ class KnownValues(unittest.TestCase):
         eri1 = dfobj.get_eri()
         self.assertAlmostEqual(abs(eri0-eri1).max(), 0, 9)
 
+    def test_loop_reuse_buffer(self):
+        dfobj = df.DF(mol)
+        dfobj.max_memory = 0.01
+        dfobj.build()
+        self.assertTrue(isinstance(dfobj._cderi, str))
+        self.assertFalse(dfobj.loop_reuse_buffer)
+        ref = numpy.vstack([x for x in dfobj.loop(blksize=30)])
+        dfobj.loop_reuse_buffer = True
+        dat = numpy.vstack([x.copy() for x in dfobj.loop(blksize=30)])
+        self.assertAlmostEqual(abs(dat-ref).max(), 0, 12)
+
+    def test_cache_dir(self):
+        cache_dir = tempfile.mkdtemp()
+        dfobj = df.DF(mol)
+        dfobj.cache_dir = cache_dir
+        dfobj.build()
+        eri0 = dfobj.get_eri()
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        dfobj = df.DF(mol)
+        dfobj.cache_dir = cache_dir
+        dfobj.max_memory = 0.01
+        dfobj.build()
+        self.assertEqual(dfobj._cderi, dfobj._cderi_to_save.name)
+        eri1 = dfobj.get_eri()
+        self.assertAlmostEqual(abs(eri0-eri1).max(), 0, 9)
+
+        dfobj = df.DF(mol)
+        dfobj.cache_dir = cache_dir
+        dfobj.build()
+        self.assertTrue(isinstance(dfobj._cderi, numpy.ndarray))
+        eri1 = dfobj.get_eri()
+        self.assertAlmostEqual(abs(eri0-eri1).max(), 0, 9)
+
+        dfobj = df.DF(mol, auxbasis='weigend')
+        dfobj.cache_dir = cache_dir
+        dfobj.cache_size = 1e-6
+        dfobj.build()
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
     def test_init_denisty_fit(self):
         from pyscf.df import df_jk
         from pyscf import cc
@@ -26,6 +26,7 @@ Reference for Lebedev-Laikov grid:
 
 
 import ctypes
+from functools import reduce
 import numpy
 from pyscf import lib
 from pyscf.lib import logger
@@ -232,47 +233,55 @@ def gen_atomic_grids(mol, atom_grid={}, radi_method=radi.gauss_chebyshev,
         symb = mol.atom_symbol(ia)
 
         if symb not in atom_grids_tab:
-            chg = gto.charge(symb)
-            if symb in atom_grid:
-                n_rad, n_ang = atom_grid[symb]
-                if n_ang not in LEBEDEV_NGRID:
-                    if n_ang in LEBEDEV_ORDER:
-                        logger.warn(mol, 'n_ang %d for atom %d %s is not '
-                                    'the supported Lebedev angular grids. '
-                                    'Set n_ang to %d', n_ang, ia, symb,
-                                    LEBEDEV_ORDER[n_ang])
-                        n_ang = LEBEDEV_ORDER[n_ang]
-                    else:
-                        raise ValueError('Unsupported angular grids %d' % n_ang)
+            atom_grids_tab[symb] = _gen_atom_grid(mol, ia, atom_grid,
+                                                  radi_method, level, prune,
+                                                  **kwargs)
+    return atom_grids_tab
+
+def _gen_atom_grid(mol, ia, atom_grid={}, radi_method=radi.gauss_chebyshev,
+                   level=3, prune=nwchem_prune, **kwargs):
+    '''Mesh grids and volumes of atom ia wrt the atom center'''
+    symb = mol.atom_symbol(ia)
+    chg = gto.charge(symb)
+    if symb in atom_grid:
+        n_rad, n_ang = atom_grid[symb]
+        if n_ang not in LEBEDEV_NGRID:
+            if n_ang in LEBEDEV_ORDER:
+                logger.warn(mol, 'n_ang %d for atom %d %s is not '
+                            'the supported Lebedev angular grids. '
+                            'Set n_ang to %d', n_ang, ia, symb,
+                            LEBEDEV_ORDER[n_ang])
+                n_ang = LEBEDEV_ORDER[n_ang]
             else:
-                n_rad = _default_rad(chg, level)
-                n_ang = _default_ang(chg, level)
-            rad, dr = radi_method(n_rad, chg, ia, **kwargs)
+                raise ValueError('Unsupported angular grids %d' % n_ang)
+    else:
+        n_rad = _default_rad(chg, level)
+        n_ang = _default_ang(chg, level)
+    rad, dr = radi_method(n_rad, chg, ia, **kwargs)
 
-            rad_weight = 4*numpy.pi * rad**2 * dr
+    rad_weight = 4*numpy.pi * rad**2 * dr
 
-            if callable(prune):
-                angs = prune(chg, rad, n_ang)
-            else:
-                angs = [n_ang] * n_rad
-            logger.debug(mol, 'atom %s rad-grids = %d, ang-grids = %s',
-                         symb, n_rad, angs)
-
-            angs = numpy.array(angs)
-            coords = []
-            vol = []
-            for n in sorted(set(angs)):
-                grid = numpy.empty((n,4))
-                libdft.MakeAngularGrid(grid.ctypes.data_as(ctypes.c_void_p),
-                                       ctypes.c_int(n))
-                idx = numpy.where(angs==n)[0]
-                for i0, i1 in prange(0, len(idx), 12):  # 12 radi-grids as a group
-                    coords.append(numpy.einsum('i,jk->jik',rad[idx[i0:i1]],
-                                               grid[:,:3]).reshape(-1,3))
-                    vol.append(numpy.einsum('i,j->ji', rad_weight[idx[i0:i1]],
-                                            grid[:,3]).ravel())
-            atom_grids_tab[symb] = (numpy.vstack(coords), numpy.hstack(vol))
-    return atom_grids_tab
+    if callable(prune):
+        angs = prune(chg, rad, n_ang)
+    else:
+        angs = [n_ang] * n_rad
+    logger.debug(mol, 'atom %s rad-grids = %d, ang-grids = %s',
+                 symb, n_rad, angs)
+
+    angs = numpy.array(angs)
+    coords = []
+    vol = []
+    for n in sorted(set(angs)):
+        grid = numpy.empty((n,4))
+        libdft.MakeAngularGrid(grid.ctypes.data_as(ctypes.c_void_p),
+                               ctypes.c_int(n))
+        idx = numpy.where(angs==n)[0]
+        for i0, i1 in prange(0, len(idx), 12):  # 12 radi-grids as a group
+            coords.append(numpy.einsum('i,jk->jik',rad[idx[i0:i1]],
+                                       grid[:,:3]).reshape(-1,3))
+            vol.append(numpy.einsum('i,j->ji', rad_weight[idx[i0:i1]],
+                                    grid[:,3]).ravel())
+    return numpy.vstack(coords), numpy.hstack(vol)
 
 
 def get_partition(mol, atom_grids_tab,
@@ -446,6 +455,28 @@ class Grids(lib.StreamObject):
             Eg, grids.atom_grid = {'H': (20,110)} will generate 20 radial
             grids and 110 angular grids for H atom.
 
+        reuse_partition : bool
+            Whether to reuse the grids of the last build if the new geometry
+            differs from the last one only by a rigid motion (translation and
+            rotation).  The Becke partition weights depend only on the
+            inter-atomic distances.  The grids are moved along with the
+            molecule, thus the XC energy is invariant to the rigid motion.
+            The atomic grids (per element) are always cached.  The
+            screening table non0tab is reused as well since the distances
+            between the grids and the atoms do not change.  The reused grids
+            differ from the grids of a fresh build, in which the angular
+            grids are aligned to the lab frame.  Default is False.
+
+        cache_ao : bool
+            Whether to keep the AO values on grids evaluated by
+            :func:`NumInt.block_loop` for the following SCF iterations.  Only
+            the AOs of the significant shells of each block are stored.
+            The cache is dropped when the grids are rebuilt, reset or pruned.
+
+        cache_ao_max_memory : float
+            Memory (in MB) for the AO cache.  Blocks exceeding this limit
+            are stored in a memory-mapped file in lib.param.TMPDIR.
+
         Examples:
 
         >>> mol = gto.M(atom='H 0 0 0; H 0 0 1.1')
@@ -497,11 +528,21 @@ class Grids(lib.StreamObject):
         self.prune = _load_conf(None, 'dft_gen_grid_Grids_prune', nwchem_prune)
 
         self.level = getattr(__config__, 'dft_gen_grid_Grids_level', 3)
+        self.reuse_partition = getattr(__config__, 'dft_gen_grid_Grids_reuse_partition', False)
+        self.cache_ao = getattr(__config__, 'dft_gen_grid_Grids_cache_ao', False)
+        self.cache_ao_max_memory = getattr(__config__, 'dft_gen_grid_Grids_cache_ao_max_memory', 4000)
 
 ##################################################
 # don't modify the following attributes, they are not input options
+        self._generation = 0
         self.coords  = None
         self.weights = None
+        # Caches for scanner mode. They are not cleared in reset()
+        self._atomic_grids_cache = {}
+        self._partition_cache = None
+        self._cache_stats = {'atomic_grids': [0, 0], 'partition': [0, 0]}
+        self._non0tab_cache = None
+        self._ao_cache = None
         self._keys = set(self.__dict__.keys())
 
     @property
@@ -512,6 +553,11 @@ class Grids(lib.StreamObject):
         if key in ('atom_grid', 'atomic_radii', 'radii_adjust', 'radi_method',
                    'becke_scheme', 'prune', 'level'):
             self.reset()
+        elif key in ('coords', 'weights', 'non0tab'):
+            # The AO values cached by NumInt.block_loop are tagged with the
+            # generation of the grids
+            self.__dict__['_generation'] = getattr(self, '_generation', 0) + 1
+            self.__dict__['_ao_cache'] = None
         super(Grids, self).__setattr__(key, val)
 
     def dump_flags(self, verbose=None):
@@ -532,15 +578,43 @@ class Grids(lib.StreamObject):
         if mol is None: mol = self.mol
         if self.verbose >= logger.WARN:
             self.check_sanity()
-        atom_grids_tab = self.gen_atomic_grids(mol, self.atom_grid,
-                                               self.radi_method,
-                                               self.level, self.prune, **kwargs)
-        self.coords, self.weights = \
-                self.get_partition(mol, atom_grids_tab,
-                                   self.radii_adjust, self.atomic_radii,
-                                   self.becke_scheme)
+
+        self._ao_cache = None
+        grids = None
+        if self.reuse_partition:
+            partition_key = self._partition_key(**kwargs)
+            grids = self._moved_partition(mol, partition_key)
+
+        if grids is None:
+            atom_grids_tab = self.gen_atomic_grids(mol, self.atom_grid,
+                                                   self.radi_method,
+                                                   self.level, self.prune, **kwargs)
+            self.coords, self.weights = \
+                    self.get_partition(mol, atom_grids_tab,
+                                       self.radii_adjust, self.atomic_radii,
+                                       self.becke_scheme)
+            if self.reuse_partition:
+                self._cache_stats['partition'][1] += 1
+                self._non0tab_cache = None
+                self._partition_cache = (partition_key,
+                                         [mol.atom_symbol(i) for i in range(mol.natm)],
+                                         mol.atom_coords(), self.coords, self.weights)
+        else:
+            self._cache_stats['partition'][0] += 1
+            self.coords, self.weights = grids
+
+        logger.debug(self, 'Grids cache hits/misses: atomic grids %d/%d, '
+                     'partition %d/%d', *(self._cache_stats['atomic_grids'] +
+                                          self._cache_stats['partition']))
         if with_non0tab:
-            self.non0tab = self.make_mask(mol, self.coords)
+            basis_key = (repr(mol._basis), mol.cart)
+            if (grids is not None and self._non0tab_cache is not None and
+                self._non0tab_cache[0] == basis_key):
+                self.non0tab = self._non0tab_cache[1]
+            else:
+                self.non0tab = self.make_mask(mol, self.coords)
+                if self.reuse_partition:
+                    self._non0tab_cache = (basis_key, self.non0tab)
         else:
             self.non0tab = None
         logger.info(self, 'tot grids = %d', len(self.weights))
@@ -557,6 +631,7 @@ class Grids(lib.StreamObject):
         self.coords = None
         self.weights = None
         self.non0tab = None
+        self._ao_cache = None
         return self
 
     @lib.with_doc(gen_atomic_grids.__doc__)
@@ -566,7 +641,29 @@ class Grids(lib.StreamObject):
         if radi_method is None: radi_method = self.radi_method
         if level is None: level = self.level
         if prune is None: prune = self.prune
-        return gen_atomic_grids(mol, atom_grid, self.radi_method, level, prune, **kwargs)
+        if isinstance(atom_grid, (list, tuple)):
+            atom_grid = dict([(mol.atom_symbol(ia), atom_grid)
+                              for ia in range(mol.natm)])
+
+        # Atomic grids are cached for each element
+        cache = self._atomic_grids_cache
+        stats = self._cache_stats['atomic_grids']
+        kwargs_key = repr(sorted(kwargs.items()))
+        atom_grids_tab = {}
+        for ia in range(mol.natm):
+            symb = mol.atom_symbol(ia)
+            if symb in atom_grids_tab:
+                continue
+            key = (symb, atom_grid.get(symb), self.radi_method, level, prune,
+                   kwargs_key)
+            if key in cache:
+                stats[0] += 1
+            else:
+                stats[1] += 1
+                cache[key] = _gen_atom_grid(mol, ia, atom_grid, self.radi_method,
+                                            level, prune, **kwargs)
+            atom_grids_tab[symb] = cache[key]
+        return atom_grids_tab
 
     @lib.with_doc(get_partition.__doc__)
     def get_partition(self, mol, atom_grids_tab=None,
@@ -586,6 +683,60 @@ class Grids(lib.StreamObject):
         if coords is None: coords = self.coords
         return make_mask(mol, coords, relativity, shls_slice, verbose)
 
+    def _partition_key(self, **kwargs):
+        if self.atomic_radii is None:
+            radii_key = None
+        else:
+            radii_key = lib.fp(self.atomic_radii)
+        return (repr(sorted(self.atom_grid.items())
+                     if isinstance(self.atom_grid, dict) else self.atom_grid),
+                self.radi_method, self.level, self.prune, self.radii_adjust,
+                radii_key, self.becke_scheme, repr(sorted(kwargs.items())))
+
+    def _moved_partition(self, mol, partition_key):
+        '''Move the grids of the last build to the new geometry if the new
+        geometry is a rigid motion of the last one. Return None otherwise.
+        '''
+        if self._partition_cache is None:
+            return None
+        key0, symbs0, atm_coords0, coords0, weights0 = self._partition_cache
+        if (key0 != partition_key or
+            symbs0 != [mol.atom_symbol(i) for i in range(mol.natm)]):
+            return None
+        motion = _rigid_motion(atm_coords0, mol.atom_coords())
+        if motion is None:
+            return None
+        rot, center0, center1 = motion
+        if rot is None:
+            coords = coords0 + (center1 - center0)
+        else:
+            coords = lib.dot(coords0 - center0, rot.T) + center1
+        logger.debug1(self, 'Reuse grids of the last geometry (rigid motion)')
+        return coords, weights0
+
+
+def _rigid_motion(coords0, coords1, tol=1e-9):
+    '''Find the rotation which transforms coords0 to coords1 (after removing
+    the translation).  Returns (rot, center0, center1) with rot=None for a
+    pure translation, or None if coords1 is not a rigid motion of coords0.
+    '''
+    if coords0.shape != coords1.shape:
+        return None
+    center0 = coords0.mean(axis=0)
+    center1 = coords1.mean(axis=0)
+    x0 = coords0 - center0
+    x1 = coords1 - center1
+    if abs(x0 - x1).max() < tol:
+        return None, center0, center1
+
+    # Kabsch algorithm
+    u, s, vt = numpy.linalg.svd(x0.T.dot(x1))
+    d = numpy.sign(numpy.linalg.det(vt.T.dot(u.T)))
+    rot = reduce(numpy.dot, (vt.T, numpy.diag((1, 1, d)), u.T))
+    if abs(x0.dot(rot.T) - x1).max() < tol:
+        return rot, center0, center1
+    else:
+        return None
 
 def _default_rad(nuc, level=3):
     '''Number of radial grids '''
@@ -814,6 +814,9 @@ def nr_rks(ni, mol, grids, xc_code, dms, relativity=0, hermi=0,
     >>> nelec, exc, vxc = ni.nr_rks(mol, grids, 'lda,vwn', dm)
     '''
     xctype = ni._xc_type(xc_code)
+    if getattr(ni, 'block_threads', 1) > 1 and xctype != 'NLC':
+        return _nr_vxc_threaded(nr_rks, ni, mol, grids, xc_code, dms,
+                                relativity, hermi, max_memory, verbose)
     make_rho, nset, nao = ni._gen_rho_evaluator(mol, dms, hermi)
 
     shls_slice = (0, mol.nbas)
@@ -992,6 +995,9 @@ def nr_uks(ni, mol, grids, xc_code, dms, relativity=0, hermi=0,
         nelec, excsum, vmat = nr_rks(ni, mol, grids, xc_code, dms_sf, relativity, hermi,
                                      max_memory, verbose)
         return [nelec,nelec], excsum, numpy.asarray([vmat,vmat])
+    if getattr(ni, 'block_threads', 1) > 1:
+        return _nr_vxc_threaded(nr_uks, ni, mol, grids, xc_code, dms,
+                                relativity, hermi, max_memory, verbose)
 
     shls_slice = (0, mol.nbas)
     ao_loc = mol.ao_loc_nr()
@@ -1108,6 +1114,81 @@ def nr_uks(ni, mol, grids, xc_code, dms, relativity=0, hermi=0,
         excsum = excsum[0]
     return nelec, excsum, vmat
 
+def _nr_vxc_threaded(vxc_fn, ni, mol, grids, xc_code, dms, relativity=0,
+                     hermi=0, max_memory=2000, verbose=None):
+    '''Evaluate nr_rks/nr_uks with grid batches distributed over a pool of
+    ni.block_threads threads.
+
+    The grids are split into BLKSIZE-aligned batches (a few batches per
+    thread for load balance). Each thread calls the serial vxc_fn on the
+    batches it picks up and accumulates nelec, excsum and vmat in its own
+    buffers. The per-thread results are summed at the end. The C kernels
+    (eval_ao, libxc, dot products) release the GIL. The OpenMP threads of
+    the process are shared among the workers, and max_memory is divided
+    among the workers, which sets the block size used inside each batch.
+    '''
+    import copy
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    if grids.coords is None:
+        grids.build(with_non0tab=True)
+    ngrids = grids.weights.size
+    nthreads = min(ni.block_threads, (ngrids+BLKSIZE-1)//BLKSIZE)
+
+    ni_serial = copy.copy(ni)
+    ni_serial.block_threads = 1
+    if nthreads <= 1:
+        return vxc_fn(ni_serial, mol, grids, xc_code, dms, relativity, hermi,
+                      max_memory, verbose)
+
+    ntasks = nthreads * 4
+    batch = (ngrids + ntasks*BLKSIZE - 1) // (ntasks*BLKSIZE) * BLKSIZE
+    batches = iter(range(0, ngrids, batch))
+    lock = threading.Lock()
+    nomp = max(1, lib.num_threads() // nthreads)
+    mem_per_thread = max(BLKSIZE*mol.nao*8e-6, max_memory / nthreads)
+
+    def sub_grids(ip0, ip1):
+        g = copy.copy(grids)
+        g.coords = grids.coords[ip0:ip1]
+        g.weights = grids.weights[ip0:ip1]
+        if grids.non0tab is not None:
+            g.non0tab = grids.non0tab[ip0//BLKSIZE:(ip1+BLKSIZE-1)//BLKSIZE]
+        return g
+
+    def worker():
+        nelec = excsum = vmat = None
+        # omp_set_num_threads only affects the calling thread
+        with lib.with_omp_threads(nomp):
+            while True:
+                with lock:
+                    ip0 = next(batches, None)
+                if ip0 is None:
+                    break
+                ip1 = min(ngrids, ip0+batch)
+                n, e, v = vxc_fn(ni_serial, mol, sub_grids(ip0, ip1), xc_code,
+                                 dms, relativity, hermi, mem_per_thread, verbose)
+                if vmat is None:
+                    nelec, excsum, vmat = numpy.asarray(n), e, numpy.asarray(v)
+                else:
+                    nelec = nelec + n
+                    excsum = excsum + e
+                    vmat += v
+        return nelec, excsum, vmat
+
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        futures = [executor.submit(worker) for i in range(nthreads)]
+        results = [f.result() for f in futures]
+    results = [r for r in results if r[2] is not None]
+
+    nelec, excsum, vmat = results[0]
+    for n, e, v in results[1:]:
+        nelec = nelec + n
+        excsum = excsum + e
+        vmat += v
+    return nelec, excsum, vmat
+
 def _format_uks_dm(dms):
     if isinstance(dms, numpy.ndarray) and dms.ndim == 2:  # RHF DM
         dma = dmb = dms * .5
@@ -1917,8 +1998,104 @@ def get_rho(ni, mol, dm, grids, max_memory=2000):
     return rho
 
 
+class _AOCache(object):
+    '''AO values on grids for the blocks generated by NumInt.block_loop.
+
+    For each block, only the AOs of the shells which are significant on any
+    grid of the block (according to non0tab) are stored, together with the
+    indices of these AOs.  Blocks are held in memory until max_memory (MB)
+    is used up.  The remaining blocks are written to a memory-mapped file
+    in lib.param.TMPDIR.
+
+    The cache holds the AO values of one grids and basis (self.key), for the
+    block size (self.blksize) used when the cache was filled.
+    '''
+    def __init__(self, max_memory=4000):
+        import threading
+        self.max_memory = max_memory
+        self.key = None
+        self.blksize = None
+        self.mem_used = 0
+        self.blocks = {}
+        self._swapfile = None
+        self._swap_size = 0
+        self._lock = threading.Lock()
+
+    def save(self, key, ip0, deriv, ao, non0, ao_loc):
+        ngrids = ao.shape[-2]
+        nblk = (ngrids+BLKSIZE-1) // BLKSIZE
+        shl_mask = non0[:nblk].any(axis=0)
+        ao_mask = numpy.repeat(shl_mask, ao_loc[1:] - ao_loc[:-1])
+        idx = numpy.asarray(numpy.where(ao_mask)[0], dtype=numpy.int32)
+        data = numpy.asarray(ao[...,idx], order='C')
+        with self._lock:
+            if self.mem_used + data.nbytes*1e-6 <= self.max_memory:
+                self.mem_used += data.nbytes * 1e-6
+            else:
+                if self._swapfile is None:
+                    import tempfile
+                    self._swapfile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+                self._swapfile.seek(self._swap_size)
+                data.tofile(self._swapfile)
+                self._swapfile.flush()
+                data = (self._swap_size, data.shape)
+                self._swap_size += numpy.prod(data[1]) * 8
+            self.blocks[key+(ip0, deriv)] = (ao.shape, idx, data)
+
+    def load(self, key, ip0, deriv, buf):
+        '''Restore the AO values of the block in buf. Values cached for a
+        higher order of derivatives are also used. Returns None if the block
+        was not cached.'''
+        for d in range(deriv, 5):
+            if key+(ip0, d) in self.blocks:
+                shape, idx, data = self.blocks[key+(ip0, d)]
+                break
+        else:
+            return None
+
+        if isinstance(data, tuple):
+            offset, data_shape = data
+            if idx.size == 0:
+                data = numpy.empty(data_shape)
+            else:
+                data = numpy.memmap(self._swapfile.name, dtype=numpy.double,
+                                    mode='r', offset=offset, shape=data_shape)
+        if d > deriv:
+            comp = (deriv+1)*(deriv+2)*(deriv+3)//6
+            if comp == 1:
+                shape = shape[1:]
+                data = data[0]
+            else:
+                shape = (comp,) + shape[1:]
+                data = data[:comp]
+        ao = numpy.ndarray(shape, buffer=buf)
+        ao[:] = 0
+        ao[...,idx] = data
+        return ao
+
+    def close(self):
+        if self._swapfile is not None:
+            self._swapfile.close()
+            self._swapfile = None
+        self.blocks = {}
+        self.mem_used = 0
+        self._swap_size = 0
+        self.key = None
+        self.blksize = None
+
+    def reset(self, key, blksize):
+        '''Evict the cached blocks and start to cache for key'''
+        self.close()
+        self.key = key
+        self.blksize = blksize
+        self._swap_size = 0
+
+
 class NumInt(object):
     libxc = libxc
+    # Number of threads to process grid batches concurrently in nr_rks and
+    # nr_uks. 1 means the serial block_loop.
+    block_threads = getattr(__config__, 'dft_numint_NumInt_block_threads', 1)
 
     def __init__(self):
         self.omega = None  # RSH paramter
@@ -1985,22 +2162,53 @@ class NumInt(object):
         ngrids = grids.coords.shape[0]
         comp = (deriv+1)*(deriv+2)*(deriv+3)//6
 # NOTE to index grids.non0tab, the blksize needs to be the integer multiplier of BLKSIZE
+        fixed_blksize = blksize is not None
         if blksize is None:
             blksize = int(max_memory*1e6/(comp*2*nao*8*BLKSIZE))*BLKSIZE
             blksize = max(BLKSIZE, min(blksize, ngrids, BLKSIZE*1200))
+        # AO values are cached only for the screening table of the grids
+        use_ao_cache = getattr(grids, 'cache_ao', False) and non0tab is None
         if non0tab is None:
             non0tab = grids.non0tab
         if non0tab is None:
             non0tab = numpy.ones(((ngrids+BLKSIZE-1)//BLKSIZE,mol.nbas),
                                  dtype=numpy.uint8)
-        if buf is None:
+
+        ao_cache = None
+        if use_ao_cache:
+            ao_cache = getattr(grids, '_ao_cache', None)
+            if ao_cache is None:
+                ao_cache = grids._ao_cache = _AOCache(grids.cache_ao_max_memory)
+            ao_loc = mol.ao_loc_nr()
+            # Grids bumps _generation whenever coords, weights or non0tab
+            # change. _atm, _bas and _env identify the geometry and the basis.
+            cache_key = (grids._generation, ngrids, mol.cart,
+                         mol._atm.tobytes(), mol._bas.tobytes(),
+                         mol._env.tobytes())
+            if ao_cache.key != cache_key:
+                ao_cache.reset(cache_key, blksize)
+            if not fixed_blksize:
+                # max_memory varies between calls (e.g. in SCF iterations).
+                # Keep the blocks of the cache.
+                blksize = ao_cache.blksize
+            elif blksize != ao_cache.blksize:
+                ao_cache = None
+
+        if buf is None or buf.size < comp*blksize*nao:
             buf = numpy.empty((comp,blksize,nao))
+
         for ip0 in range(0, ngrids, blksize):
             ip1 = min(ngrids, ip0+blksize)
             coords = grids.coords[ip0:ip1]
             weight = grids.weights[ip0:ip1]
             non0 = non0tab[ip0//BLKSIZE:]
-            ao = self.eval_ao(mol, coords, deriv=deriv, non0tab=non0, out=buf)
+            if ao_cache is None:
+                ao = self.eval_ao(mol, coords, deriv=deriv, non0tab=non0, out=buf)
+            else:
+                ao = ao_cache.load(cache_key, ip0, deriv, buf)
+                if ao is None:
+                    ao = self.eval_ao(mol, coords, deriv=deriv, non0tab=non0, out=buf)
+                    ao_cache.save(cache_key, ip0, deriv, ao, non0, ao_loc)
             yield ao, non0, weight, coords
 
     def _gen_rho_evaluator(self, mol, dms, hermi=0):
@@ -132,6 +132,44 @@ class KnownValues(unittest.TestCase):
         g.atom_grid = {"H": (10, 110), "O": (10, 110),}
         self.assertTrue(g.weights is None)
 
+    def test_grids_cache(self):
+        g = gen_grid.Grids(h2o).set(reuse_partition=True).build()
+        self.assertEqual(g._cache_stats['atomic_grids'], [0, 2])
+        self.assertEqual(g._cache_stats['partition'], [0, 1])
+
+        # translation
+        mol1 = h2o.set_geom_(h2o.atom_coords(unit='Angstrom') + .2, inplace=False)
+        g.reset(mol1).build()
+        self.assertEqual(g._cache_stats['partition'], [1, 1])
+        ref = gen_grid.Grids(mol1).build()
+        self.assertAlmostEqual(abs(g.coords - ref.coords).max(), 0, 9)
+        self.assertAlmostEqual(abs(g.weights - ref.weights).max(), 0, 9)
+
+        # rotation + translation
+        theta = .3
+        rot = numpy.array([[numpy.cos(theta), -numpy.sin(theta), 0],
+                           [numpy.sin(theta),  numpy.cos(theta), 0],
+                           [0, 0, 1]])
+        coords = h2o.atom_coords(unit='Angstrom').dot(rot.T) + .5
+        mol2 = h2o.set_geom_(coords, inplace=False)
+        coords1, weights1 = g.coords, g.weights
+        non0tab = g.make_mask(mol1, g.coords)
+        g.reset(mol2).build(with_non0tab=True)
+        self.assertEqual(g._cache_stats['partition'], [2, 1])
+        self.assertTrue(g._non0tab_cache is not None)
+        self.assertEqual(abs(g.non0tab - non0tab).max(), 0)
+        self.assertAlmostEqual(abs(g.weights - weights1).max(), 0, 12)
+        r1 = coords1[:,None,:] - mol1.atom_coords()
+        r2 = g.coords[:,None,:] - mol2.atom_coords()
+        self.assertAlmostEqual(abs(numpy.linalg.norm(r1, axis=2) -
+                                   numpy.linalg.norm(r2, axis=2)).max(), 0, 9)
+
+        # distorted geometry
+        coords = h2o.atom_coords(unit='Angstrom')
+        coords[1,2] += .1
+        g.reset(h2o.set_geom_(coords, inplace=False)).build()
+        self.assertEqual(g._cache_stats['partition'], [2, 2])
+        self.assertEqual(g._cache_stats['atomic_grids'], [2, 2])
 
 if __name__ == "__main__":
     print("Test Grids")
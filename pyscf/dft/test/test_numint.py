@@ -222,6 +222,92 @@ class KnownValues(unittest.TestCase):
         v = mf._numint.nr_vxc(h2o, grids, '', dms, spin=1)[2]
         self.assertAlmostEqual(abs(v).max(), 0, 9)
 
+    def test_block_threads(self):
+        numpy.random.seed(10)
+        nao = h2o.nao_nr()
+        dms = numpy.random.random((2,nao,nao))
+        grids = dft.gen_grid.Grids(h2o).build(with_non0tab=True)
+        ni = dft.numint.NumInt()
+        ref_rks = ni.nr_vxc(h2o, grids, 'B88,', dms, spin=0)
+        ref_uks = ni.nr_vxc(h2o, grids, 'M06', dms, spin=1)
+        ni.block_threads = 3
+        n, e, v = ni.nr_vxc(h2o, grids, 'B88,', dms, spin=0)
+        self.assertAlmostEqual(abs(n - ref_rks[0]).max(), 0, 9)
+        self.assertAlmostEqual(abs(e - ref_rks[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(v - ref_rks[2]).max(), 0, 9)
+        n, e, v = ni.nr_vxc(h2o, grids, 'M06', dms, spin=1)
+        self.assertAlmostEqual(abs(n - ref_uks[0]).max(), 0, 9)
+        self.assertAlmostEqual(abs(e - ref_uks[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(v - ref_uks[2]).max(), 0, 9)
+
+    def test_cache_ao(self):
+        numpy.random.seed(10)
+        nao = h2o.nao_nr()
+        dm = numpy.random.random((nao,nao))
+        dm = dm + dm.T
+        grids = dft.gen_grid.Grids(h2o).build(with_non0tab=True)
+        ni = dft.numint.NumInt()
+        ref_gga = ni.nr_rks(h2o, grids, 'B88,', dm)
+        ref_lda = ni.nr_rks(h2o, grids, 'LDA,', dm)
+
+        grids.cache_ao = True
+        grids.cache_ao_max_memory = .1
+        for i in range(2):
+            n, e, v = ni.nr_rks(h2o, grids, 'B88,', dm)
+            self.assertAlmostEqual(abs(e - ref_gga[1]).max(), 0, 9)
+            self.assertAlmostEqual(abs(v - ref_gga[2]).max(), 0, 9)
+        self.assertTrue(grids._ao_cache._swapfile is not None)
+        # AO values of the GGA derivatives are used for LDA
+        nblocks = len(grids._ao_cache.blocks)
+        n, e, v = ni.nr_rks(h2o, grids, 'LDA,', dm)
+        self.assertEqual(len(grids._ao_cache.blocks), nblocks)
+        self.assertAlmostEqual(abs(e - ref_lda[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(v - ref_lda[2]).max(), 0, 9)
+
+        grids.build(with_non0tab=True)
+        self.assertTrue(grids._ao_cache is None)
+
+        # Cached AO values are not reused after the grids are pruned
+        ni.nr_rks(h2o, grids, 'LDA,', dm)
+        generation = grids._generation
+        idx = numpy.arange(0, grids.weights.size, 2)
+        grids.coords = numpy.asarray(grids.coords[idx], order='C')
+        grids.weights = numpy.asarray(grids.weights[idx], order='C')
+        grids.non0tab = grids.make_mask(h2o, grids.coords)
+        self.assertTrue(grids._generation > generation)
+        self.assertTrue(grids._ao_cache is None)
+        grids.cache_ao = False
+        ref = ni.nr_rks(h2o, grids, 'LDA,', dm)
+        grids.cache_ao = True
+        n, e, v = ni.nr_rks(h2o, grids, 'LDA,', dm)
+        self.assertAlmostEqual(abs(v - ref[2]).max(), 0, 9)
+
+    def test_cache_ao_max_memory(self):
+        numpy.random.seed(10)
+        nao = h2o.nao_nr()
+        dm = numpy.random.random((nao,nao))
+        dm = dm + dm.T
+        grids = dft.gen_grid.Grids(h2o).build(with_non0tab=True)
+        grids.cache_ao = True
+        ni = dft.numint.NumInt()
+        ref = ni.nr_rks(h2o, grids, 'LDA,', dm, max_memory=2000)
+        blksize = grids._ao_cache.blksize
+        nblocks = len(grids._ao_cache.blocks)
+        mem_used = grids._ao_cache.mem_used
+
+        eval_ao_calls = []
+        def eval_ao(*args, **kwargs):
+            eval_ao_calls.append(1)
+            return dft.numint.NumInt.eval_ao(ni, *args, **kwargs)
+        ni.eval_ao = eval_ao
+        # A different max_memory leads to a different block size
+        n, e, v = ni.nr_rks(h2o, grids, 'LDA,', dm, max_memory=1)
+        self.assertEqual(len(eval_ao_calls), 0)
+        self.assertEqual(grids._ao_cache.blksize, blksize)
+        self.assertEqual(len(grids._ao_cache.blocks), nblocks)
+        self.assertEqual(grids._ao_cache.mem_used, mem_used)
+        self.assertAlmostEqual(abs(v - ref[2]).max(), 0, 9)
+
     def test_uks_vxc_high_cost(self):
         numpy.random.seed(10)
         nao = mol.nao_nr()
@@ -18,11 +18,17 @@
 
 import ctypes
 import math
+import threading
+from collections import OrderedDict
 import numpy
 from pyscf import lib
+from pyscf import __config__
 
 libfci = lib.load_library('libfci')
 
+# Max memory (in MB) of the link tables kept by gen_linkstr_index
+LINKSTR_CACHE_SIZE = getattr(__config__, 'fci_cistring_linkstr_cache_size', 512)
+
 def make_strings(orb_list, nelec):
     '''Generate string from the given orbital list.
 
@@ -202,8 +208,14 @@ def gen_linkstr_index(orb_list, nocc, strs=None, tril=False):
     excitations, which do not change the string. The next nocc*nvir rows
     [a(:vir),i(:occ),str1,sign] are occupied-virtual exciations, starting from
     str0, annihilating i, creating a, to get str1.
+
+    If strs is not given, the table is cached and a read-only array shared
+    by all callers is returned.
     '''
     if strs is None:
+        norb = len(orb_list)
+        if LINKSTR_CACHE_SIZE > 0 and list(orb_list) == list(range(norb)):
+            return _cached_linkstr_index(norb, nocc, tril)
         strs = make_strings(orb_list, nocc)
 
     if isinstance(strs, OIndexList):
@@ -214,7 +226,11 @@ def gen_linkstr_index(orb_list, nocc, strs=None, tril=False):
     norb = len(orb_list)
     nvir = norb - nocc
     na = strs.shape[0]
-    link_index = numpy.empty((na,nocc*nvir+nocc,4), dtype=numpy.int32)
+    if tril:
+        # The second column is not used for the lower triangular index
+        link_index = numpy.zeros((na,nocc*nvir+nocc,4), dtype=numpy.int32)
+    else:
+        link_index = numpy.empty((na,nocc*nvir+nocc,4), dtype=numpy.int32)
     libfci.FCIlinkstr_index(link_index.ctypes.data_as(ctypes.c_void_p),
                             ctypes.c_int(norb), ctypes.c_int(na),
                             ctypes.c_int(nocc),
@@ -222,6 +238,59 @@ def gen_linkstr_index(orb_list, nocc, strs=None, tril=False):
                             ctypes.c_int(tril))
     return link_index
 
+class _LinkstrCache(object):
+    '''Process-wide LRU cache of the link tables, keyed by (norb, nelec,
+    tril). The cached tables are read-only and shared by all callers.
+    '''
+    def __init__(self):
+        self.tables = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            link_index = self.tables.get(key)
+            if link_index is not None:
+                # move to the end (most recently used)
+                del self.tables[key]
+                self.tables[key] = link_index
+        return link_index
+
+    def put(self, key, link_index):
+        nbytes = link_index.nbytes
+        max_bytes = LINKSTR_CACHE_SIZE * 1e6
+        if nbytes > max_bytes:
+            return
+        with self.lock:
+            if key in self.tables:
+                return
+            while self.tables and self.nbytes + nbytes > max_bytes:
+                k, v = self.tables.popitem(last=False)
+                self.nbytes -= v.nbytes
+            self.tables[key] = link_index
+            self.nbytes += nbytes
+
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+            self.nbytes = 0
+
+_linkstr_cache = _LinkstrCache()
+
+def clear_linkstr_cache():
+    '''Release the link tables cached by gen_linkstr_index'''
+    _linkstr_cache.clear()
+
+def _cached_linkstr_index(norb, nocc, tril):
+    key = (norb, nocc, bool(tril))
+    link_index = _linkstr_cache.get(key)
+    if link_index is None:
+        link_index = gen_linkstr_index(range(norb), nocc,
+                                       make_strings(range(norb), nocc), tril)
+        link_index.flags.writeable = False
+        _linkstr_cache.put(key, link_index)
+    return link_index
+
 def reform_linkstr_index(link_index):
     '''Compress the (a, i) pair index in linkstr_index to a lower triangular
     index. The compressed indices can match the 4-fold symmetry of integrals.
@@ -38,7 +38,9 @@ direct_nosym        No            No             No**               Yes
 ** Hamiltonian is real but not hermitian, (ij|kl) != (ji|kl) ...
 '''
 
+import os
 import sys
+import time
 import ctypes
 import numpy
 import scipy.linalg
@@ -457,6 +459,244 @@ def get_init_guess(norb, nelec, nroots, hdiag):
 
 
 ###############################################################
+def _contract_2e_strs(eri, fcivec, ci1, ci1a, norb, na, nb, link_indexa,
+                      link_indexb, stra0, stra1, strb0, strb1):
+    '''Add the contributions of alpha strings [stra0:stra1] and beta strings
+    [strb0:strb1] of :func:`contract_2e` to ci1 (the beta excitations, in
+    rows [stra0:stra1]) and to ci1a (the alpha excitations, in columns
+    [strb0:strb1])'''
+    nlinka = link_indexa.shape[1]
+    nlinkb = link_indexb.shape[1]
+    libfci.FCIcontract_2e_spin1_strs(eri.ctypes.data_as(ctypes.c_void_p),
+                                     fcivec.ctypes.data_as(ctypes.c_void_p),
+                                     ci1.ctypes.data_as(ctypes.c_void_p),
+                                     ci1a.ctypes.data_as(ctypes.c_void_p),
+                                     ctypes.c_int(norb),
+                                     ctypes.c_int(na), ctypes.c_int(nb),
+                                     ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
+                                     link_indexa.ctypes.data_as(ctypes.c_void_p),
+                                     link_indexb.ctypes.data_as(ctypes.c_void_p),
+                                     ctypes.c_int(stra0), ctypes.c_int(stra1),
+                                     ctypes.c_int(strb0), ctypes.c_int(strb1))
+    return ci1
+
+class _SharedSigma(object):
+    '''Multi-process contract_2e. The alpha strings are split into nproc
+    ranges. Process k computes the contributions of the k-th range and owns
+    the rows of the k-th range of the sigma vector. The contributions of
+    the beta excitations are written to these rows directly. The
+    contributions of the alpha excitations are collected for a chunk of
+    beta strings in an exchange buffer (na x nb/nproc per process). After a
+    barrier, each process adds the exchange buffers of all processes to its
+    own rows. No process holds a full size partial sigma vector.
+
+    The integrals, the input vector and the exchange buffers are held in
+    shared memory. The output of each call is a new array in a
+    memory-mapped file (in /dev/shm if available), written by the processes
+    and returned to the Davidson solver without a copy. The trial vector of
+    the Davidson solver is copied to the shared input vector.
+
+    The processes are forked when the object is created and are reused
+    until :meth:`close`. The integrals are updated by :meth:`set_eri`.
+    Process k is bound, when it starts, to the k-th disjoint set of the
+    available CPUs, so that the processes (and the pages they touch first)
+    can be spread over the NUMA nodes. Note that fork after the OpenMP
+    runtime has been used by the parent process (e.g. in SCF or the
+    integral transformation) is not supported by every OpenMP runtime
+    (e.g. GNU libgomp). The processes may hang with such runtimes.
+    '''
+    def __init__(self, norb, na, nb, link_indexa, link_indexb, nproc,
+                 nthreads=None):
+        import mmap
+        import multiprocessing
+        global _sigma_args
+        # Raises AttributeError (Python 2) or ValueError (no fork)
+        ctx = multiprocessing.get_context('fork')
+
+        self.norb = norb
+        self.nproc = nproc
+        self.shape = (na, nb)
+        self.link_index = (link_indexa, link_indexb)
+        npair = norb * (norb+1) // 2
+        bchunk = max(1, (nb+nproc-1) // nproc)
+        size = npair**2 + na*nb + nproc*na*bchunk
+        # Anonymous shared memory, inherited by the forked processes
+        self._mmap = mmap.mmap(-1, size*8)
+        buf = numpy.ndarray(size, buffer=self._mmap)
+        self.eri = buf[:npair**2].reshape(npair,npair)
+        self.ci0 = buf[npair**2:npair**2+na*nb]
+        exch = buf[npair**2+na*nb:].reshape(nproc,na*bchunk)
+
+        if nthreads is None:
+            nthreads = max(1, lib.num_threads() // nproc)
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+            cpus = [cpus[p0:p1] for p0, p1 in
+                    lib.prange(0, len(cpus), (len(cpus)+nproc-1)//nproc)]
+        else:
+            cpus = None
+        stra_ranges = [(rank*na//nproc, (rank+1)*na//nproc)
+                       for rank in range(nproc)]
+        if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+            self._outdir = '/dev/shm'
+        else:
+            self._outdir = lib.param.TMPDIR
+
+        self._barrier = ctx.Barrier(nproc)
+        _sigma_args = (self.eri, self.ci0, exch, norb, na, nb,
+                       link_indexa, link_indexb, stra_ranges, bchunk,
+                       self._barrier, cpus, nthreads)
+        self._pid = os.getpid()
+        self._conns = []
+        self._procs = []
+        try:
+            for rank in range(nproc):
+                conn, child_conn = ctx.Pipe()
+                proc = ctx.Process(target=_sigma_worker, args=(rank, child_conn))
+                proc.daemon = True
+                proc.start()
+                child_conn.close()
+                self._conns.append(conn)
+                self._procs.append(proc)
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            _sigma_args = None
+
+    def match(self, norb, link_indexa, link_indexb, nproc):
+        '''Whether the processes can be used for the given CI space'''
+        return (self._procs and self._pid == os.getpid() and
+                self.norb == norb and self.nproc == nproc and
+                numpy.array_equal(self.link_index[0], link_indexa) and
+                numpy.array_equal(self.link_index[1], link_indexb))
+
+    def set_eri(self, eri):
+        self.eri[:] = ao2mo.restore(4, eri, self.norb)
+        return self
+
+    def _run(self, cmd):
+        for conn in self._conns:
+            conn.send(cmd)
+        errors = [conn.recv() for conn in self._conns]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            self._barrier.reset()
+            raise RuntimeError('contract_2e process failed: %s' % errors[0])
+
+    def __call__(self, fcivec):
+        import tempfile
+        self.ci0[:] = fcivec.ravel()
+        fd, outname = tempfile.mkstemp(prefix='sigma', dir=self._outdir)
+        os.close(fd)
+        try:
+            # A new file is zero-filled
+            out = numpy.memmap(outname, dtype=numpy.double, mode='w+',
+                               shape=self.ci0.shape)
+            self._run(('sigma', outname))
+        finally:
+            # The mapping of out is kept after the file is removed
+            os.remove(outname)
+        return out.view(numpy.ndarray)
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (IOError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._procs = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+def _shared_sigma(fci, norb, link_indexa, link_indexb, nproc, log):
+    '''The _SharedSigma processes of fci. They are created in the first call
+    and reused in the following kernel calls for the same CI space.'''
+    sigma = getattr(fci, '_sigma_procs', None)
+    if sigma is not None and sigma.match(norb, link_indexa, link_indexb, nproc):
+        return sigma
+    if sigma is not None:
+        sigma.close()
+    na = link_indexa.shape[0]
+    nb = link_indexb.shape[0]
+    try:
+        sigma = _SharedSigma(norb, na, nb, link_indexa, link_indexb, nproc)
+    except (AttributeError, ValueError):
+        log.warn('Multi-process contract_2e requires fork (Python 3 on POSIX). '
+                 'It is disabled.')
+        sigma = None
+    fci._sigma_procs = sigma
+    return sigma
+
+_sigma_args = None
+def _sigma_bind(rank):
+    cpus = _sigma_args[11]
+    if cpus and rank < len(cpus):
+        try:
+            os.sched_setaffinity(0, cpus[rank])
+        except OSError:
+            pass
+
+def _sigma_worker(rank, conn):
+    '''Main loop of the process of the given rank in _SharedSigma'''
+    _sigma_bind(rank)
+    barrier = _sigma_args[10]
+    while True:
+        try:
+            cmd = conn.recv()
+        except EOFError:
+            break
+        if cmd is None:
+            break
+        try:
+            _sigma_task(rank, cmd[1])
+            conn.send(None)
+        except Exception as e:
+            # Release the processes waiting at the barrier
+            barrier.abort()
+            conn.send(repr(e))
+    conn.close()
+
+def _sigma_task(rank, outname):
+    (eri, ci0, exch, norb, na, nb, link_indexa, link_indexb,
+     stra_ranges, bchunk, barrier, cpus, nthreads) = _sigma_args
+    nproc = exch.shape[0]
+    out = numpy.memmap(outname, dtype=numpy.double, mode='r+', shape=(na,nb))
+    stra0, stra1 = stra_ranges[rank]
+    with lib.with_omp_threads(nthreads):
+        for b0, b1 in lib.prange(0, nb, bchunk):
+            ncol = b1 - b0
+            ci1a = exch[rank,:na*ncol].reshape(na,ncol)
+            ci1a[:] = 0
+            if stra0 < stra1:
+                _contract_2e_strs(eri, ci0, out, ci1a, norb, na, nb,
+                                  link_indexa, link_indexb, stra0, stra1, b0, b1)
+            barrier.wait()
+            if stra0 < stra1:
+                ci1 = out[stra0:stra1,b0:b1]
+                for k in range(nproc):
+                    ci1 += exch[k,:na*ncol].reshape(na,ncol)[stra0:stra1]
+            # The exchange buffers are overwritten in the next chunk
+            barrier.wait()
+    del out
+
+
 # direct-CI driver
 ###############################################################
 
@@ -477,6 +717,28 @@ def kernel_ms1(fci, h1e, eri, norb, nelec, ci0=None, link_index=None,
     na = link_indexa.shape[0]
     nb = link_indexb.shape[0]
 
+    h2e = fci.absorb_h1e(h1e, eri, norb, nelec, .5)
+
+    if (getattr(fci, 'sparse_tol', 0) > 0 and _is_spin1_contract(fci) and
+        nelec[0] > 0 and nelec[1] > 0 and not callable(ci0)):
+        # The sparse solver does not build the vectors (hdiag, sigma, ...)
+        # of the full CI space.  Only the accepted solution is expanded to
+        # the FCI vector.
+        from pyscf.fci import selected_ci
+        e, c, ept2 = _kernel_sparse(fci, h1e, eri, h2e, norb, nelec, ci0,
+                                    (link_indexa, link_indexb),
+                                    min(na*nb, nroots), max_memory, log)
+        c = [selected_ci.to_fci(x, norb, nelec) for x in c]
+        if abs(ept2) < fci.sparse_etol:
+            if nroots > 1:
+                return e+ecore, c
+            else:
+                return e+ecore, c[0]
+        log.info('Sparse CI energy error %.3g > sparse_etol. '
+                 'Continue with the dense CI vectors', ept2)
+        ci0 = [x.ravel() for x in c]
+        c = None
+
     if max_memory < na*nb*6*8e-6:
         log.warn('Not enough memory for FCI solver. '
                  'The minimal requirement is %.0f MB', na*nb*60e-6)
@@ -510,10 +772,18 @@ def kernel_ms1(fci, h1e, eri, norb, nelec, ci0=None, link_index=None,
 
     precond = fci.make_precond(hdiag, pw, pv, addr)
 
-    h2e = fci.absorb_h1e(h1e, eri, norb, nelec, .5)
-    def hop(c):
-        hc = fci.contract_2e(h2e, c, norb, nelec, (link_indexa,link_indexb))
-        return hc.ravel()
+    nproc = getattr(fci, 'nproc', 1)
+    sigma = None
+    if nproc > 1 and _is_spin1_contract(fci):
+        sigma = _shared_sigma(fci, norb, link_indexa, link_indexb, nproc, log)
+
+    if sigma is not None:
+        log.debug('contract_2e on %d processes', nproc)
+        hop = sigma.set_eri(h2e)
+    else:
+        def hop(c):
+            hc = fci.contract_2e(h2e, c, norb, nelec, (link_indexa,link_indexb))
+            return hc.ravel()
 
     if ci0 is None:
         if callable(getattr(fci, 'get_init_guess', None)):
@@ -558,6 +828,99 @@ def kernel_ms1(fci, h1e, eri, norb, nelec, ci0=None, link_index=None,
     else:
         return e+ecore, c.reshape(na,nb)
 
+def _is_spin1_contract(fci):
+    '''Whether fci uses the contract_2e of this module. Solvers which
+    overwrite contract_2e (symmetry, spin penalty ...) return False'''
+    return (getattr(fci.contract_2e, '__func__', None)
+            is FCIBase.__dict__['contract_2e'])
+
+def _kernel_sparse(fci, h1e, eri, h2e, norb, nelec, ci0, link_index,
+                   nroots, max_memory, log):
+    '''Solve the CI problem on truncated CI vectors. The CI vectors are
+    stored sparsely, as the coefficients on the (selected alpha strings,
+    selected beta strings) sub-blocks, using the selected-CI string
+    machinery. Determinants are selected by the threshold fci.sparse_tol.
+
+    The energy error due to the truncation is estimated by the
+    Epstein-Nesbet second order correction of the neglected determinants.
+    The correction is evaluated with the selected-CI machinery in the space
+    enlarged by the excitations of the selected strings, screened by
+    fci.sparse_tol*1e-2.  The vectors of the full CI space are not built.
+
+    Returns:
+        energies, the selected-CI vectors, the largest energy error estimate
+    '''
+    from pyscf.fci import selected_ci
+    cput0 = (time.clock(), time.time())
+    myci = selected_ci.SCI(fci.mol)
+    myci.stdout = fci.stdout
+    myci.verbose = log.verbose
+    myci.spin = fci.spin
+    myci.level_shift = fci.level_shift
+    myci.conv_tol = fci.conv_tol
+    myci.lindep = fci.lindep
+    myci.max_cycle = fci.max_cycle
+    myci.max_space = fci.max_space
+    myci.max_memory = fci.max_memory
+    myci.select_cutoff = myci.ci_coeff_cutoff = fci.sparse_tol
+
+    na, nb = link_index[0].shape[0], link_index[1].shape[0]
+    if isinstance(ci0, numpy.ndarray) and ci0.size == na*nb:
+        ci0 = [ci0]
+    if isinstance(ci0, (list, tuple)):
+        # Initial guess from the significant strings of the dense vectors
+        ci0 = [numpy.asarray(x).reshape(na,nb) for x in ci0]
+        amax = numpy.max([abs(x).max(axis=1) for x in ci0], axis=0)
+        bmax = numpy.max([abs(x).max(axis=0) for x in ci0], axis=0)
+        strsa = cistring.make_strings(range(norb), nelec[0])
+        strsb = cistring.make_strings(range(norb), nelec[1])
+        ci_strs = (strsa[amax > fci.sparse_tol], strsb[bmax > fci.sparse_tol])
+        ci0 = [selected_ci.from_fci(x, ci_strs, norb, nelec) for x in ci0]
+        if ci0[0].size < nroots:
+            ci0 = None
+        else:
+            ci0 = selected_ci._as_SCIvector(numpy.asarray(ci0[:nroots]), ci_strs)
+    else:
+        ci0 = None
+
+    e, civecs = selected_ci.kernel_float_space(myci, h1e, eri, norb, nelec, ci0,
+                                               nroots=nroots, max_memory=max_memory,
+                                               verbose=log)
+    if nroots == 1:
+        e = numpy.asarray([e])
+        civecs = [civecs]
+    ci_strs = civecs[0]._strs
+    nsel = len(ci_strs[0]) * len(ci_strs[1])
+    log.info('Sparse CI space %d x %d = %d determinants (%.3g%% of FCI space)',
+             len(ci_strs[0]), len(ci_strs[1]), nsel, nsel*100./(na*nb))
+
+    # The Epstein-Nesbet correction of the determinants out of the selected
+    # space
+    myci.select_cutoff = fci.sparse_tol * 1e-2
+    myci.ci_coeff_cutoff = 0  # to keep all selected strings
+    h2e = ao2mo.restore(1, h2e, norb)
+    civecs_pt = myci.enlarge_space(civecs, h2e, norb, nelec)
+    pt_strs = civecs_pt[0]._strs
+    outside = ~(numpy.in1d(pt_strs[0], ci_strs[0])[:,None] &
+                numpy.in1d(pt_strs[1], ci_strs[1]))
+    outside = outside.ravel()
+    hdiag = selected_ci.make_hdiag(h1e, eri, pt_strs, norb, nelec)[outside]
+    log.debug('EN-PT2 space %d x %d', len(pt_strs[0]), len(pt_strs[1]))
+    ept2 = 0
+    for k, civec in enumerate(civecs_pt):
+        hc = selected_ci.contract_2e(h2e, civec, norb, nelec).ravel()
+        hc = hc[outside]
+        de = numpy.dot(hc**2, 1./(e[k] - hdiag))
+        log.debug('Sparse CI root %d  E = %.15g  EN-PT2 error estimate %.6g',
+                  k, e[k], de)
+        if abs(de) > abs(ept2):
+            ept2 = de
+    fci.converged = myci.converged
+    log.timer('sparse CI', *cput0)
+    if nroots == 1:
+        e = e[0]
+    return e, civecs, ept2
+
 def make_pspace_precond(hdiag, pspaceig, pspaceci, addr, level_shift=0):
     # precondition with pspace Hamiltonian, CPL, 169, 463
     def precond(r, e0, x0, *args):
@@ -620,6 +983,24 @@ class FCIBase(lib.StreamObject):
         wfnsym : str or int
             Symmetry of wavefunction.  It is used only in direct_spin1_symm
             and direct_spin0_symm solver.
+        nproc : int
+            If > 1, the sigma vectors in the Davidson iterations are computed
+            by nproc processes (sharing the CI vectors in shared memory),
+            each bound to a subset of the CPUs.  The processes are forked
+            in the first call of the kernel and reused by the following
+            calls for the same CI space.  Some OpenMP runtimes (e.g. GNU
+            libgomp) do not support fork after OpenMP was used in the
+            parent process, and the processes may hang.  It only affects
+            the direct_spin1 contract_2e.  Default is 1.
+        sparse_tol : float
+            If > 0, the CI problem is first solved on truncated CI vectors
+            which only keep the alpha and beta strings whose coefficients
+            are larger than sparse_tol.  Default is 0.
+        sparse_etol : float
+            The truncated solution is returned if the estimated energy error
+            (Epstein-Nesbet correction of the neglected determinants) is
+            smaller than sparse_etol.  Otherwise the Davidson iterations are
+            continued in the full CI space.  Default is 1e-5.
 
     Saved results
 
@@ -661,6 +1042,11 @@ class FCIBase(lib.StreamObject):
     pspace_size = getattr(__config__, 'fci_direct_spin1_FCI_pspace_size', 400)
     threads = getattr(__config__, 'fci_direct_spin1_FCI_threads', None)
     lessio = getattr(__config__, 'fci_direct_spin1_FCI_lessio', False)
+    # Number of processes to compute the sigma vector in the Davidson solver
+    nproc = getattr(__config__, 'fci_direct_spin1_FCI_nproc', 1)
+    # Threshold to truncate the CI vectors (0 to disable the sparse solver)
+    sparse_tol = getattr(__config__, 'fci_direct_spin1_FCI_sparse_tol', 0)
+    sparse_etol = getattr(__config__, 'fci_direct_spin1_FCI_sparse_etol', 1e-5)
 
     def __init__(self, mol=None):
         if mol is None:
@@ -687,7 +1073,7 @@ class FCIBase(lib.StreamObject):
 
         keys = set(('max_cycle', 'max_space', 'conv_tol', 'lindep',
                     'level_shift', 'davidson_only', 'pspace_size', 'threads',
-                    'lessio'))
+                    'lessio', 'nproc', 'sparse_tol', 'sparse_etol'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     @property
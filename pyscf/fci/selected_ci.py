@@ -110,6 +110,29 @@ def contract_2e(eri, civec_strs, norb, nelec, link_index=None):
 def select_strs(myci, eri, eri_pq_max, civec_max, strs, norb, nelec):
     strs = numpy.asarray(strs, dtype=numpy.int64)
     nstrs = len(strs)
+    nthreads = min(getattr(myci, 'select_threads', 1), nstrs)
+    if nthreads > 1:
+        # The screening of each string is independent. Strings are split into
+        # batches and screened in threads (ctypes releases the GIL).
+        from concurrent.futures import ThreadPoolExecutor
+        ntasks = nthreads * 4
+        blksize = (nstrs + ntasks - 1) // ntasks
+        def select(p0):
+            p1 = min(nstrs, p0+blksize)
+            return _select_strs(myci.select_cutoff, eri, eri_pq_max,
+                                civec_max[p0:p1], strs[p0:p1], norb, nelec)
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            strs_add = list(executor.map(select, range(0, nstrs, blksize)))
+        strs_add = numpy.hstack(strs_add)
+    else:
+        strs_add = _select_strs(myci.select_cutoff, eri, eri_pq_max,
+                                civec_max, strs, norb, nelec)
+    return numpy.setdiff1d(strs_add, strs)
+
+def _select_strs(select_cutoff, eri, eri_pq_max, civec_max, strs, norb, nelec):
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    civec_max = numpy.asarray(civec_max, order='C')
+    nstrs = len(strs)
     nvir = norb - nelec
     strs_add = numpy.empty((nstrs*(nelec*nvir)**2//4), dtype=numpy.int64)
     libfci.SCIselect_strs.restype = ctypes.c_int
@@ -118,11 +141,10 @@ def select_strs(myci, eri, eri_pq_max, civec_max, strs, norb, nelec):
                                  eri.ctypes.data_as(ctypes.c_void_p),
                                  eri_pq_max.ctypes.data_as(ctypes.c_void_p),
                                  civec_max.ctypes.data_as(ctypes.c_void_p),
-                                 ctypes.c_double(myci.select_cutoff),
+                                 ctypes.c_double(select_cutoff),
                                  ctypes.c_int(norb), ctypes.c_int(nelec),
                                  ctypes.c_int(nstrs))
-    strs_add = sorted(set(strs_add[:nadd]) - set(strs))
-    return numpy.asarray(strs_add, dtype=numpy.int64)
+    return strs_add[:nadd]
 
 def enlarge_space(myci, civec_strs, eri, norb, nelec):
     if isinstance(civec_strs, (tuple, list)):
@@ -182,6 +204,67 @@ def cre_des_linkstr(strs, norb, nelec, tril=False):
                               ctypes.c_int(tril))
     return link_index
 
+def update_cre_des_linkstr_tril(link_index, strs_old, strs, norb, nelec):
+    '''Update the link table (generated by cre_des_linkstr_tril for strs_old)
+    for the new strings strs. Only the rows of the new strings are computed.
+    The rows of the existing strings are remapped, and the links to the
+    removed strings are dropped. The links between the existing strings and
+    the new strings are obtained from the rows of the new strings, since
+    <I|E_{ai}|J> = <J|E_{ia}|I>.
+    '''
+    strs_old = numpy.asarray(strs_old, dtype=numpy.int64)
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    nstrs = len(strs)
+    nlink = nelec + nelec * (norb - nelec)
+    if nlink == 0 or len(strs_old) == 0:
+        return cre_des_linkstr_tril(strs, norb, nelec)
+
+    # Addresses of the old strings in the new list (-1 for removed strings)
+    pos = numpy.minimum(numpy.searchsorted(strs, strs_old), nstrs-1)
+    kept = strs[pos] == strs_old
+    addr_map = numpy.where(kept, pos, -1).astype(numpy.int32)
+    added = numpy.ones(nstrs, dtype=bool)
+    added[pos[kept]] = False
+    added_idx = numpy.where(added)[0]
+
+    link_new = numpy.zeros((nstrs,nlink,4), dtype=numpy.int32)
+    tab = link_index[kept]
+    tab[:,:,2] = addr_map[tab[:,:,2]]
+    valid = (tab[:,:,3] != 0) & (tab[:,:,2] >= 0)
+    # Move the valid links to the beginning of each row
+    order = numpy.argsort(~valid, axis=1, kind='stable')
+    tab = numpy.take_along_axis(tab, order[:,:,None], axis=1)
+    tab[~numpy.take_along_axis(valid, order, axis=1)] = 0
+    link_new[pos[kept]] = tab
+    count = numpy.zeros(nstrs, dtype=int)
+    count[pos[kept]] = valid.sum(axis=1)
+
+    if added_idx.size > 0:
+        tab = numpy.zeros((added_idx.size,nlink,4), dtype=numpy.int32)
+        inter = numpy.asarray(strs[added_idx], order='C')
+        libfci.SCIcre_des_linkstr_subset(tab.ctypes.data_as(ctypes.c_void_p),
+                                         ctypes.c_int(norb), ctypes.c_int(nstrs),
+                                         ctypes.c_int(nelec),
+                                         strs.ctypes.data_as(ctypes.c_void_p),
+                                         ctypes.c_int(added_idx.size),
+                                         inter.ctypes.data_as(ctypes.c_void_p),
+                                         ctypes.c_int(1))
+        link_new[added_idx] = tab
+        count[added_idx] = (tab[:,:,3] != 0).sum(axis=1)
+
+        # Links from the existing strings to the new strings
+        row, k = numpy.where((tab[:,:,3] != 0) & ~added[tab[:,:,2]])
+        if row.size > 0:
+            target = tab[row,k,2]
+            idx = numpy.argsort(target, kind='stable')
+            row, k, target = row[idx], k[idx], target[idx]
+            first = numpy.searchsorted(target, target)
+            slot = count[target] + numpy.arange(target.size) - first
+            link_new[target,slot,0] = tab[row,k,0]
+            link_new[target,slot,2] = added_idx[row]
+            link_new[target,slot,3] = tab[row,k,3]
+    return link_new
+
 def cre_des_linkstr_tril(strs, norb, nelec):
     '''Given intermediates, the link table to generate input strs
     '''
@@ -410,6 +493,7 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
     float_tol = myci.start_tol
     tol_decay_rate = myci.tol_decay_rate
     conv = False
+    link_index = last_ci_strs = None
     for icycle in range(norb):
         ci_strs = ci0[0]._strs
         float_tol = max(float_tol*tol_decay_rate, tol*1e2)
@@ -417,7 +501,9 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
                   icycle, (len(ci_strs[0]), len(ci_strs[1])), float_tol)
 
         ci0 = [c.ravel() for c in ci0]
-        link_index = _all_linkstr_index(ci_strs, norb, nelec)
+        link_index = _update_all_linkstr_index(link_index, last_ci_strs,
+                                               ci_strs, norb, nelec)
+        last_ci_strs = ci_strs
         hdiag = myci.make_hdiag(h1e, eri, ci_strs, norb, nelec)
         #e, ci0 = lib.davidson(hop, ci0.reshape(-1), precond, tol=float_tol)
         e, ci0 = myci.eig(hop, ci0, precond, tol=float_tol, lindep=lindep,
@@ -448,7 +534,8 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
     ci_strs = ci0[0]._strs
     log.debug('Extra CI in selected space %s', (len(ci_strs[0]), len(ci_strs[1])))
     ci0 = [c.ravel() for c in ci0]
-    link_index = _all_linkstr_index(ci_strs, norb, nelec)
+    link_index = _update_all_linkstr_index(link_index, last_ci_strs,
+                                           ci_strs, norb, nelec)
     hdiag = myci.make_hdiag(h1e, eri, ci_strs, norb, nelec)
     e, c = myci.eig(hop, ci0, precond, tol=tol, lindep=lindep,
                     max_cycle=max_cycle, max_space=max_space, nroots=nroots,
@@ -698,8 +785,8 @@ def contract_ss(civec_strs, norb, nelec):
 
 def to_fci(civec_strs, norb, nelec):
     ci_coeff, nelec, ci_strs = _unpack(civec_strs, nelec)
-    addrsa = [cistring.str2addr(norb, nelec[0], x) for x in ci_strs[0]]
-    addrsb = [cistring.str2addr(norb, nelec[1], x) for x in ci_strs[1]]
+    addrsa = cistring.strs2addr(norb, nelec[0], ci_strs[0])
+    addrsb = cistring.strs2addr(norb, nelec[1], ci_strs[1])
     na = cistring.num_strings(norb, nelec[0])
     nb = cistring.num_strings(norb, nelec[1])
     ci0 = numpy.zeros((na,nb))
@@ -708,8 +795,8 @@ def to_fci(civec_strs, norb, nelec):
 
 def from_fci(fcivec, ci_strs, norb, nelec):
     fcivec, nelec, ci_strs = _unpack(fcivec, nelec, ci_strs)
-    addrsa = [cistring.str2addr(norb, nelec[0], x) for x in ci_strs[0]]
-    addrsb = [cistring.str2addr(norb, nelec[1], x) for x in ci_strs[1]]
+    addrsa = cistring.strs2addr(norb, nelec[0], ci_strs[0])
+    addrsb = cistring.strs2addr(norb, nelec[1], ci_strs[1])
     na = cistring.num_strings(norb, nelec[0])
     nb = cistring.num_strings(norb, nelec[1])
     fcivec = fcivec.reshape(na,nb)
@@ -724,6 +811,8 @@ class SelectedCI(direct_spin1.FCISolver):
     conv_tol = getattr(__config__, 'fci_selected_ci_SCI_conv_tol', 1e-9)
     start_tol = getattr(__config__, 'fci_selected_ci_SCI_start_tol', 3e-4)
     tol_decay_rate = getattr(__config__, 'fci_selected_ci_SCI_tol_decay_rate', 0.3)
+    # Number of threads to screen the determinants in enlarge_space
+    select_threads = getattr(__config__, 'fci_selected_ci_SCI_select_threads', 1)
 
     def __init__(self, mol=None):
         direct_spin1.FCISolver.__init__(self, mol)
@@ -734,7 +823,7 @@ class SelectedCI(direct_spin1.FCISolver):
         #self.ci = None
         self._strs = None
         keys = set(('ci_coeff_cutoff', 'select_cutoff', 'conv_tol',
-                    'start_tol', 'tol_decay_rate'))
+                    'start_tol', 'tol_decay_rate', 'select_threads'))
         self._keys = self._keys.union(keys)
 
     def dump_flags(self, verbose=None):
@@ -895,6 +984,22 @@ def _all_linkstr_index(ci_strs, norb, nelec):
     dd_indexb = des_des_linkstr_tril(ci_strs[1], norb, nelec[1])
     return cd_indexa, dd_indexa, cd_indexb, dd_indexb
 
+def _update_all_linkstr_index(link_index, ci_strs_old, ci_strs, norb, nelec):
+    '''Link tables of ci_strs, updated from the link tables of ci_strs_old'''
+    if link_index is None:
+        return _all_linkstr_index(ci_strs, norb, nelec)
+
+    cd_indexa, dd_indexa, cd_indexb, dd_indexb = link_index
+    if not numpy.array_equal(ci_strs_old[0], ci_strs[0]):
+        cd_indexa = update_cre_des_linkstr_tril(cd_indexa, ci_strs_old[0],
+                                                ci_strs[0], norb, nelec[0])
+        dd_indexa = des_des_linkstr_tril(ci_strs[0], norb, nelec[0])
+    if not numpy.array_equal(ci_strs_old[1], ci_strs[1]):
+        cd_indexb = update_cre_des_linkstr_tril(cd_indexb, ci_strs_old[1],
+                                                ci_strs[1], norb, nelec[1])
+        dd_indexb = des_des_linkstr_tril(ci_strs[1], norb, nelec[1])
+    return cd_indexa, dd_indexa, cd_indexb, dd_indexb
+
 # numpy.ndarray does not allow to attach attribtues.  Overwrite the
 # numpy.ndarray class to tag the ._strs attribute
 class _SCIvector(numpy.ndarray):
@@ -65,6 +65,31 @@ class KnownValues(unittest.TestCase):
         tab3 = cistring.gen_linkstr_index_o1(range(8), 4)
         self.assertAlmostEqual(abs(tab1 - tab3).sum(), 0, 12)
 
+    def test_linkstr_cache(self):
+        cistring.clear_linkstr_cache()
+        strs = cistring.make_strings(range(9), 4)
+        ref = cistring.gen_linkstr_index(range(9), 4, strs)
+        tab1 = cistring.gen_linkstr_index(range(9), 4)
+        self.assertFalse(tab1.flags.writeable)
+        self.assertRaises(ValueError, tab1.__setitem__, 0, 0)
+        tab2 = cistring.gen_linkstr_index(range(9), 4)
+        self.assertTrue((9, 4, False) in cistring._linkstr_cache.tables)
+        self.assertTrue(tab2 is tab1)
+        self.assertTrue(numpy.all(tab2 == ref))
+
+        ref = cistring.gen_linkstr_index_trilidx(range(9), 4, strs)
+        tab1 = cistring.gen_linkstr_index_trilidx(range(9), 4)
+        tab2 = cistring.gen_linkstr_index_trilidx(range(9), 4)
+        self.assertTrue(numpy.all(tab2 == ref))
+        self.assertTrue(numpy.all(tab2[:,:,1] == 0))
+
+        cistring.LINKSTR_CACHE_SIZE, bak = 0.01, cistring.LINKSTR_CACHE_SIZE
+        cistring.gen_linkstr_index(range(6), 3)
+        cistring.gen_linkstr_index(range(7), 3)
+        self.assertTrue(cistring._linkstr_cache.nbytes <= 0.01e6)
+        cistring.LINKSTR_CACHE_SIZE = bak
+        cistring.clear_linkstr_cache()
+
     def test_addr2str(self):
         self.assertEqual(bin(cistring.addr2str(6, 3, 7)), '0b11001')
         self.assertEqual(bin(cistring.addr2str(6, 3, 8)), '0b11010')
@@ -71,6 +71,11 @@ class KnownValues(unittest.TestCase):
                                             strs, norb, nelec)
         self.assertTrue(numpy.all(strs_add0 == strs_add1))
 
+        myci.select_threads = 3
+        strs_add1 = selected_ci.select_strs(myci, eri, eri_pq_max, civec_max,
+                                            strs, norb, nelec)
+        self.assertTrue(numpy.all(strs_add0 == strs_add1))
+
     def test_select_strs1(self):
         myci = selected_ci.SCI()
         myci.select_cutoff = .1
@@ -241,6 +246,21 @@ class KnownValues(unittest.TestCase):
         cd_index1[:,:,1] = 0
         self.assertTrue(numpy.all(cd_index0 == cd_index1))
 
+    def test_update_cre_des_linkstr(self):
+        norb, nelec = 10, 4
+        strs = cistring.make_strings(range(norb), nelec)
+        numpy.random.seed(11)
+        strs_old = strs[numpy.random.random(len(strs)) > .5]
+        strs_new = strs[numpy.random.random(len(strs)) > .4]
+        cd_index0 = selected_ci.cre_des_linkstr_tril(strs_old, norb, nelec)
+        cd_index1 = selected_ci.update_cre_des_linkstr_tril(
+            cd_index0, strs_old, strs_new, norb, nelec)
+        cd_index2 = selected_ci.cre_des_linkstr_tril(strs_new, norb, nelec)
+        for tab1, tab2 in zip(cd_index1, cd_index2):
+            tab1 = sorted(map(tuple, tab1[tab1[:,3] != 0][:,[0,2,3]]))
+            tab2 = sorted(map(tuple, tab2[tab2[:,3] != 0][:,[0,2,3]]))
+            self.assertEqual(tab1, tab2)
+
     def test_des_des_linkstr(self):
         norb, nelec = 10, 4
         strs = cistring.make_strings(range(norb), nelec)
@@ -89,6 +89,62 @@ class KnownValues(unittest.TestCase):
         e, c = sol.kernel(h1e, g2e, norb, neleci)
         self.assertAlmostEqual(e, -8.7498253981782, 8)
 
+    def test_kernel_nproc(self):
+        h2e = fci.direct_spin1.absorb_h1e(h1e, g2e, norb, neleci, .5)
+        link_index = fci.direct_spin1._unpack(norb, neleci, None)
+        ref = fci.direct_spin1.contract_2e(h2e, ci2, norb, neleci)
+        sigma = fci.direct_spin1._SharedSigma(norb, ci2.shape[0], ci2.shape[1],
+                                              link_index[0], link_index[1], 3)
+        with sigma:
+            sigma.set_eri(h2e)
+            hc2 = sigma(ci2)
+            self.assertAlmostEqual(abs(hc2 - ref.ravel()).max(), 0, 12)
+            ref3 = fci.direct_spin1.contract_2e(h2e, ci3, norb, neleci)
+            self.assertAlmostEqual(abs(sigma(ci3) - ref3.ravel()).max(), 0, 12)
+            # Each call returns a new array
+            self.assertAlmostEqual(abs(hc2 - ref.ravel()).max(), 0, 12)
+
+        sol = fci.direct_spin1.FCI(mol)
+        sol.davidson_only = True
+        sol.nproc = 2
+        e, c = sol.kernel(h1e, g2e, norb, neleci)
+        self.assertAlmostEqual(e, -8.7498253981782, 8)
+        # The processes are reused by the next kernel call
+        procs = sol._sigma_procs
+        e, c = sol.kernel(h1e, g2e, norb, neleci)
+        self.assertTrue(sol._sigma_procs is procs)
+        self.assertAlmostEqual(e, -8.7498253981782, 8)
+        procs.close()
+
+    def test_kernel_sparse(self):
+        sol = fci.direct_spin1.FCI(mol)
+        sol.sparse_tol = 1e-4
+        sol.sparse_etol = 1e-3
+        # No sigma vector or diagonal of the full CI space is computed when
+        # the sparse solution is accepted
+        calls = []
+        def count(fn):
+            def f(*args, **kwargs):
+                calls.append(fn.__name__)
+                return fn(*args, **kwargs)
+            return f
+        contract_2e_bak = fci.direct_spin1.contract_2e
+        make_hdiag_bak = fci.direct_spin1.make_hdiag
+        fci.direct_spin1.contract_2e = count(contract_2e_bak)
+        fci.direct_spin1.make_hdiag = count(make_hdiag_bak)
+        try:
+            e, c = sol.kernel(h1e, g2e, norb, nelec)
+        finally:
+            fci.direct_spin1.contract_2e = contract_2e_bak
+            fci.direct_spin1.make_hdiag = make_hdiag_bak
+        self.assertEqual(calls, [])
+        self.assertAlmostEqual(e, -8.9347029192929, 3)
+        self.assertEqual(c.shape, ci0.shape)
+
+        sol.sparse_etol = 1e-12
+        e, c = sol.kernel(h1e, g2e, norb, neleci)
+        self.assertAlmostEqual(e, -8.7498253981782, 8)
+
     def test_hdiag(self):
         hdiagref = fci.direct_spin0.make_hdiag(h1e, g2e, norb, mol.nelectron)
         hdiag = fci.direct_spin1.make_hdiag(h1e, g2e, norb, nelec)
@@ -16,14 +16,19 @@
 # Author: Qiming Sun <osirpt.sun@gmail.com>
 #
 
+import os
 import sys
 import json
+import shutil
+import tempfile
 import h5py
 
 if sys.version_info < (3,):
     RANGE_TYPE = list
+    _replace = os.rename
 else:
     RANGE_TYPE = range
+    _replace = os.replace
 
 def load(chkfile, key):
     '''Load array(s) from chkfile
@@ -138,6 +143,40 @@ def dump(chkfile, key, value):
             save_as_group(key, value, fh5)
 dump_chkfile_key = save = dump
 
+def dump_atomic(chkfile, key, value):
+    '''Save array(s) in chkfile like :func:`dump`, atomically.
+
+    A complete copy of chkfile (with the key updated) is written to a
+    temporary file in the same directory.  The temporary file is flushed to
+    disk and then renamed to chkfile.  If the program is killed while
+    writing, chkfile keeps the content of the previous call.
+    '''
+    chkfile = os.path.abspath(chkfile)
+    dirname = os.path.dirname(chkfile)
+    fd, tmpname = tempfile.mkstemp(prefix=os.path.basename(chkfile)+'.',
+                                   suffix='.tmp', dir=dirname)
+    os.close(fd)
+    try:
+        if h5py.is_hdf5(chkfile):
+            shutil.copyfile(chkfile, tmpname)
+            shutil.copymode(chkfile, tmpname)
+        else:
+            os.remove(tmpname)
+        dump(tmpname, key, value)
+        _fsync(tmpname)
+        _replace(tmpname, chkfile)
+    except BaseException:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+def _fsync(filename):
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 def load_mol(chkfile):
     '''Load Mole object from chkfile.
@@ -21,8 +21,10 @@ DIIS
 """
 
 import sys
+import tempfile
 import numpy
 import scipy.linalg
+from pyscf.lib import param
 from pyscf.lib import logger
 from pyscf.lib import misc
 from pyscf.lib import numpy_helper
@@ -44,6 +46,15 @@ class DIIS(object):
             DIIS subspace size. The maximum number of the vectors to be stored.
         min_space
             The minimal size of subspace before DIIS extrapolation.
+        memmap : bool
+            Whether to store the large vectors (which do not fit the incore
+            criteria) in numpy memory-mapped files instead of an HDF5 file.
+            The vectors are accessed in place without being copied. This
+            option is ignored if filename is specified.
+        err_dtype : numpy dtype or None
+            If set to numpy.float32, the error vectors are stored in single
+            precision to halve the storage.  The subspace matrix is computed in
+            double precision.
 
     Functions:
         update(x, xerr=None) :
@@ -108,6 +119,8 @@ class DIIS(object):
         self.space = 6
         self.min_space = 1
         self.incore = incore
+        self.memmap = getattr(__config__, 'lib_diis_DIIS_memmap', False)
+        self.err_dtype = None
 
 ##################################################
 # don't modify the following private variables, they are not input options
@@ -122,6 +135,8 @@ class DIIS(object):
 
     def _store(self, key, value):
         incore = value.size < INCORE_SIZE or self.incore
+        if key[0] == 'e' and self.err_dtype is not None:
+            value = _asarray_err(value, self.err_dtype)
         if incore:
             self._buffer[key] = value
 
@@ -129,7 +144,10 @@ class DIIS(object):
         # restore the DIIS state
         if (not incore) or isinstance(self.filename, str):
             if self._diisfile is None:
-                self._diisfile = misc.H5TmpFile(self.filename, 'w')
+                if self.memmap and not isinstance(self.filename, str):
+                    self._diisfile = _MemmapStore(self.space, self.err_dtype)
+                else:
+                    self._diisfile = misc.H5TmpFile(self.filename, 'w')
             if key in self._diisfile:
                 self._diisfile[key][:] = value
             else:
@@ -219,13 +237,17 @@ class DIIS(object):
 
         dt = numpy.array(self.get_err_vec(self._head-1), copy=False)
         if self._H is None:
-            self._H = numpy.zeros((self.space+1,self.space+1), dt.dtype)
+            self._H = numpy.zeros((self.space+1,self.space+1),
+                                  numpy.result_type(dt.dtype, numpy.double))
             self._H[0,1:] = self._H[1:,0] = 1
+        # Only the row of the new error vector is updated
+        dtype = self._H.dtype
         for i in range(nd):
             tmp = 0
             dti = self.get_err_vec(i)
             for p0, p1 in misc.prange(0, dt.size, BLOCK_SIZE):
-                tmp += numpy.dot(dt[p0:p1].conj(), dti[p0:p1])
+                tmp += numpy.dot(numpy.asarray(dt[p0:p1], dtype=dtype).conj(),
+                                 numpy.asarray(dti[p0:p1], dtype=dtype))
             self._H[self._head,i+1] = tmp
             self._H[i+1,self._head] = tmp.conjugate()
         dt = None
@@ -264,6 +286,14 @@ class DIIS(object):
                 raise e
         logger.debug1(self, 'diis-c %s', c)
 
+        if not self._buffer and isinstance(self._diisfile, _MemmapStore):
+            # Stream through all stored vectors in one pass
+            xs = self._diisfile.get_vecs(nd)
+            xnew = numpy.empty(xs.shape[1], numpy.result_type(c.dtype, xs.dtype))
+            for p0, p1 in misc.prange(0, xs.shape[1], BLOCK_SIZE):
+                numpy.dot(c[1:], xs[:,p0:p1], out=xnew[p0:p1])
+            return xnew
+
         xnew = None
         for i, ci in enumerate(c[1:]):
             xi = self.get_vec(i)
@@ -339,3 +369,83 @@ def restore(filename):
     '''Restore/construct diis object based on a diis file'''
     return DIIS().restore(filename)
 
+def _asarray_err(value, err_dtype):
+    if numpy.iscomplexobj(value):
+        err_dtype = numpy.result_type(err_dtype, numpy.complex64)
+    return numpy.asarray(value, dtype=err_dtype)
+
+class _MemmapStore(object):
+    '''Ring buffers of DIIS vectors in numpy memory-mapped files. It provides
+    the subset of the h5py.File interface used by the DIIS class.
+    '''
+    def __init__(self, space, err_dtype=None):
+        self.space = space
+        self.err_dtype = err_dtype
+        self._files = {}
+        self._arrays = {}
+
+    def _alloc(self, kind, nrow, size, dtype):
+        f = tempfile.NamedTemporaryFile(dir=param.TMPDIR)
+        arr = numpy.memmap(f, dtype=dtype, mode='w+', shape=(nrow, size))
+        old = self._arrays.get(kind)
+        if old is not None:
+            arr[:old.shape[0]] = old
+        self._files[kind] = f
+        self._arrays[kind] = arr
+        return arr
+
+    def _locate(self, key, size=None, dtype=None):
+        '''Returns the memmap and row index for the given key'''
+        kind = key[0]
+        if key == 'xprev':
+            kind, row = 'p', 0
+            nrow = 1
+        else:
+            row = int(key[1:])
+            nrow = max(self.space, row+1)
+        arr = self._arrays.get(kind)
+        if size is not None and (arr is None or arr.shape[0] <= row):
+            if kind == 'e' and self.err_dtype is not None:
+                dtype = _asarray_err(numpy.zeros(0, dtype), self.err_dtype).dtype
+            arr = self._alloc(kind, nrow, size, dtype)
+        return arr, row
+
+    def __contains__(self, key):
+        arr, row = self._locate(key)
+        return arr is not None and row < arr.shape[0]
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        arr, row = self._locate(key)
+        return arr[row]
+
+    def __setitem__(self, key, value):
+        value = numpy.asarray(value).ravel()
+        arr, row = self._locate(key, value.size, value.dtype)
+        arr[row] = value
+
+    def create_dataset(self, key, shape, dtype):
+        arr, row = self._locate(key, numpy.prod(shape), dtype)
+        return arr[row]
+
+    def keys(self):
+        keys = []
+        for kind, arr in self._arrays.items():
+            if kind == 'p':
+                keys.append('xprev')
+            else:
+                keys.extend(['%s%d' % (kind, i) for i in range(arr.shape[0])])
+        return keys
+
+    def get_vecs(self, nd):
+        return self._arrays['x'][:nd]
+
+    def flush(self):
+        for arr in self._arrays.values():
+            arr.flush()
+
+    def close(self):
+        self._arrays = {}
+        self._files = {}
+
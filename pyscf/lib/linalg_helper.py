@@ -22,6 +22,7 @@ Extension to scipy.linalg module
 
 import sys
 import inspect
+import tempfile
 import warnings
 from functools import reduce
 import numpy
@@ -29,6 +30,7 @@ import scipy.linalg
 from pyscf.lib import logger
 from pyscf.lib import numpy_helper
 from pyscf.lib import misc
+from pyscf.lib import parameters as param
 from pyscf import __config__
 
 SAFE_EIGH_LINDEP = getattr(__config__, 'lib_linalg_helper_safe_eigh_lindep', 1e-15)
@@ -51,6 +53,9 @@ PROJECT_OUT_CONV_EIGS = \
 
 FOLLOW_STATE = getattr(__config__, 'lib_linalg_helper_davidson_follow_state', False)
 
+# Use the block Davidson solver davidson1_block in davidson1
+BLOCK_DAVIDSON = getattr(__config__, 'lib_linalg_helper_davidson_block', False)
+
 
 def safe_eigh(h, s, lindep=SAFE_EIGH_LINDEP):
     '''Solve generalized eigenvalue problem  h v = w s v.
@@ -336,6 +341,12 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
     >>> len(e)
     2
     '''
+    if BLOCK_DAVIDSON and dot is numpy.dot:
+        return davidson1_block(aop, x0, precond, tol, max_cycle, max_space,
+                               lindep, max_memory, callback=callback,
+                               nroots=nroots, pick=pick, verbose=verbose,
+                               tol_residual=tol_residual)
+
     if isinstance(verbose, logger.Logger):
         log = verbose
     else:
@@ -559,6 +570,193 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
     return numpy.asarray(conv), e, x0
 
 
+def davidson1_block(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
+                    lindep=DAVIDSON_LINDEP, max_memory=MAX_MEMORY,
+                    callback=None, nroots=1, pick=None, verbose=logger.WARN,
+                    tol_residual=None):
+    r'''Block Davidson diagonalization for the lowest nroots eigenvalues of a
+    hermitian matrix.  The arguments and the return values are the same to
+    :func:`davidson1` (the inner product is fixed to numpy.dot).
+
+    Differences to :func:`davidson1`:
+
+    * The trial vectors are held in two 2D buffers.  The subspace matrix and
+      the orthonormalization of the new trial vectors are evaluated with
+      matrix-matrix products.  The buffers are numpy.memmap arrays in
+      lib.param.TMPDIR if they do not fit in max_memory.
+    * The correction vectors of all unconverged roots are passed to one aop
+      call.
+    * When the subspace is collapsed, the converged roots are locked.  They
+      are removed from the search space and the new trial vectors are
+      orthogonalized against them.  The remaining Ritz vectors are kept with
+      their a*x, so no aop call is needed to restart.
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+
+    if tol_residual is None:
+        toloose = numpy.sqrt(tol)
+    else:
+        toloose = tol_residual
+    log.debug1('tol %g  toloose %g', tol, toloose)
+
+    if not callable(precond):
+        precond = make_diag_precond(precond)
+
+    if callable(x0):
+        x0 = x0()
+    if isinstance(x0, numpy.ndarray) and x0.ndim == 1:
+        x0 = [x0]
+    x0 = numpy.asarray([numpy.ravel(x) for x in x0])
+    x0len, vec_size = x0.shape
+
+    max_space = max_space + (nroots-1) * 3
+    nbuf = max_space + nroots
+    _incore = max_memory*1e6/x0[0].nbytes > nbuf*2+nroots*3
+    log.debug1('max_cycle %d  max_space %d  max_memory %d  incore %s',
+               max_cycle, max_space, max_memory, _incore)
+
+    # locked (converged) eigenpairs
+    xl = numpy.zeros((0,vec_size), dtype=x0.dtype)
+    el = numpy.zeros(0)
+
+    xt = _orth_block(x0, [], lindep)
+    if len(xt) != x0len:
+        log.warn('QR decomposition removed %d vectors.  The davidson may fail.',
+                 x0len - len(xt))
+    x0 = None
+    xs = ax = heff = None
+    dtype = None
+    space = 0
+    e = elast = v = None
+    conv = numpy.zeros(nroots, dtype=bool)
+
+    for icyc in range(max_cycle):
+        nact = nroots - len(el)
+        axt = numpy.asarray(aop(xt))
+        if dtype is None:
+            dtype = numpy.result_type(axt, xt)
+            xs = _block_buffer((nbuf,vec_size), dtype, _incore)
+            ax = _block_buffer((nbuf,vec_size), dtype, _incore)
+            heff = numpy.zeros((nbuf,nbuf), dtype=dtype)
+        rnow = len(xt)
+        head, space = space, space+rnow
+        xs[head:space] = xt
+        ax[head:space] = axt
+
+        # <x_i|A|x_k> for all i and the new vectors k
+        hnew = numpy.dot(xs[:space].conj(), axt.T)
+        heff[:space,head:space] = hnew
+        heff[head:space,:head] = hnew[:head].T.conj()
+        hnew = heff[head:space,head:space]
+        heff[head:space,head:space] = (hnew + hnew.T.conj()) * .5
+        xt = axt = hnew = None
+
+        w, v = scipy.linalg.eigh(heff[:space,:space])
+        if callable(pick):
+            w, v, idx = pick(w, v, nact, locals())
+        e = w[:nact]
+        v = v[:,:nact]
+
+        x0 = numpy.dot(v.T, xs[:space])
+        ax0 = numpy.dot(v.T, ax[:space])
+        dx = ax0 - e[:,None] * x0
+        dx_norm = numpy.sqrt(numpy.einsum('kx,kx->k', dx.conj(), dx).real)
+        if elast is None or elast.size != e.size:
+            de = e
+        else:
+            de = e - elast
+        elast = e
+        conv = (abs(de) < tol) & (dx_norm < toloose)
+        max_dx_norm = dx_norm.max()
+        ide = numpy.argmax(abs(de))
+        if all(conv):
+            log.debug('converged %d %d  |r|= %4.3g  e= %s  max|de|= %4.3g',
+                      icyc, space, max_dx_norm, e, de[ide])
+            break
+
+        xt = []
+        for k in numpy.where(~conv & (dx_norm**2 > lindep))[0]:
+            xk = precond(dx[k], e[0], x0[k])
+            xt.append(xk / numpy.linalg.norm(xk))
+        dx = None
+
+        if space + len(xt) > max_space:
+            # Collapse the subspace to the Ritz vectors. Lock the converged
+            # roots and keep the unconverged ones in the search space.
+            if any(conv):
+                log.debug1('Lock %d roots', numpy.count_nonzero(conv))
+                xl = numpy.vstack((xl, x0[conv]))
+                el = numpy.append(el, e[conv])
+            keep = ~conv
+            space = numpy.count_nonzero(keep)
+            xs[:space] = x0[keep]
+            ax[:space] = ax0[keep]
+            heff[:space,:space] = numpy.diag(e[keep])
+            elast = elast[keep]
+        ax0 = None
+
+        if len(xt) > 0:
+            xt = _orth_block(numpy.asarray(xt), [xl, xs[:space]], lindep)
+        log.debug('davidson %d %d  |r|= %4.3g  e= %s  max|de|= %4.3g',
+                  icyc, space, max_dx_norm, e, de[ide])
+        if len(xt) == 0:
+            log.debug('Linear dependency in trial subspace. |r| for each state %s',
+                      dx_norm)
+            conv = conv | (dx_norm < toloose)
+            break
+
+        if callable(callback):
+            callback(locals())
+
+    # Merge the locked roots and the roots of the active space
+    nact = len(e)
+    e = numpy.append(el, e)
+    conv = numpy.append(numpy.ones(len(el), dtype=bool), conv[:nact])
+    x0 = numpy.vstack((xl, x0))
+    idx = numpy.argsort(e, kind='stable')
+    e = e[idx]
+    conv = conv[idx]
+    x0 = [x0[i] for i in idx]
+    xs = ax = None
+
+    h_dim = x0[0].size
+    if len(x0) < min(h_dim, nroots):
+        msg = 'Not enough eigenvectors (len(x0)=%d, nroots=%d)' % (len(x0), nroots)
+        warnings.warn(msg)
+    return conv, e, x0
+
+def _block_buffer(shape, dtype, incore=True):
+    '''2D buffer for the trial vectors. It is a memmap array in TMPDIR if
+    the buffer is not held in memory'''
+    if incore:
+        return numpy.empty(shape, dtype=dtype)
+    else:
+        ftmp = tempfile.TemporaryFile(dir=param.TMPDIR)
+        return numpy.memmap(ftmp, dtype=dtype, mode='w+', shape=shape)
+
+def _orth_block(xt, bases, lindep=1e-14):
+    '''Orthonormalize the rows of xt against the (orthonormal) rows of the
+    arrays in bases and among themselves. Vectors with norm^2 < lindep after
+    the projection are discarded.'''
+    xt = numpy.array(xt, copy=True)
+    # Two rounds of block Gram-Schmidt for numerical stability
+    for i in range(2):
+        for b in bases:
+            if len(b) > 0:
+                xt -= numpy.dot(numpy.dot(xt, b.T.conj()), b)
+        s = numpy.dot(xt.conj(), xt.T)
+        w, u = scipy.linalg.eigh(s)
+        mask = w > lindep
+        if not any(mask):
+            return xt[:0]
+        # Canonical orthogonalization in the non-singular space
+        xt = numpy.dot((u[:,mask] / numpy.sqrt(w[mask])).T, xt)
+    return xt
+
+
 def make_diag_precond(diag, level_shift=0):
     '''Generate the preconditioner function with the diagonal function.'''
     def precond(dx, e, *args):
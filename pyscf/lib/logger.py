@@ -75,10 +75,27 @@ control at which level the timing information should be output.  It is 5
 >>> log.timer('test', t0)
     CPU time for test      0.00 sec
 
+
+profile
+-------
+Every timer call can be recorded by a profile session, independent of the
+verbose level.  The recorded intervals are organized in a tree by time
+containment and can be exported in JSON or in the Chrome trace format
+(which can be loaded in chrome://tracing or Perfetto).
+
+>>> with lib.logger.profile_session('scf.json') as prof:
+...     mf = scf.RHF(mol).run()
+>>> prof.summary()
+>>> prof.dump('scf_trace.json', format='chrome')
+
 '''
 
+import os
 import sys
 import time
+import json
+import threading
+import contextlib
 if sys.version_info >= (3,6):
     time.clock = time.process_time
     if sys.version_info >= (3,8):
@@ -166,12 +183,16 @@ def timer(rec, msg, cpu0=None, wall0=None):
         cpu0 = rec._t0
     if wall0:
         rec._t0, rec._w0 = time.clock(), time.time()
+        if _profile_sessions:
+            _profile_record(msg, cpu0, rec._t0, wall0, rec._w0)
         if rec.verbose >= TIMER_LEVEL:
             flush(rec, '    CPU time for %s %9.2f sec, wall time %9.2f sec'
                   % (msg, rec._t0-cpu0, rec._w0-wall0))
         return rec._t0, rec._w0
     else:
         rec._t0 = time.clock()
+        if _profile_sessions:
+            _profile_record(msg, cpu0, rec._t0)
         if rec.verbose >= TIMER_LEVEL:
             flush(rec, '    CPU time for %s %9.2f sec' % (msg, rec._t0-cpu0))
         return rec._t0
@@ -181,9 +202,13 @@ def timer_debug1(rec, msg, cpu0=None, wall0=None):
         return timer(rec, msg, cpu0, wall0)
     elif wall0:
         rec._t0, rec._w0 = time.clock(), time.time()
+        if _profile_sessions:
+            _profile_record(msg, cpu0, rec._t0, wall0, rec._w0)
         return rec._t0, rec._w0
     else:
         rec._t0 = time.clock()
+        if _profile_sessions:
+            _profile_record(msg, cpu0, rec._t0)
         return rec._t0
 
 class Logger(object):
@@ -235,3 +260,189 @@ def new_logger(rec=None, verbose=None):
         log = Logger(rec.stdout, rec.verbose)
     return log
 
+
+# Active profile sessions. Each timer call is recorded in all of them.
+_profile_sessions = []
+
+def _profile_record(msg, cpu0, cpu1, wall0=None, wall1=None):
+    # frame 0 is this function, frame 1 the timer, frame 2 is either the
+    # caller of timer or timer_debug1
+    frame = sys._getframe(2)
+    if frame.f_code is timer_debug1.__code__:
+        frame = frame.f_back
+    caller = '%s:%s' % (frame.f_globals.get('__name__'), frame.f_code.co_name)
+    for session in _profile_sessions:
+        session.record(msg, cpu0, cpu1, wall0, wall1, caller)
+
+def _io_counters():
+    '''Bytes read and written by the process (/proc/self/io). This covers
+    the HDF5 I/O of ao2mo, DF and the other out-of-core modules.'''
+    try:
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(':') for line in f)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (IOError, OSError, KeyError, ValueError):
+        return None, None
+
+class ProfileSession(object):
+    '''Collector of the intervals reported by :func:`timer`.
+
+    Each event records the label of the timer, the caller (module:function),
+    the CPU and wall time, the resident memory at the end of the interval
+    and the bytes of I/O during the interval.  The events are organized in a
+    tree by the containment of their wall time intervals.  Timers without
+    wall time are recorded as instant events.
+    '''
+    def __init__(self):
+        from pyscf.lib.misc import current_memory
+        self._current_memory = current_memory
+        self._lock = threading.Lock()
+        self.events = []
+        self.peak_rss = 0
+        self.start = time.time()
+        self.end = None
+        # Samples of (wall, rchar, wchar) to compute the I/O of intervals.
+        # The start of an interval is usually the end of a previous timer.
+        self._io_samples = [(self.start,) + _io_counters()]
+
+    def _io_at(self, wall):
+        samples = self._io_samples
+        for sample in reversed(samples):
+            if sample[0] <= wall:
+                return sample
+        return samples[0]
+
+    def record(self, label, cpu0, cpu1, wall0=None, wall1=None, caller=None):
+        now = time.time()
+        if wall1 is None:
+            wall1 = now
+        if wall0 is None:
+            wall0 = wall1
+        rss = self._current_memory()[0]
+        io = _io_counters()
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            io0 = self._io_at(wall0)
+            if io[0] is None or io0[1] is None:
+                io_read = io_write = None
+            else:
+                io_read = io[0] - io0[1]
+                io_write = io[1] - io0[2]
+            self._io_samples.append((wall1,) + io)
+            if len(self._io_samples) > 4096:
+                del self._io_samples[1:2048]
+            self.events.append({
+                'name': label,
+                'caller': caller,
+                'start': wall0 - self.start,
+                'wall': wall1 - wall0,
+                'cpu': cpu1 - cpu0,
+                'rss_mb': rss,
+                'io_read': io_read,
+                'io_write': io_write,
+                'pid': os.getpid(),
+                'tid': threading.current_thread().ident,
+            })
+
+    def close(self):
+        self.end = time.time()
+        return self
+
+    def tree(self):
+        '''Nested events. Each node has the additional keys "path" (the
+        labels of the enclosing events joined by "/") and "children".'''
+        events = sorted(self.events, key=lambda e: (e['start'], -e['wall']))
+        roots = []
+        stack = []
+        eps = 1e-9
+        for e in events:
+            node = dict(e, children=[])
+            end = e['start'] + e['wall']
+            while stack:
+                top = stack[-1]
+                if top['start'] + top['wall'] + eps >= end:
+                    break
+                stack.pop()
+            if stack:
+                node['path'] = stack[-1]['path'] + '/' + e['name']
+                stack[-1]['children'].append(node)
+            else:
+                node['path'] = e['name']
+                roots.append(node)
+            stack.append(node)
+        return roots
+
+    def summary(self, stdout=None):
+        '''Total CPU and wall time for each label. Numbers in the labels
+        (eg the cycle index) are replaced by "#" so that the iterations are
+        aggregated.'''
+        import re
+        table = {}
+        for e in self.events:
+            key = re.sub(r'\d+', '#', e['name'])
+            t = table.setdefault(key, [0, 0., 0.])
+            t[0] += 1
+            t[1] += e['cpu']
+            t[2] += e['wall']
+        if stdout is not None:
+            stdout.write('%-40s %6s %10s %10s\n' % ('timer', 'count', 'CPU', 'wall'))
+            for key, (count, cpu, wall) in sorted(table.items(),
+                                                  key=lambda x: -x[1][2]):
+                stdout.write('%-40s %6d %10.2f %10.2f\n' % (key, count, cpu, wall))
+        return table
+
+    def to_json(self):
+        return {'format': 1,
+                'start': self.start,
+                'end': self.end,
+                'peak_rss_mb': self.peak_rss,
+                'events': self.events,
+                'tree': self.tree()}
+
+    def to_chrome_trace(self):
+        '''Events in the Chrome trace event format (complete events "X",
+        time in microseconds).'''
+        trace = []
+        for e in self.events:
+            trace.append({'name': e['name'], 'cat': 'pyscf', 'ph': 'X',
+                          'ts': e['start'] * 1e6, 'dur': e['wall'] * 1e6,
+                          'pid': e['pid'], 'tid': e['tid'],
+                          'args': {'cpu': e['cpu'], 'caller': e['caller'],
+                                   'rss_mb': e['rss_mb'],
+                                   'io_read': e['io_read'],
+                                   'io_write': e['io_write']}})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def dump(self, filename, format='json'):
+        '''Write the profile to filename. format can be "json" or "chrome".'''
+        if format == 'json':
+            data = self.to_json()
+        elif format == 'chrome':
+            data = self.to_chrome_trace()
+        else:
+            raise ValueError('Unknown profile format %s' % format)
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+        return self
+
+@contextlib.contextmanager
+def profile_session(filename=None, format='json'):
+    '''Record all timer calls within the context.  If filename is given,
+    the profile is written to the file (see :meth:`ProfileSession.dump`)
+    when exiting the context.
+
+    Examples:
+
+    >>> with profile_session('profile.json') as prof:
+    ...     mf.kernel()
+    >>> prof.summary(sys.stdout)
+    '''
+    session = ProfileSession()
+    _profile_sessions.append(session)
+    try:
+        yield session
+    finally:
+        _profile_sessions.remove(session)
+        session.close()
+        if filename is not None:
+            session.dump(filename, format)
@@ -447,6 +447,56 @@ void FCIcontract_2e_spin1(double *eri, double *ci0, double *ci1,
 }
 
 
+/*
+ * Contributions of the alpha strings [stra0:stra1] and the beta strings
+ * [strb0:strb1] to the contraction of FCIcontract_2e_spin1.  The
+ * contributions of the beta-excitations are added to the rows
+ * [stra0:stra1] of ci1 (na x nb, not initialized).  The contributions of
+ * the alpha-excitations are added to ci1a (na x (strb1-strb0), not
+ * initialized), which holds the columns [strb0:strb1] of all rows.
+ * Summing over the ranges of all alpha and beta strings gives the output
+ * of FCIcontract_2e_spin1.
+ */
+void FCIcontract_2e_spin1_strs(double *eri, double *ci0, double *ci1, double *ci1a,
+                               int norb, int na, int nb, int nlinka, int nlinkb,
+                               int *link_indexa, int *link_indexb,
+                               int stra0, int stra1, int strb0, int strb1)
+{
+        _LinkTrilT *clinka = malloc(sizeof(_LinkTrilT) * nlinka * na);
+        _LinkTrilT *clinkb = malloc(sizeof(_LinkTrilT) * nlinkb * nb);
+        FCIcompress_link_tril(clinka, link_indexa, na, nlinka);
+        FCIcompress_link_tril(clinkb, link_indexb, nb, nlinkb);
+        const size_t ncol = strb1 - strb0;
+
+        double *ci1bufs[MAX_THREADS];
+#pragma omp parallel
+{
+        int strk, ib;
+        size_t blen;
+        double *t1buf = malloc(sizeof(double) * (STRB_BLKSIZE*norb*(norb+1)+2));
+        double *ci1buf = malloc(sizeof(double) * (na*STRB_BLKSIZE+2));
+        ci1bufs[omp_get_thread_num()] = ci1buf;
+        for (ib = strb0; ib < strb1; ib += STRB_BLKSIZE) {
+                blen = MIN(STRB_BLKSIZE, strb1-ib);
+                memset(ci1buf, 0, sizeof(double) * na*blen);
+#pragma omp for schedule(static)
+                for (strk = stra0; strk < stra1; strk++) {
+                        ctr_rhf2e_kern(eri, ci0, ci1, ci1buf, t1buf,
+                                       blen, blen, blen, strk, ib,
+                                       norb, na, nb, nlinka, nlinkb,
+                                       clinka, clinkb);
+                }
+#pragma omp barrier
+                _reduce(ci1a+ib-strb0, ci1bufs, na, ncol, blen);
+#pragma omp barrier
+        }
+        free(ci1buf);
+        free(t1buf);
+}
+        free(clinka);
+        free(clinkb);
+}
+
 /*
  * eri_ab is mixed integrals (alpha,alpha|beta,beta), |beta,beta) in small strides
  */
@@ -63,27 +63,32 @@ static void make_occ_vir(int *occ, int *vir, uint64_t str1, int norb)
         }
 }
 
-void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
-                        uint64_t *strs, int store_trilidx)
+static void cre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
+                            uint64_t *strs, int ninter, uint64_t *inter,
+                            int store_trilidx)
 {
-        int ninter = nstrs;
         int occ[norb];
         int vir[norb];
         int nvir = norb - nocc;
         int nlink = nocc * nvir + nocc;
-        int str_id, i, a, k, ai, addr;
+        int str_id, i, a, k, ai, addr, addr1;
         uint64_t str0, str1;
         int *tab;
 
         for (str_id = 0; str_id < ninter; str_id++) {
-                str1 = strs[str_id];
+                str1 = inter[str_id];
                 make_occ_vir(occ, vir, str1, norb);
+                if (inter == strs) {
+                        addr1 = str_id;
+                } else {
+                        addr1 = SCIstr2addr(str1, strs, nstrs);
+                }
 
                 tab = link_index + str_id * nlink * 4;
                 if (store_trilidx) {
                         for (k = 0; k < nocc; k++) {
                                 tab[k*4+0] = occ[k]*(occ[k]+1)/2+occ[k];
-                                tab[k*4+2] = str_id;
+                                tab[k*4+2] = addr1;
                                 tab[k*4+3] = 1;
                         }
                         for (a = 0; a < nvir; a++) {
@@ -107,7 +112,7 @@ void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
                         for (k = 0; k < nocc; k++) {
                                 tab[k*4+0] = occ[k];
                                 tab[k*4+1] = occ[k];
-                                tab[k*4+2] = str_id;
+                                tab[k*4+2] = addr1;
                                 tab[k*4+3] = 1;
                         }
                         for (a = 0; a < nvir; a++) {
@@ -126,6 +131,25 @@ void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
         }
 }
 
+void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
+                        uint64_t *strs, int store_trilidx)
+{
+        cre_des_linkstr(link_index, norb, nstrs, nocc, strs, nstrs, strs,
+                        store_trilidx);
+}
+
+/*
+ * The rows of the link table for the strings inter (a subset of strs).
+ * Addresses are the indices in strs.
+ */
+void SCIcre_des_linkstr_subset(int *link_index, int norb, int nstrs, int nocc,
+                               uint64_t *strs, int ninter, uint64_t *inter,
+                               int store_trilidx)
+{
+        cre_des_linkstr(link_index, norb, nstrs, nocc, strs, ninter, inter,
+                        store_trilidx);
+}
+
 void SCIdes_des_linkstr(int *link_index, int norb, int nocc, int nstrs, int ninter,
                         uint64_t *strs, uint64_t *inter, int store_trilidx)
 {
@@ -13,9 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import unittest
-import numpy
 import tempfile
+import numpy
+import h5py
 from pyscf import lib, gto
 
 class KnownValues(unittest.TestCase):
@@ -60,6 +62,49 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(numpy.all(a['x'][1] == dat['x'][1]))
         self.assertTrue(numpy.all(a['y'][0] == dat['y'][0]))
 
+    def test_dump_atomic(self):
+        fchk = tempfile.NamedTemporaryFile()
+        a = numpy.eye(3)
+        lib.chkfile.dump_atomic(fchk.name, 'a', a)
+        lib.chkfile.dump_atomic(fchk.name, 'b/c', {'x': a*2, 'y': 1})
+        lib.chkfile.dump_atomic(fchk.name, 'b/d', a*3)
+        self.assertTrue(numpy.all(a == lib.chkfile.load(fchk.name, 'a')))
+        dat = lib.chkfile.load(fchk.name, 'b')
+        self.assertTrue(numpy.all(a*2 == dat['c']['x']))
+        self.assertTrue(numpy.all(a*3 == dat['d']))
+
+        lib.chkfile.dump_atomic(fchk.name, 'a', a*4)
+        self.assertTrue(numpy.all(a*4 == lib.chkfile.load(fchk.name, 'a')))
+        lib.chkfile.dump_atomic(fchk.name, 'b/c', {'x': a[:2], 'y': 2})
+        dat = lib.chkfile.load(fchk.name, 'b')
+        self.assertTrue(numpy.all(a[:2] == dat['c']['x']))
+        self.assertEqual(dat['c']['y'], 2)
+        self.assertTrue(numpy.all(a*3 == dat['d']))
+        with h5py.File(fchk.name, 'r') as f:
+            self.assertEqual(sorted(f['b'].keys()), ['c', 'd'])
+
+    def test_dump_atomic_interrupted(self):
+        fchk = tempfile.NamedTemporaryFile(dir=tempfile.mkdtemp())
+        a = numpy.eye(3)
+        lib.chkfile.dump_atomic(fchk.name, 't1', a)
+        lib.chkfile.dump_atomic(fchk.name, 't2', a*2)
+
+        def dump_killed(filename, key, value):
+            with h5py.File(filename, 'r+') as f:
+                f['t1'][:] = 0
+                del(f['t2'])
+            raise KeyboardInterrupt
+        dump_bak, lib.chkfile.dump = lib.chkfile.dump, dump_killed
+        try:
+            self.assertRaises(KeyboardInterrupt, lib.chkfile.dump_atomic,
+                              fchk.name, 't1', a*3)
+        finally:
+            lib.chkfile.dump = dump_bak
+        self.assertTrue(numpy.all(a == lib.chkfile.load(fchk.name, 't1')))
+        self.assertTrue(numpy.all(a*2 == lib.chkfile.load(fchk.name, 't2')))
+        self.assertEqual(os.listdir(os.path.dirname(fchk.name)),
+                         [os.path.basename(fchk.name)])
+
 
 if __name__ == "__main__":
     print("Full Tests for lib.chkfile")
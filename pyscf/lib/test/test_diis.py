@@ -48,6 +48,33 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(abs(a.dot(x) - b).max(), 0, 6)
         self.assertAlmostEqual(abs(x - numpy.linalg.solve(a,b)).max(), 0, 6)
 
+    def test_memmap(self):
+        a, b, adiag, arest, x0 = make_ab(16)
+        lib.diis.INCORE_SIZE, bak = 4, lib.diis.INCORE_SIZE
+        try:
+            ad = lib.diis.DIIS()
+            ad.memmap = True
+            x = x0
+            for i in range(20):
+                x = (b - arest.dot(x)) / adiag
+                x = ad.update(x)
+            self.assertTrue(isinstance(ad._diisfile, lib.diis._MemmapStore))
+            self.assertAlmostEqual(abs(x - numpy.linalg.solve(a,b)).max(), 0, 6)
+
+            ad = lib.diis.DIIS()
+            ad.memmap = True
+            ad.err_dtype = numpy.float32
+            x = x0
+            for i in range(20):
+                e = b - a.dot(x)
+                x = (b - arest.dot(x)) / adiag
+                x = ad.update(x, xerr=e)
+            self.assertEqual(ad.get_err_vec(0).dtype, numpy.float32)
+            self.assertEqual(ad._H.dtype, numpy.double)
+            self.assertAlmostEqual(abs(x - numpy.linalg.solve(a,b)).max(), 0, 5)
+        finally:
+            lib.diis.INCORE_SIZE = bak
+
     def test_restore(self):
         a, b, adiag, arest, x = make_ab(16)
         lib.diis.INCORE_SIZE, bak = 4, lib.diis.INCORE_SIZE
@@ -19,6 +19,7 @@ import unittest
 import numpy
 import scipy.linalg
 import tempfile
+from pyscf import lib
 from pyscf import gto
 from pyscf import scf
 from pyscf import fci
@@ -38,6 +39,28 @@ class KnownValues(unittest.TestCase):
         e = myfci.kernel()[0]
         self.assertAlmostEqual(e, -11.579978414933732+mol.energy_nuc(), 9)
 
+    def test_davidson1_block(self):
+        numpy.random.seed(12)
+        n = 200
+        a = numpy.random.random((n,n)) * .1
+        a = a + a.T + numpy.diag(numpy.arange(n))
+        aop = lambda xs: [a.dot(x) for x in xs]
+        precond = lambda dx, e, x0: dx / (a.diagonal() - e + 1e-4)
+        x0 = numpy.eye(n)[:3]
+        eref = scipy.linalg.eigh(a)[0][:5]
+
+        conv, e, c = lib.linalg_helper.davidson1_block(
+            aop, x0, precond, tol=1e-10, max_space=6, nroots=5, max_cycle=200)
+        self.assertTrue(all(conv))
+        self.assertAlmostEqual(abs(e - eref).max(), 0, 8)
+        c = numpy.asarray(c)
+        self.assertAlmostEqual(abs(c.dot(c.T) - numpy.eye(5)).max(), 0, 6)
+
+        # trial vectors in memmap buffers
+        conv, e, c = lib.linalg_helper.davidson1_block(
+            aop, x0, precond, tol=1e-10, nroots=5, max_memory=1e-3)
+        self.assertAlmostEqual(abs(e - eref).max(), 0, 8)
+
 if __name__ == "__main__":
     print("Full Tests for linalg_helper")
     unittest.main()
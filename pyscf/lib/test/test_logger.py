@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Copyright 2014-2021 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import time
+import tempfile
+import unittest
+from pyscf.lib import logger
+
+def inner(log, t0):
+    time.sleep(.01)
+    return log.timer_debug1('inner %d' % 1, *t0)
+
+class KnownValues(unittest.TestCase):
+    def test_profile_session(self):
+        log = logger.Logger(io.StringIO(), logger.QUIET)
+        with logger.profile_session() as prof:
+            t0 = t1 = (time.clock(), time.time())
+            t1 = inner(log, t1)
+            t1 = inner(log, t1)
+            log.timer('cpu only', time.clock())
+            log.timer('outer', *t0)
+        log.timer('not recorded', *t0)
+
+        self.assertEqual(len(prof.events), 4)
+        self.assertEqual(prof.events[0]['caller'], __name__ + ':inner')
+        tree = prof.tree()
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree[0]['name'], 'outer')
+        self.assertEqual([c['path'] for c in tree[0]['children']],
+                         ['outer/inner 1', 'outer/inner 1', 'outer/cpu only'])
+        self.assertTrue(tree[0]['wall'] >= .02)
+
+        table = prof.summary()
+        self.assertEqual(table['inner #'][0], 2)
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as f:
+            prof.dump(f.name, format='chrome')
+            with open(f.name) as fin:
+                trace = json.load(fin)
+        self.assertEqual(len(trace['traceEvents']), 4)
+        self.assertEqual(trace['traceEvents'][3]['ph'], 'X')
+
+
+if __name__ == "__main__":
+    print("Tests for logger")
+    unittest.main()
@@ -29,6 +29,7 @@ from pyscf import __config__
 
 BASE = getattr(__config__, 'mcscf_addons_sort_mo_base', 1)
 MAP2HF_TOL = getattr(__config__, 'mcscf_addons_map2hf_tol', 0.4)
+PROJECT_LINDEP = getattr(__config__, 'mcscf_addons_project_lindep', 1e-6)
 
 if sys.version_info < (3,):
     RANGE_TYPE = list
@@ -486,6 +487,63 @@ def project_init_guess (casscf, mo_init, prev_mol=None, priority=None, use_hf_co
     return mo
 
 
+def _project_core_active(casscf, mo_init, prev_mol=None, s1=None, s21=None,
+                         lindep=PROJECT_LINDEP):
+    '''Project the core and active orbitals of mo_init (associated to
+    prev_mol) to the geometry of casscf.mol.  This is a cheap variant of
+    :func:`project_init_guess` for PES scans.  Only the ncore+ncas columns
+    are projected (through the cross overlap between prev_mol and
+    casscf.mol) and they are Lowdin orthogonalized subspace by subspace,
+    active orbitals first.  The virtual orbitals are the HF virtual
+    orbitals with the core and active components removed.
+
+    s1 is the AO overlap of casscf.mol and s21 is the cross overlap between
+    casscf.mol and prev_mol.  They are computed if not given.
+
+    Returns None if the projected orbitals are linearly dependent.  The
+    caller should fall back to :func:`project_init_guess` in this case.
+    '''
+    from pyscf.lo.orth import vec_lowdin
+    mol = casscf.mol
+    ncore = casscf.ncore
+    nocc = ncore + casscf.ncas
+    if s1 is None:
+        s1 = casscf._scf.get_ovlp(mol)
+    mo_occ = numpy.asarray(mo_init)[:,:nocc]
+    if prev_mol is not None and not _same_geom(prev_mol, mol):
+        if s21 is None:
+            s21 = gto.intor_cross('int1e_ovlp', mol, prev_mol)
+        mo_occ = lib.cho_solve(s1, numpy.dot(s21, mo_occ), strict_sym_pos=False)
+
+    def orth(c):
+        if c.shape[1] == 0:
+            return c
+        w = scipy.linalg.eigh(reduce(numpy.dot, (c.conj().T, s1, c)))[0]
+        if w[0] < lindep:
+            return None
+        return vec_lowdin(c, s1)
+
+    mo_cas = orth(mo_occ[:,ncore:nocc])
+    if mo_cas is None:
+        return None
+    mo_core = mo_occ[:,:ncore]
+    mo_core = mo_core - reduce(numpy.dot, (mo_cas, mo_cas.conj().T, s1, mo_core))
+    mo_core = orth(mo_core)
+    if mo_core is None:
+        return None
+
+    mo_o = numpy.hstack((mo_core, mo_cas))
+    mo_vir = casscf._scf.mo_coeff[:,nocc:]
+    mo_vir = mo_vir - reduce(numpy.dot, (mo_o, mo_o.conj().T, s1, mo_vir))
+    mo_vir = orth(mo_vir)
+    if mo_vir is None:
+        return None
+    return numpy.hstack((mo_o, mo_vir))
+
+def _same_geom(mol1, mol2, tol=1e-10):
+    return (mol1.natm == mol2.natm and
+            abs(mol1.atom_coords() - mol2.atom_coords()).max() < tol)
+
 def project_init_guess_old(casscf, init_mo, prev_mol=None):
     '''Project the given initial guess to the current CASSCF problem.  The
     projected initial guess has two parts.  The core orbitals are directly
@@ -1110,6 +1168,16 @@ class StateAverageMixFCISolver_state_args (StateAverageMixFCISolver_solver_args)
 
 def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
     '''State-average CASSCF over multiple FCI solvers.
+
+    If mc.fcisolver.nproc_solvers > 1, the FCI solvers are run concurrently
+    in a pool of spawned processes, which also return the RDMs of their
+    states. Each process rebuilds the solver from its class and its plain
+    attributes. This is only enabled when all solvers are of the direct_spin1
+    family and their classes can be imported (selected CI, external and
+    dynamically created solvers, e.g. fix_spin_, run in this process). The
+    pool is created in the first call of the solver kernel and kept by
+    the solver. Spawned processes import the __main__ module, so a script
+    using nproc_solvers needs the "if __name__ == '__main__':" guard.
     '''
     fcibase_class = fcisolvers[0].__class__
     nroots = sum(solver.nroots for solver in fcisolvers)
@@ -1123,13 +1191,21 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
     _solver_args = StateAverageMixFCISolver_solver_args
     _state_args = StateAverageMixFCISolver_state_args
     class FakeCISolver(fcibase_class, StateAverageMixFCISolver):
+        # Number of processes to run the FCI solvers concurrently
+        nproc_solvers = getattr(__config__, 'mcscf_addons_state_average_mix_nproc_solvers', 1)
+
         def __init__(self, mol):
             fcibase_class.__init__(self, mol)
             self.nroots = len(weights)
             self.weights = weights
             self.e_states = [None]
             self.fcisolvers = fcisolvers
-            keys = set (('weights','e_states','_base_class','fcisolvers'))
+            # CI vectors and the RDMs computed with them in kernel
+            self._rdm12_cache = None
+            # (nproc, pool, pid) of the processes for nproc_solvers
+            self._sa_pool = None
+            keys = set (('weights','e_states','_base_class','fcisolvers',
+                         'nproc_solvers','_rdm12_cache','_sa_pool'))
             self._keys = self._keys.union (keys)
 
         @property
@@ -1208,16 +1284,48 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
             log = logger.new_logger(self, verbose)
             es = []
             cs = []
-            for solver, my_args, my_kwargs in self._loop_solver(_state_args (ci0)):
-                c0 = my_args[0]
-                e, c = solver.kernel(h1, h2, norb, self._get_nelec(solver, nelec), c0,
-                                     orbsym=self.orbsym, verbose=log, **kwargs)
-                if solver.nroots == 1:
-                    es.append(e)
-                    cs.append(c)
-                else:
-                    es.extend(e)
-                    cs.extend(c)
+            self._rdm12_cache = None
+            solver_descs = None
+            if self.nproc_solvers > 1 and len(self.fcisolvers) > 1:
+                import multiprocessing
+                solver_descs = [_sa_mix_solver_desc(solver)
+                                for solver in self.fcisolvers]
+                if not hasattr(multiprocessing, 'get_context'):
+                    log.warn('nproc_solvers requires Python 3. '
+                             'FCI solvers are run in this process.')
+                    solver_descs = None
+                elif any(desc is None for desc in solver_descs):
+                    log.warn('FCI solvers cannot be rebuilt in other processes. '
+                             'They are run in this process.')
+                    solver_descs = None
+            if solver_descs is not None:
+                dm1s = []
+                dm2s = []
+                results = self._kernel_parallel(solver_descs, h1, h2, norb,
+                                                nelec, ci0, **kwargs)
+                for solver, (e, c, dms, conv) in zip(self.fcisolvers, results):
+                    solver.converged = conv
+                    solver.eci, solver.ci = e, c
+                    if solver.nroots == 1:
+                        es.append(e)
+                        cs.append(c)
+                    else:
+                        es.extend(e)
+                        cs.extend(c)
+                    dm1s.extend([dm[0] for dm in dms])
+                    dm2s.extend([dm[1] for dm in dms])
+                self._rdm12_cache = (cs, dm1s, dm2s)
+            else:
+                for solver, my_args, my_kwargs in self._loop_solver(_state_args (ci0)):
+                    c0 = my_args[0]
+                    e, c = solver.kernel(h1, h2, norb, self._get_nelec(solver, nelec), c0,
+                                         orbsym=self.orbsym, verbose=log, **kwargs)
+                    if solver.nroots == 1:
+                        es.append(e)
+                        cs.append(c)
+                    else:
+                        es.extend(e)
+                        cs.extend(c)
             self.e_states = es
             self.converged = numpy.all(getattr(sol, 'converged', True)
                                        for sol in fcisolvers)
@@ -1232,6 +1340,47 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
                         log.debug('state %d  E = %.15g', i, ei)
             return numpy.einsum('i,i', numpy.array(es), weights), cs
 
+        def _kernel_parallel(self, solver_descs, h1, h2, norb, nelec,
+                             ci0=None, **kwargs):
+            '''Run the FCI solvers in the process pool. Each process rebuilds
+            the solver from solver_descs and returns the energies, the CI
+            vectors and the RDM12 of its states.'''
+            nproc = min(self.nproc_solvers, len(self.fcisolvers))
+            nthreads = max(1, lib.num_threads() // nproc)
+            ci0s = [my_args[0] for solver, my_args, my_kwargs
+                    in self._loop_solver(_state_args (ci0))]
+            nelecs = [self._get_nelec(solver, nelec) for solver in self.fcisolvers]
+            logger.debug(self, 'Run %d FCI solvers on %d processes',
+                         len(self.fcisolvers), nproc)
+            tasks = [(desc, h1, h2, norb, nelecs[i], ci0s[i], self.orbsym,
+                      nthreads, kwargs) for i, desc in enumerate(solver_descs)]
+            return self._get_pool(nproc).map(_sa_mix_kernel_task, tasks,
+                                             chunksize=1)
+
+        def _get_pool(self, nproc):
+            '''The pool of spawned processes, created at the first call and
+            reused by the following calls of kernel.'''
+            import os
+            import multiprocessing
+            if self._sa_pool is not None:
+                if self._sa_pool[0] == nproc and self._sa_pool[2] == os.getpid():
+                    return self._sa_pool[1]
+                if self._sa_pool[2] == os.getpid():
+                    self._sa_pool[1].terminate()
+            # A fresh interpreter for each process. Forking after the OpenMP
+            # runtime was initialized in this process may hang the processes.
+            pool = multiprocessing.get_context('spawn').Pool(nproc)
+            self._sa_pool = (nproc, pool, os.getpid())
+            return pool
+
+        def _cached_rdm12(self, ci0):
+            cache = self._rdm12_cache
+            if (cache is not None and isinstance(ci0, (list, tuple)) and
+                len(ci0) == len(cache[0]) and
+                all(c is c1 for c, c1 in zip(ci0, cache[0]))):
+                return cache[1], cache[2]
+            return None
+
         def approx_kernel(self, h1, h2, norb, nelec, ci0=None, **kwargs):
             es = []
             cs = []
@@ -1252,6 +1401,9 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
             return numpy.einsum('i,i->', es, weights), cs
 
         def states_make_rdm1 (self, ci0, norb, nelec, link_index=None, **kwargs):
+            dms = self._cached_rdm12(ci0)
+            if dms is not None:
+                return list(dms[0])
             ci0 = _state_args (ci0)
             link_index = _solver_args (link_index)
             nelec = _solver_args ([self._get_nelec (solver, nelec) for solver in self.fcisolvers])
@@ -1278,6 +1430,9 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
             return dm1s[0], dm1s[1]
 
         def states_make_rdm12 (self, ci0, norb, nelec, link_index=None, **kwargs):
+            dms = self._cached_rdm12(ci0)
+            if dms is not None:
+                return list(dms[0]), list(dms[1])
             ci0 = _state_args (ci0)
             link_index = _solver_args (link_index)
             nelec = _solver_args ([self._get_nelec (solver, nelec) for solver in self.fcisolvers])
@@ -1351,6 +1506,54 @@ def state_average_mix(casscf, fcisolvers, weights=(0.5,0.5)):
     mc = _state_average_mcscf_solver(casscf, fcisolver)
     return mc
 
+# Attributes of the FCI solver which are not passed to the processes of
+# state_average_mix
+_SA_MIX_SKIP_KEYS = set(('mol', 'stdout', 'ci', 'eci', 'converged'))
+
+def _sa_mix_solver_desc(solver):
+    '''A picklable description (class, mol, attributes) of the solver to
+    rebuild it in another process. None if the solver is not of the
+    direct_spin1 family or its class cannot be imported. The results are
+    returned by pickling, which only keeps the plain CI vectors.'''
+    from pyscf.fci import direct_spin1, selected_ci
+    cls = solver.__class__
+    if (not isinstance(solver, direct_spin1.FCISolver) or
+        isinstance(solver, selected_ci.SelectedCI) or
+        getattr(sys.modules.get(cls.__module__), cls.__name__, None) is not cls):
+        return None
+    attrs = {}
+    for key, val in solver.__dict__.items():
+        if key in _SA_MIX_SKIP_KEYS:
+            continue
+        if val is None or isinstance(val, (bool, int, float, str, tuple,
+                                           list, set, numpy.ndarray)):
+            attrs[key] = val
+    mol = getattr(solver, 'mol', None)
+    if mol is not None:
+        mol = mol.dumps()
+    return cls.__module__, cls.__name__, mol, attrs
+
+def _sa_mix_kernel_task(args):
+    import importlib
+    desc, h1, h2, norb, nelec, ci0, orbsym, nthreads, kwargs = args
+    module, cls_name, mol, attrs = desc
+    cls = getattr(importlib.import_module(module), cls_name)
+    solver = cls.__new__(cls)
+    solver.__dict__.update(attrs)
+    if mol is not None:
+        mol = gto.loads(mol)
+    solver.mol = mol
+    solver.stdout = sys.stdout
+    solver.verbose = logger.QUIET
+    with lib.with_omp_threads(nthreads):
+        e, c = solver.kernel(h1, h2, norb, nelec, ci0, orbsym=orbsym,
+                             verbose=logger.QUIET, **kwargs)
+        if solver.nroots == 1:
+            dms = [solver.make_rdm12(c, norb, nelec)]
+        else:
+            dms = [solver.make_rdm12(x, norb, nelec) for x in c]
+    return e, c, dms, getattr(solver, 'converged', True)
+
 def state_average_mix_(casscf, fcisolvers, weights=(0.5,0.5)):
     ''' Inplace version of state_average '''
     sacasscf = state_average_mix(casscf, fcisolvers, weights)
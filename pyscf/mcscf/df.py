@@ -86,10 +86,18 @@ def density_fit(casscf, auxbasis=None, with_df=None):
 
         def ao2mo(self, mo_coeff=None):
             if self.with_df and 'CASSCF' in casscf_class.__name__:
+                if getattr(self, 'direct_hop', False):
+                    return _ERIS_direct(self, mo_coeff, self.with_df)
                 return _ERIS(self, mo_coeff, self.with_df)
             else:
                 return casscf_class.ao2mo(self, mo_coeff)
 
+        def gen_g_hop(self, mo, u, casdm1, casdm2, eris):
+            if isinstance(eris, _ERIS_direct):
+                return gen_g_hop_direct(self, mo, u, casdm1, casdm2, eris)
+            else:
+                return casscf_class.gen_g_hop(self, mo, u, casdm1, casdm2, eris)
+
         def get_h2eff(self, mo_coeff=None):  # For CASCI
             if self.with_df:
                 ncore = self.ncore
@@ -351,6 +359,243 @@ class _ERIS(object):
         self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
         t0 = log.timer('density fitting ao2mo', *t0)
 
+class _ERIS_direct(object):
+    '''Integrals for the integral-direct orbital hessian operator.
+
+    Only the DF tensor L_{pu} (naux,nmo,ncas) and a few intermediates of size
+    nmo*ncas**3 are held in memory.  ppaa and papa are not generated.  The
+    terms of the hessian operator which require the full DF tensor L_{pq}
+    are computed on the fly in :func:`gen_g_hop_direct`.
+    '''
+    def __init__(self, casscf, mo, with_df):
+        log = logger.Logger(casscf.stdout, casscf.verbose)
+
+        mol = casscf.mol
+        nao, nmo = mo.shape
+        ncore = casscf.ncore
+        ncas = casscf.ncas
+        nocc = ncore + ncas
+        naoaux = with_df.get_naoaux()
+
+        t1 = t0 = (time.clock(), time.time())
+        mo = numpy.asarray(mo, order='F')
+        self.with_df = with_df
+        self.Lpa = numpy.empty((naoaux,nmo,ncas))
+        self.j_pc = numpy.zeros((nmo,ncore))
+        k_cp = numpy.zeros((ncore,nmo))
+        # (pp|uv) and (pu|pv) for the diagonal of the orbital hessian
+        self.jpaa = numpy.zeros((nmo,ncas,ncas))
+        self.kpaa = numpy.zeros((nmo,ncas,ncas))
+
+        mem_now = lib.current_memory()[0]
+        max_memory = max(2000, casscf.max_memory*.9-mem_now-self.Lpa.size*8e-6)
+        blksize = max(4, int(min(with_df.blockdim, max_memory*.3e6/8/nmo**2)))
+        bufs1 = numpy.empty((blksize,nmo,nmo))
+        b0 = 0
+        for eri1 in with_df.loop(blksize):
+            naux = eri1.shape[0]
+            buf = _ao2mo.nr_e2(eri1, mo, (0,nmo,0,nmo), 's2', 's1', out=bufs1)
+            buf = buf.reshape(naux,nmo,nmo)
+            bufpa = buf[:,:,ncore:nocc]
+            self.Lpa[b0:b0+naux] = bufpa
+            bufd = numpy.einsum('kii->ki', buf)
+            self.j_pc += numpy.einsum('ki,kj->ij', bufd, bufd[:,:ncore])
+            k_cp += numpy.einsum('kij,kij->ij', buf[:,:ncore], buf[:,:ncore])
+            self.jpaa += lib.dot(bufd.T, bufpa[:,ncore:nocc].reshape(naux,-1)).reshape(nmo,ncas,ncas)
+            self.kpaa += lib.einsum('kpu,kpv->puv', bufpa, bufpa)
+            b0 += naux
+            t1 = log.timer_debug1('j_pc and k_pc', *t1)
+        self.k_pc = k_cp.T.copy()
+        bufs1 = buf = bufpa = None
+
+        Laa = self.Lpa[:,ncore:nocc].reshape(naoaux,-1)
+        self.paaa = lib.dot(self.Lpa.reshape(naoaux,-1).T, Laa)
+        self.paaa = self.paaa.reshape(nmo,ncas,ncas,ncas)
+
+        dm_core = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
+        vj, vk = casscf.get_jk(mol, dm_core)
+        self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
+        log.timer('density fitting integrals for direct hessian', *t0)
+
+def _trans_px(with_df, mo, mo_x, max_memory):
+    '''Iterate over the blocks of the DF tensor transformed to L_{px}'''
+    nao, nmo = mo.shape
+    nx = mo_x.shape[1]
+    mo = numpy.asarray(numpy.hstack((mo, mo_x)), order='F')
+    blksize = max(4, int(min(with_df.blockdim, max_memory*.3e6/8/(nao**2+nmo*nx))))
+    buf = numpy.empty((blksize,nmo,nx))
+    b0 = 0
+    for eri1 in with_df.loop(blksize):
+        naux = eri1.shape[0]
+        Lpx = _ao2mo.nr_e2(eri1, mo, (0,nmo,nmo,nmo+nx), 's2', 's1', out=buf)
+        yield b0, b0+naux, Lpx.reshape(naux,nmo,nx)
+        b0 += naux
+
+def gen_g_hop_direct(casscf, mo, u, casdm1, casdm2, eris):
+    '''Integral-direct version of :func:`mc1step.gen_g_hop`.
+
+    The contractions of hdm2 (which is as large as ppaa) in the hessian
+    operator are evaluated with the DF tensor L_{pv'}, where
+    v' is the active orbital rotated by the trial vector.
+    '''
+    ncas = casscf.ncas
+    nelecas = casscf.nelecas
+    ncore = casscf.ncore
+    nocc = ncas + ncore
+    nmo = mo.shape[1]
+    with_df = eris.with_df
+    Lpa = eris.Lpa
+    naoaux = Lpa.shape[0]
+    Laa = Lpa[:,ncore:nocc].reshape(naoaux,-1)
+    max_memory = max(2000, casscf.max_memory*.9-lib.current_memory()[0])
+
+    dm1 = numpy.zeros((nmo,nmo))
+    idx = numpy.arange(ncore)
+    dm1[idx,idx] = 2
+    dm1[ncore:nocc,ncore:nocc] = casdm1
+
+    # part5
+    jkcaa = numpy.einsum('iuv,uv->iu', 6*eris.kpaa[:nocc]-2*eris.jpaa[:nocc], casdm1)
+    # part2, part3
+    mo_a = mo[:,ncore:nocc]
+    dm_a = reduce(numpy.dot, (mo_a, casdm1, mo_a.T))
+    vj, vk = casscf.get_jk(casscf.mol, dm_a)
+    vhf_a = reduce(numpy.dot, (mo.T, vj-vk*.5, mo))
+    vj = vk = None
+    # part1 ~ (J + 2K)
+    dm2tmp = casdm2.transpose(1,2,0,3) + casdm2.transpose(0,2,1,3)
+    g_dm2 = numpy.einsum('puwx,wxuv->pv', eris.paaa, casdm2)
+    vhf_ca = eris.vhf_c + vhf_a
+    h1e_mo = reduce(numpy.dot, (mo.T, casscf.get_hcore(), mo))
+
+    ################# gradient #################
+    g = numpy.zeros_like(h1e_mo)
+    g[:,:ncore] = (h1e_mo[:,:ncore] + vhf_ca[:,:ncore]) * 2
+    g[:,ncore:nocc] = numpy.dot(h1e_mo[:,ncore:nocc]+eris.vhf_c[:,ncore:nocc],casdm1)
+    g[:,ncore:nocc] += g_dm2
+
+    def gorb_update(u, fcivec):
+        uc = u[:,:ncore].copy()
+        ua = u[:,ncore:nocc].copy()
+        rmat = u - numpy.eye(nmo)
+        ra = rmat[:,ncore:nocc].copy()
+        mo1 = numpy.dot(mo, u)
+        mo_c = numpy.dot(mo, uc)
+        mo_a = numpy.dot(mo, ua)
+        dm_c = numpy.dot(mo_c, mo_c.T) * 2
+
+        casdm1, casdm2 = casscf.fcisolver.make_rdm12(fcivec, ncas, nelecas)
+        dm_a = reduce(numpy.dot, (mo_a, casdm1, mo_a.T))
+        vj, vk = casscf.get_jk(casscf.mol, (dm_c, dm_a))
+        vhf_c = reduce(numpy.dot, (mo1.T, vj[0]-vk[0]*.5, mo1[:,:nocc]))
+        vhf_a = reduce(numpy.dot, (mo1.T, vj[1]-vk[1]*.5, mo1[:,:nocc]))
+        h1e_mo1 = reduce(numpy.dot, (u.T, h1e_mo, u[:,:nocc]))
+        # p1aa[p,u,w,x] = (p u'|wx), u' = mo * ua
+        p1aa = numpy.zeros((nmo,ncas,ncas*ncas))
+        for b0, b1, Lpu in _trans_px(with_df, mo, mo_a, max_memory):
+            p1aa += lib.dot(Lpu.reshape(b1-b0,-1).T, Laa[b0:b1]).reshape(nmo,ncas,-1)
+        # paa1[p,w,x,v] = (pw|v'x), v' = mo * ra
+        Lra = lib.einsum('kqx,qv->kvx', Lpa, ra)
+        paa1 = lib.dot(Lpa.reshape(naoaux,-1).T, Lra.reshape(naoaux,-1))
+        paa1 = paa1.reshape(nmo,ncas,ncas,ncas).transpose(0,1,3,2)
+        Lra = None
+
+        g = numpy.zeros_like(h1e_mo)
+        g[:,:ncore] = (h1e_mo1[:,:ncore] + vhf_c[:,:ncore] + vhf_a[:,:ncore]) * 2
+        g[:,ncore:nocc] = numpy.dot(h1e_mo1[:,ncore:nocc]+vhf_c[:,ncore:nocc], casdm1)
+        p1aa = lib.dot(u.T, p1aa.reshape(nmo,-1)).reshape(nmo,ncas,ncas,ncas)
+        paa1 = lib.dot(u.T, paa1.reshape(nmo,-1)).reshape(nmo,ncas,ncas,ncas)
+        p1aa += paa1
+        p1aa += paa1.transpose(0,1,3,2)
+        g[:,ncore:nocc] += numpy.einsum('puwx,wxuv->pv', p1aa, casdm2)
+        return casscf.pack_uniq_var(g-g.T)
+
+    ############## hessian, diagonal ###########
+
+    # part7
+    h_diag = numpy.einsum('ii,jj->ij', h1e_mo, dm1) - h1e_mo * dm1
+    h_diag = h_diag + h_diag.T
+
+    # part8
+    g_diag = g.diagonal()
+    h_diag -= g_diag + g_diag.reshape(-1,1)
+    idx = numpy.arange(nmo)
+    h_diag[idx,idx] += g_diag * 2
+
+    # part2, part3
+    v_diag = vhf_ca.diagonal() # (pr|kl) * E(sq,lk)
+    h_diag[:,:ncore] += v_diag.reshape(-1,1) * 2
+    h_diag[:ncore] += v_diag * 2
+    idx = numpy.arange(ncore)
+    h_diag[idx,idx] -= v_diag[:ncore] * 4
+    # V_{pr} E_{sq}
+    tmp = numpy.einsum('ii,jj->ij', eris.vhf_c, casdm1)
+    h_diag[:,ncore:nocc] += tmp
+    h_diag[ncore:nocc,:] += tmp.T
+    tmp = -eris.vhf_c[ncore:nocc,ncore:nocc] * casdm1
+    h_diag[ncore:nocc,ncore:nocc] += tmp + tmp.T
+
+    # part4
+    # -2(pr|sq) + 4(pq|sr) + 4(pq|rs) - 2(ps|rq)
+    tmp = 6 * eris.k_pc - 2 * eris.j_pc
+    h_diag[ncore:,:ncore] += tmp[ncore:]
+    h_diag[:ncore,ncore:] += tmp[ncore:].T
+
+    # part5 and part6 diag
+    # -(qr|kp) E_s^k  p in core, sk in active
+    h_diag[:nocc,ncore:nocc] -= jkcaa
+    h_diag[ncore:nocc,:nocc] -= jkcaa.T
+
+    # hdm2[p,u,p,u]
+    v_diag = (numpy.einsum('pwx,wxuu->pu', eris.jpaa, casdm2) +
+              numpy.einsum('pwx,wxuu->pu', eris.kpaa, dm2tmp))
+    h_diag[ncore:nocc,:] += v_diag.T
+    h_diag[:,ncore:nocc] += v_diag
+
+    g_orb = casscf.pack_uniq_var(g-g.T)
+    h_diag = casscf.pack_uniq_var(h_diag)
+
+    # (pr|wx) gamma_{wxuv} = \sum_L L_{pr} dm2_L[u,v]
+    dm2_L = lib.dot(Laa, casdm2.reshape(ncas*ncas,-1)).reshape(naoaux,ncas,ncas)
+
+    def h_op(x):
+        x1 = casscf.unpack_uniq_var(x)
+
+        # part7
+        # (-h_{sp} R_{rs} gamma_{rq} - h_{rq} R_{pq} gamma_{sp})/2 + (pr<->qs)
+        x2 = reduce(lib.dot, (h1e_mo, x1, dm1))
+        # part8
+        # (g_{ps}\delta_{qr}R_rs + g_{qr}\delta_{ps}) * R_pq)/2 + (pr<->qs)
+        x2 -= numpy.dot((g+g.T), x1) * .5
+        # part2
+        # (-2Vhf_{sp}\delta_{qr}R_pq - 2Vhf_{qr}\delta_{sp}R_rs)/2 + (pr<->qs)
+        x2[:ncore] += reduce(numpy.dot, (x1[:ncore,ncore:], vhf_ca[ncore:])) * 2
+        # part3
+        # (-Vhf_{sp}gamma_{qr}R_{pq} - Vhf_{qr}gamma_{sp}R_{rs})/2 + (pr<->qs)
+        x2[ncore:nocc] += reduce(numpy.dot, (casdm1, x1[ncore:nocc], eris.vhf_c))
+        # part1
+        # J-type: (pv'|wx) gamma_{wxuv}, v' = mo * x1[:,v]
+        xa = x1[:,ncore:nocc].copy()
+        for b0, b1, Lpx in _trans_px(with_df, mo, numpy.dot(mo, xa), max_memory):
+            x2[:,ncore:nocc] += lib.einsum('kpv,kuv->pu', Lpx, dm2_L[b0:b1])
+        # K-type: (pw|v'x) dm2tmp_{wxuv}
+        Lxa = lib.einsum('krx,rv->kvx', Lpa, xa)
+        Lxa = lib.einsum('kvx,wxuv->kwu', Lxa, dm2tmp)
+        x2[:,ncore:nocc] += lib.einsum('kpw,kwu->pu', Lpa, Lxa)
+        Lxa = None
+
+        # part4, part5, part6
+        if ncore > 0:
+            va, vc = casscf.update_jk_in_ah(mo, x1, casdm1, eris)
+            x2[ncore:nocc] += va
+            x2[:ncore,ncore:] += vc
+
+        # (pr<->qs)
+        x2 = x2 - x2.T
+        return casscf.pack_uniq_var(x2)
+
+    return g_orb, gorb_update, h_op, h_diag
+
 def _mem_usage(ncore, ncas, nmo):
     outcore = basic = ncas**2*nmo**2*2 * 8/1e6
     incore = outcore + (ncore+ncas)*nmo**3*4/1e6
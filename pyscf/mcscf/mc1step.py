@@ -505,6 +505,7 @@ def as_scanner(mc):
     >>> e = mc_scanner(gto.M(atom='N 0 0 0; N 0 0 1.5'))
     '''
     from pyscf.mcscf.addons import project_init_guess
+    from pyscf.mcscf.addons import _project_core_active, _same_geom
     if isinstance(mc, lib.SinglePointScanner):
         return mc
 
@@ -514,6 +515,10 @@ def as_scanner(mc):
         def __init__(self, mc):
             self.__dict__.update(mc.__dict__)
             self._scf = mc._scf.as_scanner()
+            # (mol, AO overlap) and (prev_mol, mol, cross overlap) of the
+            # last projection
+            self._ovlp_cache = (None, None)
+            self._cross_ovlp_cache = (None, None, None)
 
         def __call__(self, mol_or_geom, **kwargs):
             if isinstance(mol_or_geom, gto.Mole):
@@ -531,16 +536,49 @@ def as_scanner(mc):
                 if sub_mod:
                     sub_mod.reset(mol)
 
+            prev_mol = self.mol
             mf_scanner = self._scf
             mf_scanner(mol)
             self.mol = mol
             if self.mo_coeff is None:
-                mo = mf_scanner.mo_coeff
+                mo = project_init_guess(self, mf_scanner.mo_coeff)
             else:
-                mo = self.mo_coeff
-            mo = project_init_guess(self, mo)
+                mo = self.project_guess(self.mo_coeff, prev_mol)
             e_tot = self.kernel(mo, self.ci)[0]
             return e_tot
+
+        def project_guess(self, mo, prev_mol):
+            '''Project the orbitals of the last geometry to the current one.
+            Only the core and active subspace is projected.  The AO overlap
+            and the cross overlap are reused if the geometries and the basis
+            are not changed.
+            '''
+            mol = self.mol
+            if mol.symmetry or not gto.same_basis_set(prev_mol, mol):
+                return project_init_guess(self, mo)
+
+            def same_mol(mol1, mol2):
+                return (mol1 is not None and _same_geom(mol1, mol2) and
+                        gto.same_basis_set(mol1, mol2))
+
+            cached_mol, s1 = self._ovlp_cache
+            if not same_mol(cached_mol, mol):
+                s1 = self._scf.get_ovlp(mol)
+                self._ovlp_cache = (mol, s1)
+
+            s21 = None
+            if not _same_geom(prev_mol, mol):
+                cached_prev, cached_mol, s21 = self._cross_ovlp_cache
+                if not (same_mol(cached_prev, prev_mol) and
+                        same_mol(cached_mol, mol)):
+                    s21 = gto.intor_cross('int1e_ovlp', mol, prev_mol)
+                    self._cross_ovlp_cache = (prev_mol, mol, s21)
+            mo1 = _project_core_active(self, mo, prev_mol, s1, s21)
+            if mo1 is None:
+                logger.debug(self, 'Projected core and active orbitals are '
+                             'linearly dependent. Call project_init_guess')
+                mo1 = project_init_guess(self, mo)
+            return mo1
     return CASSCF_Scanner(mc)
 
 
@@ -617,6 +655,12 @@ class CASSCF(casci.CASCI):
             orbital optimization will be restored to previous state and the
             step size of the orbital rotation needs to be reduced.
             scale_restoration controls how much to scale down the step size.
+        direct_hop : bool
+            Whether to evaluate the orbital hessian operator integral-directly.
+            The (pq|uv) and (pu|qv) integrals are not stored. The hessian
+            vector product is computed on the fly from the 3-index DF
+            tensor.  It requires the DF-CASSCF object (see
+            :func:`mcscf.DFCASSCF`).  Default is False.
 
     Saved results
 
@@ -697,6 +741,7 @@ class CASSCF(casci.CASCI):
     canonicalization = getattr(__config__, 'mcscf_mc1step_CASSCF_canonicalization', True)
     sorting_mo_energy = getattr(__config__, 'mcscf_mc1step_CASSCF_sorting_mo_energy', False)
     scale_restoration = getattr(__config__, 'mcscf_mc1step_CASSCF_scale_restoration', 0.5)
+    direct_hop = getattr(__config__, 'mcscf_mc1step_CASSCF_direct_hop', False)
 
     def __init__(self, mf_or_mol, ncas, nelecas, ncore=None, frozen=None):
         casci.CASCI.__init__(self, mf_or_mol, ncas, nelecas, ncore)
@@ -728,7 +773,7 @@ class CASSCF(casci.CASCI):
                     'ci_grad_trust_region', 'with_dep4', 'chk_ci',
                     'kf_interval', 'kf_trust_region', 'fcisolver_max_cycle',
                     'fcisolver_conv_tol', 'natorb', 'canonicalization',
-                    'sorting_mo_energy', 'scale_restoration'))
+                    'sorting_mo_energy', 'scale_restoration', 'direct_hop'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     def dump_flags(self, verbose=None):
@@ -764,6 +809,8 @@ class CASSCF(casci.CASCI):
         log.info('canonicalization = %s', self.canonicalization)
         log.info('sorting_mo_energy = %s', self.sorting_mo_energy)
         log.info('ao2mo_level = %d', self.ao2mo_level)
+        if self.direct_hop:
+            log.info('direct_hop = %s', self.direct_hop)
         log.info('chkfile = %s', self.chkfile)
         log.info('max_memory %d MB (current use %d MB)',
                  self.max_memory, lib.current_memory()[0])
@@ -935,6 +982,9 @@ To enable the solvent model for CASSCF, the following code needs to be called
 #        eris.papa = numpy.asarray(eri[:,ncore:nocc,:,ncore:nocc], order='C')
 #        return eris
 
+        if self.direct_hop:
+            raise NotImplementedError('direct_hop requires DF integrals. '
+                                      'Call CASSCF.density_fit() first.')
         return mc_ao2mo._ERIS(self, mo_coeff, method='incore',
                               level=self.ao2mo_level)
 
@@ -992,11 +1042,12 @@ To enable the solvent model for CASSCF, the following code needs to be called
         h1e_mo = reduce(numpy.dot, (mo.T, self.get_hcore(), mo))
         ddm = numpy.dot(uc, uc.T) * 2
         ddm[numpy.diag_indices(ncore)] -= 2
-        if self.with_dep4:
+        # Integral-direct eris does not hold ppaa and papa
+        if self.with_dep4 or getattr(eris, 'ppaa', None) is None:
             mo1 = numpy.dot(mo, u)
             mo1_cas = mo1[:,ncore:nocc]
             dm_core = numpy.dot(mo1[:,:ncore], mo1[:,:ncore].T) * 2
-            vj, vk = self._scf.get_jk(self.mol, dm_core)
+            vj, vk = self.get_jk(self.mol, dm_core)
             h1 =(reduce(numpy.dot, (ua.T, h1e_mo, ua)) +
                  reduce(numpy.dot, (mo1_cas.T, vj-vk*.5, mo1_cas)))
             eris._paaa = self._exact_paaa(mo, u)
@@ -1289,7 +1340,10 @@ def _fake_h_for_fast_casci(casscf, mo, eris):
     h1eff += eris.vhf_c[ncore:nocc,ncore:nocc]
     mc.get_h1eff = lambda *args: (h1eff, energy_core)
 
-    eri_cas = eris.ppaa[ncore:nocc,ncore:nocc,:,:].copy()
+    if getattr(eris, 'ppaa', None) is None:
+        eri_cas = eris.paaa[ncore:nocc].copy()
+    else:
+        eri_cas = eris.ppaa[ncore:nocc,ncore:nocc,:,:].copy()
     mc.get_h2eff = lambda *args: eri_cas
     return mc
 
@@ -84,6 +84,8 @@ def trans_e1_outcore(mol, mo, ncore, ncas, erifile,
     nocc = ncore + ncas
 
     faapp_buf = lib.H5TmpFile()
+    # Compression filter of ao2mo.outcore for the swap file and the outputs
+    h5opts = outcore._compression_opts(outcore.COMPRESSION, log)
     if isinstance(erifile, h5py.Group):
         feri = erifile
     else:
@@ -188,8 +190,9 @@ def trans_e1_outcore(mol, mo, ncore, ncas, erifile,
             ti1 = log.timer('half transformation of the buffer', *ti1)
 
 # ppaa, papa
-        faapp_buf[str(istep)] = \
-                bufpa.reshape(sh_range[2],nmo,ncas)[:,ncore:nocc].reshape(-1,ncas**2).T
+        bufaa = bufpa.reshape(sh_range[2],nmo,ncas)[:,ncore:nocc].reshape(-1,ncas**2).T
+        faapp_buf.create_dataset(str(istep), data=bufaa, **h5opts)
+        bufaa = None
         p0 = 0
         for ij in range(sh_range[0], sh_range[1]):
             i,j = lib.index_tril_to_pair(ij)
@@ -228,21 +231,22 @@ def trans_e1_outcore(mol, mo, ncore, ncas, erifile,
 
     nblk = int(max(8, min(nmo, (max_memory*1e6/8-papa_buf.size)/(ncas**2*nmo))))
     log.debug1('nblk for papa = %d', nblk)
-    dset = feri.create_dataset('papa', (nmo,ncas,nmo,ncas), 'f8')
+    # papa and ppaa are read by rows in the CASSCF solver
+    dset = feri.create_dataset('papa', (nmo,ncas,nmo,ncas), 'f8',
+                               chunks=(1,ncas,nmo,ncas) if h5opts else None,
+                               **h5opts)
     for i0, i1 in prange(0, nmo, nblk):
         tmp = lib.dot(mo[:,i0:i1].T, papa_buf.reshape(nao,-1))
         dset[i0:i1] = tmp.reshape(i1-i0,ncas,nmo,ncas)
     papa_buf = tmp = None
     time1 = log.timer('papa pass 2', *time1)
 
-    tmp = numpy.empty((ncas**2,nao_pair))
-    p0 = 0
-    for istep, sh_range in enumerate(shranges):
-        tmp[:,p0:p0+sh_range[2]] = faapp_buf[str(istep)]
-        p0 += sh_range[2]
+    tmp = outcore._load_from_h5g(faapp_buf, 0, ncas**2)
     nblk = int(max(8, min(nmo, (max_memory*1e6/8-tmp.size)/(ncas**2*nmo)-1)))
     log.debug1('nblk for ppaa = %d', nblk)
-    dset = feri.create_dataset('ppaa', (nmo,nmo,ncas,ncas), 'f8')
+    dset = feri.create_dataset('ppaa', (nmo,nmo,ncas,ncas), 'f8',
+                               chunks=(1,nmo,ncas,ncas) if h5opts else None,
+                               **h5opts)
     for i0, i1 in prange(0, nmo, nblk):
         tmp1 = _ao2mo.nr_e2(tmp, mo, (i0,i1,0,nmo), 's4', 's1', ao_loc=ao_loc)
         tmp1 = tmp1.reshape(ncas,ncas,i1-i0,nmo)
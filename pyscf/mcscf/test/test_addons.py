@@ -267,6 +267,27 @@ class KnownValues(unittest.TestCase):
 
         mc.cas_natorb()
 
+    def test_state_average_mix_nproc(self):
+        solver1 = fci.FCI(mol)
+        solver1.spin = 0
+        solver1.nroots = 2
+        solver2 = fci.FCI(mol, singlet=False)
+        solver2.spin = 2
+        mc = mcscf.CASSCF(mfr, 4, 4)
+        mc = mcscf.addons.state_average_mix_(mc, [solver1, solver2],
+                                             (0.25,0.25,0.5))
+        mc.fcisolver.nproc_solvers = 2
+        mc.kernel()
+        # The RDMs were returned by the solver processes
+        self.assertTrue(mc.fcisolver._rdm12_cache is not None)
+        self.assertTrue(mc.fcisolver._sa_pool is not None)
+        self.assertAlmostEqual(mc.e_tot, -108.80340952016508, 7)
+        dm1, dm2 = mc.fcisolver.make_rdm12(mc.ci, 4, (2,2))
+        mc.fcisolver._rdm12_cache = None
+        ref1, ref2 = mc.fcisolver.make_rdm12(mc.ci, 4, (2,2))
+        self.assertAlmostEqual(abs(dm1 - ref1).max(), 0, 9)
+        self.assertAlmostEqual(abs(dm2 - ref2).max(), 0, 9)
+
     def test_state_average_mix_fci_dmrg(self):
         fcisolver1 = fci.direct_spin0_symm.FCISolver(mol)
         class FCI_as_DMRG(fci.direct_spin0_symm.FCISolver):
@@ -15,6 +15,7 @@
 
 import copy
 import unittest
+from functools import reduce
 import numpy
 from pyscf import lib
 from pyscf import gto
@@ -242,6 +243,30 @@ class KnownValues(unittest.TestCase):
         mc_scan(mol)
         self.assertAlmostEqual(mc_scan.e_tot, -108.85974001740854, 8)
 
+    def test_scanner_project_guess(self):
+        mc_scan = mcscf.CASSCF(scf.RHF(mol), 4, 4).as_scanner()
+        mc_scan(mol)
+        mol1 = mol.set_geom_('N 0 0 -.72; N 0 0 .72', inplace=False)
+        mo1 = mc_scan.project_guess(mc_scan.mo_coeff, mol)
+        self.assertTrue(mo1 is not None)
+        s1 = reduce(numpy.dot, (mo1.T, mc_scan._scf.get_ovlp(), mo1))
+        self.assertAlmostEqual(abs(s1 - numpy.eye(s1.shape[0])).max(), 0, 9)
+
+        e1 = mc_scan(mol1)
+        s1 = reduce(numpy.dot, (mc_scan.mo_coeff.T, mol1.intor('int1e_ovlp'), mc_scan.mo_coeff))
+        self.assertAlmostEqual(abs(s1 - numpy.eye(s1.shape[0])).max(), 0, 9)
+        ref = mcscf.CASSCF(scf.RHF(mol1).run(), 4, 4).run()
+        self.assertAlmostEqual(e1, ref.e_tot, 8)
+
+        # The overlaps of the same geometries and basis are reused
+        mo2 = mc_scan.project_guess(mo1, mol)
+        s_cache = mc_scan._ovlp_cache[1]
+        s21_cache = mc_scan._cross_ovlp_cache[2]
+        mo3 = mc_scan.project_guess(mo1, mol.copy())
+        self.assertTrue(mc_scan._ovlp_cache[1] is s_cache)
+        self.assertTrue(mc_scan._cross_ovlp_cache[2] is s21_cache)
+        self.assertAlmostEqual(abs(mo2 - mo3).max(), 0, 12)
+
     def test_trust_region(self):
         mc1 = mcscf.CASSCF(msym, 4, 4)
         mc1.max_stepsize = 0.1
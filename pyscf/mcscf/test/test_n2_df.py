@@ -173,6 +173,27 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(numpy.allclose(eri0[:,:,ncore:nocc,ncore:nocc], eris.ppaa))
         self.assertTrue(numpy.allclose(eri0[:,ncore:nocc,:,ncore:nocc], eris.papa))
 
+    def test_direct_hop(self):
+        mc = mcscf.DFCASSCF(m, 4, 4, auxbasis='weigend')
+        mc.max_memory = 100
+        mo = mc.mo_coeff
+        ci0 = mc.kernel()[2]
+        casdm1, casdm2 = mc.fcisolver.make_rdm12(ci0, mc.ncas, mc.nelecas)
+        ref = mc.gen_g_hop(mo, 1, casdm1, casdm2, mc.ao2mo(mo))
+        mc.direct_hop = True
+        eris = mc.ao2mo(mo)
+        self.assertTrue(getattr(eris, 'ppaa', None) is None)
+        res = mc.gen_g_hop(mo, 1, casdm1, casdm2, eris)
+        self.assertAlmostEqual(abs(ref[0] - res[0]).max(), 0, 9)
+        self.assertAlmostEqual(abs(ref[3] - res[3]).max(), 0, 9)
+        x = numpy.random.random(ref[0].size) - .5
+        self.assertAlmostEqual(abs(ref[2](x) - res[2](x)).max(), 0, 9)
+        u = mc.update_rotate_matrix(x*.01)
+        self.assertAlmostEqual(abs(ref[1](u, ci0) - res[1](u, ci0)).max(), 0, 9)
+
+        emc = mc.kernel(mo)[0]
+        self.assertAlmostEqual(emc, -108.9105231091045, 7)
+
     def test_assign_cderi(self):
         nao = molsym.nao_nr()
         w, u = scipy.linalg.eigh(mol.intor('int2e_sph', aosym='s4'))
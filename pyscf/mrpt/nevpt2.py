@@ -381,27 +381,37 @@ def Sijrs(mc, eris, verbose=None):
     nvirt = mo_virt.shape[1]
     ncas = mo_cas.shape[1]
     nocc = ncore + ncas
-    if eris is None:
-        erifile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
-        feri = ao2mo.outcore.general(mc.mol, (mo_core,mo_virt,mo_core,mo_virt),
-                                     erifile.name, verbose=mc.verbose)
-    else:
-        feri = eris['cvcv']
-
     eia = mc.mo_energy[:ncore,None] -mc.mo_energy[None,nocc:]
-    norm = 0
-    e = 0
-    with ao2mo.load(feri) as cvcv:
+    def contract(load):
+        norm = 0
+        e = 0
         for i in range(ncore):
             djba = (eia.reshape(-1,1) + eia[i].reshape(1,-1)).ravel()
-            gi = numpy.asarray(cvcv[i*nvirt:(i+1)*nvirt])
+            gi = load(i)
             gi = gi.reshape(nvirt,ncore,nvirt).transpose(1,2,0)
             t2i = (gi.ravel()/djba).reshape(ncore,nvirt,nvirt)
             # 2*ijab-ijba
             theta = gi*2 - gi.transpose(0,2,1)
             norm += numpy.einsum('jab,jab', gi, theta)
             e += numpy.einsum('jab,jab', t2i, theta)
-    return norm, e
+        return norm, e
+
+    if eris is not None and 'Lcv' in eris:
+        # (ia|jb) from the DF tensors, one core orbital at a time
+        Lcv = eris['Lcv']
+        naux = Lcv.shape[0]
+        Lcv2 = Lcv.reshape(naux,-1)
+        return contract(lambda i: lib.dot(Lcv[:,i].T, Lcv2))
+
+    if eris is None:
+        erifile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        feri = ao2mo.outcore.general(mc.mol, (mo_core,mo_virt,mo_core,mo_virt),
+                                     erifile.name, verbose=mc.verbose)
+    else:
+        feri = eris['cvcv']
+
+    with ao2mo.load(feri) as cvcv:
+        return contract(lambda i: numpy.asarray(cvcv[i*nvirt:(i+1)*nvirt]))
 
 def Sijr(mc, dms, eris, verbose=None):
     #Subspace S_ijr^{(1)}
@@ -416,6 +426,15 @@ def Sijr(mc, dms, eris, verbose=None):
         h2e = ao2mo.restore(1, mc.ao2mo(mo_cas), ncas).transpose(0,2,1,3)
         h2e_v = ao2mo.incore.general(mc._scf._eri,[mo_virt,mo_core,mo_cas,mo_core],compact=False)
         h2e_v = h2e_v.reshape(mo_virt.shape[1],ncore,ncas,ncore).transpose(0,2,1,3)
+    elif 'Lcv' in eris:
+        h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
+        h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
+        Lcv = eris['Lcv']
+        Lca = eris['Lpa'][:,:ncore]
+        naux, nvirt = Lcv.shape[0], Lcv.shape[2]
+        # (jr|ip) -> [r,p,j,i]
+        h2e_v = lib.dot(Lcv.reshape(naux,-1).T, Lca.reshape(naux,-1))
+        h2e_v = h2e_v.reshape(ncore,nvirt,ncore,ncas).transpose(1,3,0,2)
     else:
         h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
         h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
@@ -443,24 +462,58 @@ def Srsi(mc, dms, eris, verbose=None):
     ncore = mo_core.shape[1]
     ncas = mo_cas.shape[1]
     nocc = ncore + ncas
-    if eris is None:
-        h1e = mc.h1e_for_cas()[0]
-        h2e = ao2mo.restore(1, mc.ao2mo(mo_cas), ncas).transpose(0,2,1,3)
-        h2e_v = ao2mo.incore.general(mc._scf._eri,[mo_virt,mo_core,mo_virt,mo_cas],compact=False)
-        h2e_v = h2e_v.reshape(mo_virt.shape[1],ncore,mo_virt.shape[1],ncas).transpose(0,2,1,3)
-    else:
+    if eris is not None and 'Lcv' in eris:
         h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
         h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
-        h2e_v = eris['pacv'][nocc:].transpose(3,0,2,1)
-
-    k27 = make_k27(h1e,h2e,dm1,dm2)
-    norm = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,dm1)\
-         - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,dm1)
-    h = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,k27)\
-         - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,k27)
+        k27 = make_k27(h1e,h2e,dm1,dm2)
+        norm, h = _Srsi_df(mc, eris, dm1, k27)
+    else:
+        if eris is None:
+            h1e = mc.h1e_for_cas()[0]
+            h2e = ao2mo.restore(1, mc.ao2mo(mo_cas), ncas).transpose(0,2,1,3)
+            h2e_v = ao2mo.incore.general(mc._scf._eri,[mo_virt,mo_core,mo_virt,mo_cas],compact=False)
+            h2e_v = h2e_v.reshape(mo_virt.shape[1],ncore,mo_virt.shape[1],ncas).transpose(0,2,1,3)
+        else:
+            h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
+            h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
+            h2e_v = eris['pacv'][nocc:].transpose(3,0,2,1)
+
+        k27 = make_k27(h1e,h2e,dm1,dm2)
+        norm = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,dm1)\
+             - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,dm1)
+        h = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,k27)\
+             - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,k27)
     diff = mc.mo_energy[nocc:,None,None] + mc.mo_energy[None,nocc:,None] - mc.mo_energy[None,None,:ncore]
     return _norm_to_energy(norm, h, diff)
 
+def _Srsi_df(mc, eris, dm1, k27):
+    '''norm and h of Srsi with the (vc|va) integrals generated from the DF
+    tensors for blocks of virtual orbitals r'''
+    Lcv = eris['Lcv']
+    Lva = eris['Lpa'][:,mc.ncore+mc.ncas:]
+    naux, ncore, nvirt = Lcv.shape
+    ncas = Lva.shape[2]
+    Lva2 = Lva.reshape(naux,-1)
+    Lcv2 = Lcv.reshape(naux,-1)
+    norm = numpy.empty((nvirt,nvirt,ncore))
+    h = numpy.empty((nvirt,nvirt,ncore))
+    max_memory = max(2000, mc.max_memory - lib.current_memory()[0])
+    blksize = int(max(1, min(nvirt, max_memory*.3e6/8/(nvirt*ncore*ncas*4))))
+    for r0, r1 in lib.prange(0, nvirt, blksize):
+        nr = r1 - r0
+        # (sp|ir) -> [r,s,i,p]
+        v1 = lib.dot(Lcv[:,:,r0:r1].reshape(naux,-1).T, Lva2)
+        v1 = v1.reshape(ncore,nr,nvirt,ncas).transpose(1,2,0,3)
+        # (ra|is) -> [r,s,i,a]
+        v2 = lib.dot(Lva[:,r0:r1].reshape(naux,-1).T, Lcv2)
+        v2 = v2.reshape(nr,ncas,ncore,nvirt).transpose(0,3,2,1)
+        v1dm = numpy.einsum('rsip,pa->rsia', v1, dm1)
+        v1k = numpy.einsum('rsip,pa->rsia', v1, k27)
+        norm[r0:r1] = numpy.einsum('rsia,rsia->rsi', v1dm, v1*2 - v2)
+        h[r0:r1] = numpy.einsum('rsia,rsia->rsi', v1k, v1*2 - v2)
+        v1 = v2 = v1dm = v1k = None
+    return norm, h
+
 def Srs(mc, dms, eris=None, verbose=None):
     #Subspace S_rs^{(-2)}
     mo_core, mo_cas, mo_virt = _extract_orbs(mc, mc.mo_coeff)
@@ -584,6 +637,10 @@ class NEVPT(lib.StreamObject):
             wfn were calculated in CASCI/CASSCF
         compressed_mps : bool
             compressed MPS perturber method for DMRG-SC-NEVPT2
+        with_df : DF object
+            If given, the MO integrals are generated from density fitting
+            tensors (see :func:`NEVPT.density_fit`).  The (pa|cv) and (cv|cv)
+            integrals are not stored.
 
     Examples:
 
@@ -598,6 +655,7 @@ class NEVPT(lib.StreamObject):
         self._mc = mc
         self.root = root
         self.compressed_mps = False
+        self.with_df = None
 
 ##################################################
 # don't modify the following attributes, they are not input options
@@ -687,6 +745,23 @@ example examples/dmrg/32-dmrg_casscf_nevpt2_for_FeS.py''')
 
 
 
+    def density_fit(self, auxbasis=None, with_df=None):
+        '''NEVPT2 with the MO integrals generated by density fitting'''
+        from pyscf import df
+        if with_df is None:
+            with_df = getattr(self._mc, 'with_df', None)
+            if with_df is None:
+                with_df = getattr(self._scf, 'with_df', None)
+            if with_df is None or (auxbasis is not None and
+                                   auxbasis != with_df.auxbasis):
+                with_df = df.DF(self.mol)
+                with_df.max_memory = self.max_memory
+                with_df.stdout = self.stdout
+                with_df.verbose = self.verbose
+                with_df.auxbasis = auxbasis
+        self.with_df = with_df
+        return self
+
     def kernel(self):
         from pyscf.mcscf.addons import StateAverageFCISolver
         if isinstance(self.fcisolver, StateAverageFCISolver):
@@ -725,7 +800,10 @@ example examples/dmrg/32-dmrg_casscf_nevpt2_for_FeS.py''')
               }
         time1 = log.timer('3pdm, 4pdm', *time0)
 
-        eris = _ERIS(self, self.mo_coeff)
+        if self.with_df is not None:
+            eris = _ERIS_df(self, self.mo_coeff, self.with_df)
+        else:
+            eris = _ERIS(self, self.mo_coeff)
         time1 = log.timer('integral transformation', *time1)
 
         if not getattr(self.fcisolver, 'nevpt_intermediate', None):  # regular FCI solver
@@ -903,6 +981,58 @@ def _ERIS(mc, mo, method='incore'):
     eris['h1eff'] = reduce(numpy.dot, (mo.T, mc.get_hcore(), mo)) + vhfcore
     return eris
 
+def _ERIS_df(mc, mo, with_df):
+    '''Integrals for NEVPT2 from the DF tensors.  ppaa and papa are
+    computed as in mcscf.df._ERIS.  The pacv and cvcv integrals are not
+    stored.  The DF tensors Lpa (naux,nmo,ncas) and Lcv (naux,ncore,nvir) are
+    kept instead, and Sijrs, Sijr and Srsi assemble the integrals block by
+    block.
+    '''
+    log = logger.new_logger(mc)
+    time0 = (time.clock(), time.time())
+    nao, nmo = mo.shape
+    ncore = mc.ncore
+    ncas = mc.ncas
+    nocc = ncore + ncas
+    nvir = nmo - nocc
+    naoaux = with_df.get_naoaux()
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, mc.max_memory*.9-mem_now)
+
+    mo = numpy.asarray(mo, order='F')
+    Lpa = numpy.empty((naoaux,nmo,ncas))
+    Lcv = numpy.empty((naoaux,ncore,nvir))
+    ppaa = numpy.zeros((nmo*nmo,ncas*ncas))
+    blksize = max(4, int(min(with_df.blockdim, max_memory*.3e6/8/nmo**2)))
+    b0 = 0
+    for eri1 in with_df.loop(blksize):
+        naux = eri1.shape[0]
+        Lpq = _ao2mo.nr_e2(eri1, mo, (0,nmo,0,nmo), aosym='s2', mosym='s1')
+        Lpq = Lpq.reshape(naux,nmo,nmo)
+        Lpa[b0:b0+naux] = Lpq[:,:,ncore:nocc]
+        Lcv[b0:b0+naux] = Lpq[:,:ncore,nocc:]
+        Laa = Lpq[:,ncore:nocc,ncore:nocc].reshape(naux,-1)
+        lib.dot(Lpq.reshape(naux,-1).T, Laa, 1, ppaa, 1)
+        b0 += naux
+        Lpq = Laa = None
+    time1 = log.timer('density fitting ppaa', *time0)
+
+    papa = lib.dot(Lpa.reshape(naoaux,-1).T, Lpa.reshape(naoaux,-1))
+
+    dmcore = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
+    vj, vk = with_df.get_jk(dmcore)
+    vhfcore = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
+    log.timer('density fitting papa and vhf_c', *time1)
+
+    eris = {}
+    eris['vhf_c'] = vhfcore
+    eris['ppaa'] = ppaa.reshape(nmo,nmo,ncas,ncas)
+    eris['papa'] = papa.reshape(nmo,ncas,nmo,ncas)
+    eris['Lpa'] = Lpa
+    eris['Lcv'] = Lcv
+    eris['h1eff'] = reduce(numpy.dot, (mo.T, mc.get_hcore(), mo)) + vhfcore
+    return eris
+
 # see mcscf.mc_ao2mo
 def trans_e1_incore(mc, mo):
     eri_ao = mc._scf._eri
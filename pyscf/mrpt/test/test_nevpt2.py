@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import unittest
 from functools import reduce
 import numpy
@@ -122,6 +123,28 @@ class KnowValues(unittest.TestCase):
         e = nevpt2.NEVPT(mc).kernel()
         self.assertAlmostEqual(e, -0.16978532268234559, 6)
 
+    def test_density_fit(self):
+        from pyscf import df
+        with_df = df.DF(mol, 'weigend')
+        cderi = numpy.vstack(list(with_df.loop()))
+        mf1 = copy.copy(mf)
+        mf1._eri = ao2mo.restore(8, numpy.dot(cderi.T, cderi), mol.nao_nr())
+        mc1 = copy.copy(mc)
+        mc1._scf = mf1
+        eris0 = nevpt2._ERIS(mc1, mc.mo_coeff)
+        eris1 = nevpt2._ERIS_df(mc, mc.mo_coeff, with_df)
+        self.assertAlmostEqual(abs(eris0['ppaa'] - eris1['ppaa']).max(), 0, 9)
+        self.assertAlmostEqual(abs(eris0['papa'] - eris1['papa']).max(), 0, 9)
+        self.assertAlmostEqual(abs(eris0['h1eff'] - eris1['h1eff']).max(), 0, 9)
+        for fn in (nevpt2.Sijr, nevpt2.Srsi):
+            ref = fn(mc, dms, eris0)
+            self.assertAlmostEqual(fn(mc, dms, eris1)[1], ref[1], 9)
+        ref = nevpt2.Sijrs(mc, eris0)
+        self.assertAlmostEqual(nevpt2.Sijrs(mc, eris1)[1], ref[1], 9)
+
+        e = nevpt2.NEVPT(mc).density_fit('weigend').kernel()
+        self.assertAlmostEqual(e, -0.10315217594326213, 3)
+
     def test_reset(self):
         mol1 = gto.M(atom='C')
         pt = nevpt2.NEVPT(mc)
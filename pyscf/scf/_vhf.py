@@ -147,6 +147,48 @@ class VHFOpt(object):
         return numpy.ctypeslib.as_array(data, shape=shape)
     dm_cond = property(get_dm_cond)
 
+    def estimate_screening(self):
+        '''Estimate the number of shell quartets (8-fold symmetry) skipped by
+        the density weighted Schwarz screening of CVHFnrs8_prescreen for the
+        density matrices last passed to :func:`set_dm`.
+
+        The shell pairs are coarse-grained on a logarithmic grid of q_cond
+        and the maximum dm_cond associated to the pair.  The estimation is
+        a lower bound of the number of skipped quartets.
+
+        Returns:
+            nskip, ntot
+        '''
+        if not self._this.contents.q_cond or not self._this.contents.dm_cond:
+            return 0, 0
+        q_cond = self.get_q_cond()
+        dm_cond = self.get_dm_cond()
+        nbas = q_cond.shape[0]
+        idx, jdx = numpy.tril_indices(nbas)
+        npair = idx.size
+        ntot = npair * (npair + 1) // 2
+
+        dmax = dm_cond.max(axis=1)
+        q = q_cond[idx,jdx]
+        a = numpy.max((4*dm_cond[idx,jdx], dmax[idx], dmax[jdx]), axis=0)
+        # Round up to the grid points so that the survived quartets are
+        # overestimated.
+        with numpy.errstate(divide='ignore'):
+            lq = numpy.ceil(numpy.log10(q) * 4).clip(-1200, None)
+            la = numpy.ceil(numpy.log10(a) * 4).clip(-1200, None)
+        grids, counts = numpy.unique(numpy.vstack((lq, la)).T, axis=0,
+                                     return_counts=True)
+        qg = 10**(grids[:,0]/4)
+        ag = 10**(grids[:,1]/4)
+        tol = self.direct_scf_tol
+        qq = qg[:,None] * qg
+        mask = (qq > tol) & (qq * numpy.maximum(ag[:,None], ag) > tol)
+        counts = counts.astype(numpy.double)
+        nkeep = counts.dot(mask).dot(counts)
+        nkeep = (nkeep + counts.dot(mask.diagonal() * counts)) * .5
+        nkeep = min(int(nkeep), ntot)
+        return ntot - nkeep, ntot
+
 class _CVHFOpt(ctypes.Structure):
     _fields_ = [('nbas', ctypes.c_int),
                 ('_padding', ctypes.c_int),
@@ -163,10 +163,16 @@ Keyword argument "init_dm" is replaced by "dm0"''')
     # A preprocessing hook before the SCF iteration
     mf.pre_kernel(locals())
 
+    # Number of incremental Fock builds since the last full build
+    rebuild_jk_cycle = getattr(mf, 'rebuild_jk_cycle', 0)
+    jk_cycle = 0
+    norm_ddm = None
+
     cput1 = logger.timer(mf, 'initialize scf', *cput0)
     for cycle in range(mf.max_cycle):
         dm_last = dm
         last_hf_e = e_tot
+        norm_ddm_last = norm_ddm
 
         fock = mf.get_fock(h1e, s1e, vhf, dm, cycle, mf_diis)
         mo_energy, mo_coeff = mf.eig(fock, s1e)
@@ -174,7 +180,18 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         dm = mf.make_rdm1(mo_coeff, mo_occ)
         # attach mo_coeff and mo_occ to dm to improve DFT get_veff efficiency
         dm = lib.tag_array(dm, mo_coeff=mo_coeff, mo_occ=mo_occ)
-        vhf = mf.get_veff(mol, dm, dm_last, vhf)
+        norm_ddm = numpy.linalg.norm(dm-dm_last)
+
+        jk_cycle += 1
+        if rebuild_jk_cycle > 0 and (jk_cycle >= rebuild_jk_cycle or
+                                     (norm_ddm_last is not None and
+                                      norm_ddm > 2*norm_ddm_last)):
+            # Bound the numerical error accumulated in the incremental builds
+            logger.debug(mf, 'Rebuild HF potential with the full density matrix')
+            vhf = mf.get_veff(mol, dm)
+            jk_cycle = 0
+        else:
+            vhf = mf.get_veff(mol, dm, dm_last, vhf)
         e_tot = mf.energy_tot(dm, h1e, vhf)
 
         # Here Fock matrix is h1e + vhf, without DIIS.  Calling get_fock
@@ -184,7 +201,6 @@ Keyword argument "init_dm" is replaced by "dm0"''')
         norm_gorb = numpy.linalg.norm(mf.get_grad(mo_coeff, mo_occ, fock))
         if not TIGHT_GRAD_CONV_TOL:
             norm_gorb = norm_gorb / numpy.sqrt(norm_gorb.size)
-        norm_ddm = numpy.linalg.norm(dm-dm_last)
         logger.info(mf, 'cycle= %d E= %.15g  delta_E= %4.3g  |g|= %4.3g  |ddm|= %4.3g',
                     cycle+1, e_tot, e_tot-last_hf_e, norm_gorb, norm_ddm)
 
@@ -1299,8 +1315,160 @@ def as_scanner(mf):
             e_tot = self.kernel(dm0=dm0, **kwargs)
             return e_tot
 
+        def run_batch(self, geoms, workers=1, **kwargs):
+            '''Compute the energies of a list of geometries.
+
+            Each calculation is initialized with the density matrix of the
+            nearest geometry which has been converged.  If workers > 1, the
+            geometry list is split into contiguous segments which are computed
+            in a pool of spawned processes.  Each worker rebuilds the scanner
+            from the mol object (mol.dumps) and the SCF options of plain
+            values (conv_tol, xc, ...).  Options which hold objects (grids,
+            with_df, ...) and dynamically created classes (e.g. density_fit())
+            cannot be passed to the workers; the geometries are then computed
+            in this process.  With workers > 1, a warm start only uses the
+            converged geometries of the same segment, and the first
+            geometry of each segment starts from the density matrix of the
+            scanner.  The results of the last geometry (mo_coeff, e_tot,
+            converged, ...) are written back to the scanner so that the next
+            call starts from the last geometry.
+
+            Args:
+                geoms : list
+                    Each item can be a Mole object, an atom string or an
+                    array of atomic coordinates.  Arrays of coordinates are
+                    recommended as they reuse the basis and ECP of the
+                    scanner's mol object without parsing them again.
+
+            Kwargs:
+                workers : int
+                    Number of processes.  Requires Python 3.  Spawned
+                    processes import the __main__ module, so a script
+                    calling run_batch with workers > 1 needs the
+                    "if __name__ == '__main__':" guard.
+
+            Returns:
+                1D array of total energies
+            '''
+            mols = [g if isinstance(g, gto.Mole) else
+                    self.mol.set_geom_(g, inplace=False) for g in geoms]
+            workers = min(workers, len(mols))
+            if workers <= 1:
+                return _scan_geoms(self, mols, **kwargs)
+
+            import multiprocessing
+            scanner_desc = _scanner_desc(self)
+            if not hasattr(multiprocessing, 'get_context'):
+                logger.warn(self, 'run_batch with workers > 1 requires Python 3. '
+                            'Geometries are computed in this process.')
+                return _scan_geoms(self, mols, **kwargs)
+            elif scanner_desc is None:
+                logger.warn(self, 'Class %s cannot be created in worker processes. '
+                            'Geometries are computed in this process.',
+                            self.__class__.__bases__[0])
+                return _scan_geoms(self, mols, **kwargs)
+
+            guess = None
+            if self.mo_coeff is not None:
+                guess = (self.mol.dumps(), self.make_rdm1())
+            nthreads = max(1, lib.num_threads() // workers)
+            tasks = [(scanner_desc, [mols[i].dumps() for i in idx], guess,
+                      nthreads, kwargs)
+                     for idx in numpy.array_split(numpy.arange(len(mols)), workers)]
+            # A fresh interpreter for each worker. Forking after the OpenMP
+            # runtime was initialized in this process may hang the workers.
+            pool = multiprocessing.get_context('spawn').Pool(workers)
+            try:
+                results = pool.map(_scan_geoms_in_worker, tasks)
+            finally:
+                pool.close()
+                pool.join()
+
+            # Update the scanner with the last calculation
+            last = results[-1][1]
+            self.reset(mols[-1])
+            for key, val in last.items():
+                setattr(self, key, val)
+            if self.chkfile:
+                self.dump_chk(last)
+            return numpy.hstack([x[0] for x in results])
+
     return SCF_Scanner(mf)
 
+def _scan_geoms(scanner, mols, guess=None, **kwargs):
+    '''Run the scanner for a list of molecules. Each calculation starts from
+    the density matrix of the closest (in terms of atomic coordinates)
+    converged geometry. guess is a list of (mol, dm) of converged geometries
+    computed elsewhere.
+    '''
+    from pyscf.scf import addons
+    e_tot = numpy.empty(len(mols))
+    converged = list(guess or [])  # mol and dm of converged geometries
+    for i, mol in enumerate(mols):
+        coords = mol.atom_coords()
+        charges = mol.atom_charges()
+        dist = [numpy.linalg.norm(coords - mol1.atom_coords())
+                if (mol1.natm == mol.natm and
+                    numpy.all(mol1.atom_charges() == charges)) else numpy.inf
+                for mol1, dm1 in converged]
+
+        if dist and min(dist) < numpy.inf:
+            mol1, dm0 = converged[numpy.argmin(dist)]
+            if dm0.shape[-1] != mol.nao_nr():
+                if dm0.shape[-1] == mol1.nao_nr():
+                    dm0 = addons.project_dm_nr2nr(mol1, dm0, mol)
+                else:
+                    dm0 = None
+            e_tot[i] = scanner(mol, dm0=dm0, **kwargs)
+        else:
+            e_tot[i] = scanner(mol, **kwargs)
+
+        if scanner.converged:
+            converged.append((mol, scanner.make_rdm1()))
+    return e_tot
+
+# Attributes of the SCF object which are not passed to run_batch workers
+_BATCH_SKIP_KEYS = set(('mol', 'stdout', 'chkfile', 'callback', 'mo_energy',
+                        'mo_coeff', 'mo_occ', 'e_tot', 'converged',
+                        'scf_summary'))
+
+def _scanner_desc(scanner):
+    '''A picklable description (class, mol, options) of the SCF object of
+    the scanner. None if the class cannot be imported in other processes.'''
+    for cls in type(scanner).__mro__:
+        if not issubclass(cls, lib.SinglePointScanner):
+            break
+    if getattr(sys.modules.get(cls.__module__), cls.__name__, None) is not cls:
+        return None
+
+    opts = {}
+    for key, val in scanner.__dict__.items():
+        if key.startswith('_') or key in _BATCH_SKIP_KEYS:
+            continue
+        if val is None or isinstance(val, (bool, int, float, str, tuple)):
+            opts[key] = val
+    return cls.__module__, cls.__name__, scanner.mol.dumps(), opts
+
+def _scan_geoms_in_worker(args):
+    import importlib
+    (module, cls_name, molstr, opts), molstrs, guess, nthreads, kwargs = args
+    cls = getattr(importlib.import_module(module), cls_name)
+    mf = cls(gto.loads(molstr))
+    mf.__dict__.update(opts)
+    # Avoid the conflicts of the chkfile shared by worker processes
+    mf.chkfile = None
+    scanner = mf.as_scanner()
+    if guess is not None:
+        guess = [(gto.loads(guess[0]), guess[1])]
+    with lib.with_omp_threads(nthreads):
+        e_tot = _scan_geoms(scanner, [gto.loads(x) for x in molstrs], guess,
+                            **kwargs)
+    # The state of the last calculation of this segment
+    last = {'e_tot': scanner.e_tot, 'converged': scanner.converged,
+            'mo_energy': scanner.mo_energy, 'mo_coeff': scanner.mo_coeff,
+            'mo_occ': scanner.mo_occ}
+    return e_tot, last
+
 ############
 
 
@@ -1350,6 +1518,13 @@ class SCF(lib.StreamObject):
             Direct SCF is used by default.
         direct_scf_tol : float
             Direct SCF cutoff threshold.  Default is 1e-13.
+        rebuild_jk_cycle : int
+            In direct SCF, the HF potential is built incrementally from the
+            change of the density matrix.  If rebuild_jk_cycle > 0, the HF
+            potential is rebuilt with the full density matrix every
+            rebuild_jk_cycle iterations or when the change of density matrix
+            more than doubles, to bound the accumulated numerical error.  Default is 0
+            (never rebuild).
         callback : function(envs_dict) => None
             callback function takes one dict as the argument which is
             generated by the builtin function :func:`locals`, so that the
@@ -1402,6 +1577,7 @@ class SCF(lib.StreamObject):
     level_shift = getattr(__config__, 'scf_hf_SCF_level_shift', 0)
     direct_scf = getattr(__config__, 'scf_hf_SCF_direct_scf', True)
     direct_scf_tol = getattr(__config__, 'scf_hf_SCF_direct_scf_tol', 1e-13)
+    rebuild_jk_cycle = getattr(__config__, 'scf_hf_SCF_rebuild_jk_cycle', 0)
     conv_check = getattr(__config__, 'scf_hf_SCF_conv_check', True)
 
     def __init__(self, mol):
@@ -1439,7 +1615,8 @@ class SCF(lib.StreamObject):
         keys = set(('conv_tol', 'conv_tol_grad', 'max_cycle', 'init_guess',
                     'DIIS', 'diis', 'diis_space', 'diis_start_cycle',
                     'diis_file', 'diis_space_rollback', 'damp', 'level_shift',
-                    'direct_scf', 'direct_scf_tol', 'conv_check'))
+                    'direct_scf', 'direct_scf_tol', 'rebuild_jk_cycle',
+                    'conv_check'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     def build(self, mol=None):
@@ -1477,6 +1654,8 @@ class SCF(lib.StreamObject):
         log.info('direct_scf = %s', self.direct_scf)
         if self.direct_scf:
             log.info('direct_scf_tol = %g', self.direct_scf_tol)
+            if self.rebuild_jk_cycle > 0:
+                log.info('rebuild_jk_cycle = %d', self.rebuild_jk_cycle)
         if self.chkfile:
             log.info('chkfile to save SCF result = %s', self.chkfile)
         log.info('max_memory %d MB (current use %d MB)',
@@ -1700,6 +1879,12 @@ class SCF(lib.StreamObject):
             with lib.temporary_env(self.opt, prescreen=prescreen):
                 vj, vk = get_jk(mol, dm, hermi, self.opt, with_j, with_k, omega)
 
+        if isinstance(self.opt, _vhf.VHFOpt) and self.verbose >= logger.DEBUG1:
+            nskip, ntot = self.opt.estimate_screening()
+            if ntot > 0:
+                logger.debug1(self, 'Skip ~%d of %d shell quartets (%.1f%%, estimated) '
+                              'in direct SCF screening',
+                              nskip, ntot, nskip*100./ntot)
         logger.timer(self, 'vj and vk', *cpu0)
         return vj, vk
 
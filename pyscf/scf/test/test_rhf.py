@@ -362,6 +362,29 @@ class KnownValues(unittest.TestCase):
         mf = scf.rohf.ROHF(pmol)
         self.assertAlmostEqual(mf.scf(), -75.627354109594179, 9)
 
+    def test_rebuild_jk_cycle(self):
+        def count_full_builds(rebuild_jk_cycle):
+            mf1 = scf.RHF(mol)
+            mf1.max_memory = 0
+            mf1.conv_tol = 1e-10
+            mf1.rebuild_jk_cycle = rebuild_jk_cycle
+            nfull = []
+            cycles = []
+            def get_veff(mol=None, dm=None, dm_last=0, vhf_last=0, hermi=1):
+                if not isinstance(dm_last, numpy.ndarray):
+                    nfull.append(1)
+                return scf.hf.RHF.get_veff(mf1, mol, dm, dm_last, vhf_last, hermi)
+            mf1.get_veff = get_veff
+            mf1.callback = lambda envs: cycles.append(envs['cycle'])
+            self.assertAlmostEqual(mf1.kernel(), mf.e_tot, 9)
+            return len(nfull), len(cycles)
+
+        nfull0, ncycle0 = count_full_builds(0)
+        nfull, ncycle = count_full_builds(3)
+        self.assertTrue(ncycle >= 3)
+        # The initial build plus at least one rebuild every 3 cycles
+        self.assertTrue(nfull >= nfull0 + ncycle // 3)
+
     def test_damping(self):
         nao = mol.nao_nr()
         numpy.random.seed(1)
@@ -689,6 +712,25 @@ H     0    0.757    0.587'''
         e = mfs(mol1)
         self.assertAlmostEqual(e, -1.1163913004438035, 9)
 
+    def test_scanner_run_batch(self):
+        mol1 = gto.M(atom='H 0 0 0; H 0 0 .9', basis='cc-pvdz', verbose=0)
+        mf_scanner = scf.RHF(mol1).as_scanner()
+        mf_scanner.chkfile = None
+        coords = mol1.atom_coords(unit='Angstrom')
+        geoms = [coords * (1 + .05*i) for i in range(4)]
+        e_ref = [scf.RHF(mol1.set_geom_(x, inplace=False)).kernel()
+                 for x in geoms]
+        e_tot = mf_scanner.run_batch(geoms)
+        self.assertAlmostEqual(abs(e_tot - e_ref).max(), 0, 8)
+        mf_scanner(mol1)
+        e_tot = mf_scanner.run_batch(geoms, workers=2)
+        self.assertAlmostEqual(abs(e_tot - e_ref).max(), 0, 8)
+        # The scanner holds the results of the last geometry
+        self.assertAlmostEqual(mf_scanner.e_tot, e_ref[-1], 8)
+        self.assertAlmostEqual(abs(mf_scanner.mol.atom_coords(unit='Angstrom')
+                                   - geoms[-1]).max(), 0, 9)
+        self.assertAlmostEqual(mf_scanner.energy_tot(), e_ref[-1], 8)
+
     def test_natm_eq_0(self):
         mol = gto.M()
         mol.nelectron = 2
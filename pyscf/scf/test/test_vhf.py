@@ -45,6 +45,20 @@ def tearDownModule():
 
 
 class KnownValues(unittest.TestCase):
+    def test_estimate_screening(self):
+        vhfopt = mf.init_direct_scf(mol)
+        self.assertEqual(vhfopt.estimate_screening(), (0, 0))
+        dm = mf.make_rdm1()
+        vhfopt.set_dm(dm, mol._atm, mol._bas, mol._env)
+        nskip, ntot = vhfopt.estimate_screening()
+        npair = mol.nbas * (mol.nbas+1) // 2
+        self.assertEqual(ntot, npair*(npair+1)//2)
+        self.assertTrue(0 <= nskip < ntot)
+
+        vhfopt.set_dm(dm*1e-12, mol._atm, mol._bas, mol._env)
+        nskip1 = vhfopt.estimate_screening()[0]
+        self.assertTrue(nskip1 > nskip)
+
     def test_incore_s4(self):
         eri4 = ao2mo.restore(4, mf._eri, nmo)
         dm = mf.make_rdm1()